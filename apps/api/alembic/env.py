@@ -16,8 +16,14 @@ from app.models import (  # noqa: F401
     Badge,
     Competence,
     Consent,
+    EmbeddingCache,
+    EmergentSkill,
     Experience,
+    ExtractedSkill,
+    LlmResponseCache,
+    OfferFetchCache,
     Profile,
+    RawOffer,
     RomeAppellation,
     RomeCompetence,
     RomeMetier,
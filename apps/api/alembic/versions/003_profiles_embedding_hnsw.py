@@ -0,0 +1,44 @@
+"""Add ANN index on profiles.embedding for semantic matching.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+Adds an HNSW index (vector_cosine_ops) on profiles.embedding so that the
+recruiter search (POST /api/matching/search) no longer scans every profile,
+plus a btree index on the (zone_geographique, disponibilite) filters.
+
+The HNSW recall/latency trade-off is tuned per query with hnsw.ef_search
+(see app/services/matching.py).
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: str = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # -- profiles.embedding (HNSW, cosine) --
+    op.execute(
+        "CREATE INDEX ix_profiles_embedding_hnsw "
+        "ON profiles USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+    # -- matching filters --
+    op.create_index(
+        "ix_profiles_zone_disponibilite",
+        "profiles",
+        ["zone_geographique", "disponibilite"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_zone_disponibilite", table_name="profiles")
+    op.execute("DROP INDEX IF EXISTS ix_profiles_embedding_hnsw")
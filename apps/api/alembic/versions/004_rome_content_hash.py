@@ -0,0 +1,41 @@
+"""Add content_hash to ROME tables for incremental refresh.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+scripts/import_rome.py stores an md5 of each row's content and diffs the
+new export against it, so only added/changed/removed rows are written.
+Existing rows get their hash on the next import.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+ROME_TABLES = ("rome_metiers", "rome_competences", "rome_appellations")
+
+
+def upgrade() -> None:
+    for table in ROME_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "content_hash",
+                sa.String(32),
+                nullable=True,
+                comment="md5 du contenu de la ligne (import incremental)",
+            ),
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(ROME_TABLES):
+        op.drop_column(table, "content_hash")
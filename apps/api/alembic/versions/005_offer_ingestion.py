@@ -0,0 +1,51 @@
+"""Offer ingestion support -- source_url dedupe and HTTP validators cache.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+- raw_offers.source_url becomes unique so that scripts/collect_offers.py can
+  batch-insert with ON CONFLICT DO NOTHING (NULL urls stay allowed for
+  manual / aidant entries).
+- offer_fetch_cache stores ETag / Last-Modified per URL for conditional GETs.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # -- raw_offers.source_url dedupe --
+    op.create_unique_constraint("uq_raw_offers_source_url", "raw_offers", ["source_url"])
+
+    # -- offer_fetch_cache --
+    op.create_table(
+        "offer_fetch_cache",
+        sa.Column("url", sa.String(1000), primary_key=True),
+        sa.Column("etag", sa.String(255), nullable=True),
+        sa.Column(
+            "last_modified",
+            sa.String(64),
+            nullable=True,
+            comment="Valeur brute de l'en-tete Last-Modified",
+        ),
+        sa.Column(
+            "checked_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("offer_fetch_cache")
+    op.drop_constraint("uq_raw_offers_source_url", "raw_offers", type_="unique")
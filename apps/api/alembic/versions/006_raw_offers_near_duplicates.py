@@ -0,0 +1,58 @@
+"""Near-duplicate index on raw_offers (MinHash LSH bands).
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+- minhash_bands: LSH band hashes of the offer text (see
+  app/services/near_duplicates.py), GIN-indexed so that candidate
+  duplicates are found with the && overlap operator.
+- duplicate_of: canonical offer of a near-duplicate. Duplicates are stored
+  as already processed so that only the canonical offer reaches the LLM.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: str = "005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "raw_offers",
+        sa.Column(
+            "minhash_bands",
+            postgresql.ARRAY(sa.BigInteger()),
+            nullable=True,
+            comment="Bandes LSH MinHash du texte (detection de quasi-doublons)",
+        ),
+    )
+    op.add_column(
+        "raw_offers",
+        sa.Column(
+            "duplicate_of",
+            sa.Uuid(),
+            sa.ForeignKey("raw_offers.id", ondelete="SET NULL"),
+            nullable=True,
+            comment="Offre canonique si cette offre est un quasi-doublon",
+        ),
+    )
+    # Only canonical offers are ever looked up as duplicate candidates
+    op.execute(
+        "CREATE INDEX ix_raw_offers_minhash_bands "
+        "ON raw_offers USING gin (minhash_bands) "
+        "WHERE duplicate_of IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_raw_offers_minhash_bands")
+    op.drop_column("raw_offers", "duplicate_of")
+    op.drop_column("raw_offers", "minhash_bands")
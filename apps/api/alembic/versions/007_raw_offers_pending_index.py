@@ -0,0 +1,33 @@
+"""Partial index on raw_offers waiting for LLM extraction.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+The extraction worker (app/services/skill_extraction.py) claims the oldest
+unprocessed canonical offers with FOR UPDATE SKIP LOCKED. The partial index
+only holds the pending rows, so claiming stays cheap however many offers
+have already been processed.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: str = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX ix_raw_offers_pending "
+        "ON raw_offers (collected_at) "
+        "WHERE processed = false AND duplicate_of IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_raw_offers_pending")
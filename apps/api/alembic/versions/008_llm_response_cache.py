@@ -0,0 +1,65 @@
+"""LLM response cache.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+Persistent cache of LLM answers keyed by sha256(model, prompt version,
+normalized input). Re-running an extraction on unchanged inputs with an
+unchanged prompt is served from here without touching the GPU. Size is
+bounded by LRU eviction on last_used_at (see app/services/llm_cache.py).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: str = "007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_response_cache",
+        sa.Column(
+            "key",
+            sa.String(64),
+            primary_key=True,
+            comment="sha256 hex de (modele, version prompt, entree normalisee)",
+        ),
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column("prompt_version", sa.String(50), nullable=False),
+        sa.Column(
+            "response",
+            sa.Text(),
+            nullable=False,
+            comment="Contenu brut de la reponse du LLM",
+        ),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "last_used_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_llm_response_cache_last_used_at",
+        "llm_response_cache",
+        ["last_used_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_response_cache_last_used_at", table_name="llm_response_cache")
+    op.drop_table("llm_response_cache")
@@ -0,0 +1,51 @@
+"""Embedding cache (content-addressed, half precision).
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+Vectors keyed by sha256(model, e5 kind, normalized text), shared by the
+profile-embedding, clustering and matching paths (see
+app/services/embedding_cache.py). halfvec requires pgvector >= 0.7.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import HALFVEC
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: str = "008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column(
+            "key",
+            sa.String(64),
+            primary_key=True,
+            comment="sha256 hex de (modele, query|passage, texte normalise)",
+        ),
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column(
+            "embedding",
+            HALFVEC(1024),
+            nullable=False,
+            comment="Vecteur normalise (e5-multilingual, dim 1024, float16)",
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
@@ -0,0 +1,45 @@
+"""ANN index on emergent_skills.embedding and pending extracted skills.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+Incremental referential updates (build_referentiel.py --incremental) look
+up the nearest emergent skill of every new label:
+
+- an HNSW index (vector_cosine_ops) on emergent_skills.embedding serves the
+  per-label ORDER BY embedding <=> :label LIMIT 1 lookups;
+- a partial index on extracted_skills not yet linked to an emergent skill
+  (the pending pool), so finding new labels does not scan the whole table.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: str = "009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # -- emergent_skills.embedding (HNSW, cosine) --
+    op.execute(
+        "CREATE INDEX ix_emergent_skills_embedding_hnsw "
+        "ON emergent_skills USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)"
+    )
+
+    # -- pending pool --
+    op.execute(
+        "CREATE INDEX ix_extracted_skills_pending "
+        "ON extracted_skills (offer_id) "
+        "WHERE emergent_skill_id IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_extracted_skills_pending")
+    op.execute("DROP INDEX IF EXISTS ix_emergent_skills_embedding_hnsw")
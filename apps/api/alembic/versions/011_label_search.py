@@ -0,0 +1,91 @@
+"""Hybrid label search: accent-insensitive trigram, French full-text, vectors.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+
+Label resolution (app/services/label_search.py) ranks emergent skills, ROME
+competences and ROME appellations with three indexed searches fused by
+reciprocal rank:
+
+- unaccent extension, an IMMUTABLE f_unaccent() wrapper (unaccent() itself
+  is only STABLE, so it cannot appear in an index expression) and a
+  french_unaccent text search configuration (unaccent + French stemming);
+- trigram GIN indexes on f_unaccent(label) ("menage" finds "Ménage");
+- full-text GIN indexes on to_tsvector('french_unaccent', label);
+- embedding columns on rome_competences / rome_appellations (filled by
+  scripts/align_rome.py) with HNSW indexes, emergent_skills already has one.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: str = "010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (table, label column)
+LABEL_COLUMNS = [
+    ("emergent_skills", "canonical_label"),
+    ("rome_competences", "libelle"),
+    ("rome_appellations", "libelle"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+    op.execute("CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french)")
+    op.execute(
+        "ALTER TEXT SEARCH CONFIGURATION french_unaccent "
+        "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem"
+    )
+
+    # -- trigram + full-text indexes --
+    for table, column in LABEL_COLUMNS:
+        op.execute(
+            f"CREATE INDEX ix_{table}_{column}_unaccent_trgm "
+            f"ON {table} USING gin (f_unaccent({column}) gin_trgm_ops)"
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_{column}_fts "
+            f"ON {table} USING gin (to_tsvector('french_unaccent', {column}))"
+        )
+
+    # -- ROME embeddings (HNSW, cosine) --
+    for table in ("rome_competences", "rome_appellations"):
+        op.add_column(
+            table,
+            sa.Column(
+                "embedding",
+                Vector(1024),
+                nullable=True,
+                comment="Vecteur du libelle (e5-multilingual, dim 1024)",
+            ),
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_embedding_hnsw "
+            f"ON {table} USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    for table in ("rome_appellations", "rome_competences"):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_embedding_hnsw")
+        op.drop_column(table, "embedding")
+    for table, column in reversed(LABEL_COLUMNS):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_fts")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_unaccent_trgm")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
+    op.execute("DROP EXTENSION IF EXISTS unaccent")
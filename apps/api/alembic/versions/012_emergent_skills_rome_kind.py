@@ -0,0 +1,64 @@
+"""Kind of ROME code stored on emergent skills.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+
+ROME alignment (scripts/align_rome.py) stores either a competence code or,
+for an appellation match, the code of its fiche metier:
+
+- emergent_skills.rome_kind records which one ("competence" |
+  "appellation");
+- emergent_skills.rome_code is widened to String(20), the length of
+  rome_competences.code (a fiche metier code is 5 characters).
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012"
+down_revision: str = "011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "emergent_skills",
+        "rome_code",
+        type_=sa.String(20),
+        existing_type=sa.String(10),
+        existing_nullable=True,
+    )
+    op.add_column(
+        "emergent_skills",
+        sa.Column(
+            "rome_kind",
+            sa.String(20),
+            nullable=True,
+            comment="competence | appellation (type de rome_code)",
+        ),
+    )
+    # Rows aligned before this revision: an appellation match stored a fiche
+    # metier code (letter + 4 digits), a competence match a numeric code
+    op.execute(
+        "UPDATE emergent_skills SET rome_kind = CASE "
+        "WHEN rome_code ~ '^[A-Z][0-9]{4}$' THEN 'appellation' ELSE 'competence' END "
+        "WHERE rome_code IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("emergent_skills", "rome_kind")
+    # Competence codes longer than 10 characters do not fit the old column
+    op.execute("UPDATE emergent_skills SET rome_code = NULL WHERE length(rome_code) > 10")
+    op.alter_column(
+        "emergent_skills",
+        "rome_code",
+        type_=sa.String(10),
+        existing_type=sa.String(20),
+        existing_nullable=True,
+    )
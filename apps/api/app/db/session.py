@@ -1,14 +1,111 @@
+"""Database sessions -- async engines, pool settings and pool telemetry.
+
+The primary engine serves reads and writes. When DATABASE_REPLICA_URL is
+set, read-only queries (matching and label search, embedding cache
+lookups) go through a second engine bound to the replica; otherwise both
+factories share the primary engine.
+"""
+
+import time
 from collections.abc import AsyncGenerator
+from dataclasses import asdict, dataclass
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.metrics import instrument_engine
+
+
+@dataclass
+class PoolStats:
+    """Compteurs cumules d'un pool de connexions."""
+
+    acquisitions: int = 0
+    wait_s: float = 0.0  # total time spent waiting for a connection
+    max_wait_s: float = 0.0
+    timeouts: int = 0  # acquisitions that gave up after DB_POOL_TIMEOUT_S
+    connects: int = 0  # new server connections (first use, overflow, recycle)
+    max_overflow_used: int = 0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool asyncio qui mesure l'attente de chaque acquisition de connexion."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.stats.acquisitions += 1
+            self.stats.wait_s += waited
+            self.stats.max_wait_s = max(self.stats.max_wait_s, waited)
+            self.stats.max_overflow_used = max(self.stats.max_overflow_used, self.overflow())
+
+
+def connect_args(pgbouncer: bool) -> dict:
+    """asyncpg connection arguments; PgBouncer mode disables prepared statement caches.
+
+    In transaction pooling mode, consecutive statements of a client may run on
+    different server connections: a cached prepared statement may not exist
+    on the next one, and a reused name may clash with another client's.
+    """
+    args: dict = {"timeout": settings.DB_CONNECT_TIMEOUT_S}
+    if pgbouncer:
+        args |= {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return args
+
+
+def count_connects(engine: AsyncEngine) -> None:
+    """Count new DBAPI connections in the stats of the engine's pool."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def count_connect(dbapi_connection, connection_record) -> None:
+        # The record does not expose its pool: use the engine's current one
+        sync_engine.pool.stats.connects += 1
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
+
+def build_engine(url: str) -> AsyncEngine:
+    """Async engine with the DB_POOL_* settings, connection and query counting."""
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_S,
+        pool_recycle=settings.DB_POOL_RECYCLE_S,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args(settings.DB_PGBOUNCER),
+    )
+    count_connects(engine)
+    instrument_engine(engine)
+    return engine
+
+
+engine = build_engine(settings.DATABASE_URL)
+read_engine = (
+    build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else engine
 )
 
 async_session_factory = async_sessionmaker(
@@ -16,9 +113,55 @@ async_session_factory = async_sessionmaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
+read_session_factory = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency FastAPI — fournit une session async SQLAlchemy."""
     async with async_session_factory() as session:
         yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency FastAPI — session de lecture (replica si configure)."""
+    async with read_session_factory() as session:
+        yield session
+
+
+async def ping(engine: AsyncEngine) -> None:
+    """Run ``SELECT 1`` on a connection of the pool (raises if unreachable)."""
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def engine_status(engine: AsyncEngine) -> dict:
+    """Connections of one engine's pool: in use, idle, share of the limit, waits."""
+    pool = engine.pool
+    checked_out = pool.checkedout()
+    stats = pool.stats
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / (pool.size() + pool._max_overflow), 3),
+        **asdict(stats),
+        "wait_s": round(stats.wait_s, 4),
+        "max_wait_s": round(stats.max_wait_s, 4),
+        "mean_wait_ms": round(stats.wait_s / stats.acquisitions * 1000, 3)
+        if stats.acquisitions
+        else 0.0,
+    }
+
+
+def pool_status() -> dict:
+    """Primary pool of this process, with the replica pool nested when configured."""
+    status = engine_status(engine)
+    if read_engine is not engine:
+        status["replica"] = engine_status(read_engine)
+    return status
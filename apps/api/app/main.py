@@ -1,14 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from app.config import settings
+from app.db.session import engine, ping, pool_status, read_engine
+from app.metrics import MetricsMiddleware, PoolCollector
+from app.profiling import ProfilingMiddleware
+from app.routers import embeddings, labels, matching, stt, tts, voice
+from app.services.llm import get_llm
+from app.services.model_registry import get_model_registry
+
+# A database that does not answer within this delay is reported as not ready
+READY_TIMEOUT_S = 2.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    registry = get_model_registry()
+    # Models are loaded and warmed before the first request, not by it
+    await registry.load_all(settings.MODEL_PRELOAD, warmup=settings.MODEL_WARMUP)
+    yield
+    await registry.aclose()
+    if get_llm.cache_info().currsize:
+        await get_llm().client.aclose()
+
 
 app = FastAPI(
     title="Kompetens API",
     description="API backend du POC Kompetens — mise en relation emploi par la voix",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+if settings.PROFILING_ENABLED:
+    # Inside the metrics middleware: profiled requests keep their SQL counts
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        paths=tuple(settings.PROFILING_PATHS),
+        header=settings.PROFILING_HEADER,
+        token=settings.PROFILING_TOKEN,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        max_profiles=settings.PROFILING_MAX_PROFILES,
+    )
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -17,8 +58,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+engines = {"primary": engine} | ({"replica": read_engine} if read_engine is not engine else {})
+REGISTRY.register(PoolCollector(engines))
+
+app.include_router(matching.router)
+app.include_router(embeddings.router)
+app.include_router(labels.router)
+app.include_router(stt.router)
+app.include_router(tts.router)
+app.include_router(voice.router)
+
 
 @app.get("/health")
 async def health() -> dict:
     """Point de contrôle de santé de l'API."""
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def health_db() -> dict:
+    """Pool de connexions de ce processus (saturation sous charge)."""
+    return pool_status()
+
+
+@app.get("/health/models")
+async def health_models() -> dict:
+    """Modeles charges par ce processus : etat, temps de chargement, memoire."""
+    return get_model_registry().as_dict()
+
+
+@app.get("/health/ready")
+async def health_ready() -> JSONResponse:
+    """Pret a servir : base(s) joignable(s) et modeles MODEL_PRELOAD charges (503 sinon)."""
+    checks: dict[str, str] = {}
+    for name, db in engines.items():
+        try:
+            await asyncio.wait_for(ping(db), READY_TIMEOUT_S)
+            checks[f"db_{name}"] = "ok"
+        except Exception as exc:
+            checks[f"db_{name}"] = f"{type(exc).__name__}: {exc}"
+    statuses = {info.name: info.status for info in get_model_registry().info()}
+    for name in settings.MODEL_PRELOAD:
+        checks[f"model_{name}"] = "ok" if statuses[name] == "ready" else statuses[name]
+    ready = all(check == "ok" for check in checks.values())
+    return JSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Metriques Prometheus de ce processus."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,243 @@
+"""Prometheus metrics -- HTTP latency per route, SQL per request, model inference.
+
+Exposed on /metrics in the Prometheus text format:
+
+- HTTP requests by route template (``/api/labels/search``, never the raw
+  path): count by status and latency histogram, plus requests in progress;
+- SQL statements per request: how many, and the time spent in them
+  (SQLAlchemy cursor events on every engine, attributed to the request
+  through a context variable);
+- model inference time per service and model (one observation per
+  embedding or STT batch, per TTS synthesis, per LLM completion);
+- the database pools (connections in use, time waited for one).
+
+Metrics live in the worker process, like the models: scrape each worker.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED = "<unmatched>"
+
+# Voice and search requests span ~10 ms (labels) to several seconds (TTS)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HTTP_REQUESTS = Counter(
+    "kompetens_http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "kompetens_http_request_duration_seconds",
+    "HTTP request latency, until the last byte of the response.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "kompetens_http_requests_in_progress",
+    "HTTP requests being served (the route is only known once matched).",
+    ["method"],
+)
+DB_QUERIES = Histogram(
+    "kompetens_db_queries_per_request",
+    "SQL statements executed by one HTTP request.",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_QUERY_TIME = Histogram(
+    "kompetens_db_query_seconds_per_request",
+    "Time spent in SQL statements by one HTTP request.",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+INFERENCE_LATENCY = Histogram(
+    "kompetens_model_inference_seconds",
+    "Model inference time (one batch, synthesis or completion).",
+    ["service", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+# ---------------------------------------------------------------------------
+# SQL statements of the current request
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class QueryStats:
+    """Requetes SQL executees pendant une requete HTTP."""
+
+    count: int = 0
+    seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    # Statements one by one, only while the request is profiled
+    timeline: list[dict] | None = None
+
+
+_queries: ContextVar[QueryStats | None] = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute every statement of ``engine`` to the request running it."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _queries.get() is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = _queries.get()
+        started = getattr(context, "_query_started", None)
+        if stats is None or started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats.count += 1
+        stats.seconds += elapsed
+        if stats.timeline is not None:
+            stats.timeline.append(
+                {
+                    "start_ms": round((started - stats.started) * 1000, 3),
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "statement": statement,
+                    "rows": cursor.rowcount,
+                }
+            )
+
+
+@contextmanager
+def record_queries(timeline: bool = False) -> Iterator[QueryStats]:
+    """Collect the SQL statements run inside the block (and the tasks it awaits).
+
+    Nested inside another ``record_queries`` block, the statements go to the
+    enclosing collector, which also starts keeping a timeline if asked.
+    """
+    stats = _queries.get()
+    if stats is not None:
+        if timeline and stats.timeline is None:
+            stats.timeline = []
+        yield stats
+        return
+    stats = QueryStats(timeline=[] if timeline else None)
+    token = _queries.set(stats)
+    try:
+        yield stats
+    finally:
+        _queries.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Model inference
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def observe_inference(service: str, model: str) -> Iterator[None]:
+    """Time one inference of ``model``; failed inferences are not observed."""
+    started = time.perf_counter()
+    yield
+    record_inference(service, model, time.perf_counter() - started)
+
+
+def record_inference(service: str, model: str, seconds: float) -> None:
+    """Observe an inference timed by the caller (e.g. a stream, minus consumer time)."""
+    INFERENCE_LATENCY.labels(service, model).observe(seconds)
+
+
+# ---------------------------------------------------------------------------
+# HTTP middleware
+# ---------------------------------------------------------------------------
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that served ``scope`` (bounded label values).
+
+    Known once the router has matched the request: read after the app ran.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : latence, statut et requetes SQL de chaque requete HTTP."""
+
+    def __init__(self, app: ASGIApp, skip: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            with record_queries() as queries:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            DB_QUERIES.labels(route).observe(queries.count)
+            DB_QUERY_TIME.labels(route).observe(queries.seconds)
+
+
+# ---------------------------------------------------------------------------
+# Database pools
+# ---------------------------------------------------------------------------
+
+
+class PoolCollector(Collector):
+    """Etat des pools de connexions, lu a chaque collecte."""
+
+    def __init__(self, engines: dict[str, AsyncEngine]) -> None:
+        self.engines = engines
+
+    def collect(self):
+        checked_out = GaugeMetricFamily(
+            "kompetens_db_pool_checked_out", "Connections in use.", labels=["pool"]
+        )
+        limit = GaugeMetricFamily(
+            "kompetens_db_pool_limit", "pool_size + max_overflow.", labels=["pool"]
+        )
+        acquisitions = CounterMetricFamily(
+            "kompetens_db_pool_acquisitions", "Connection checkouts.", labels=["pool"]
+        )
+        wait = CounterMetricFamily(
+            "kompetens_db_pool_wait_seconds",
+            "Time spent waiting for a connection.",
+            labels=["pool"],
+        )
+        timeouts = CounterMetricFamily(
+            "kompetens_db_pool_timeouts", "Checkouts that timed out.", labels=["pool"]
+        )
+        for name, engine in self.engines.items():
+            pool, stats = engine.pool, engine.pool.stats
+            checked_out.add_metric([name], pool.checkedout())
+            limit.add_metric([name], pool.size() + pool._max_overflow)
+            acquisitions.add_metric([name], stats.acquisitions)
+            wait.add_metric([name], stats.wait_s)
+            timeouts.add_metric([name], stats.timeouts)
+        yield from (checked_out, limit, acquisitions, wait, timeouts)
@@ -2,10 +2,12 @@
 
 from app.models.badge import Badge
 from app.models.base import Base, TimestampMixin
+from app.models.cache import EmbeddingCache, LlmResponseCache
 from app.models.competence import Competence
 from app.models.consent import Consent
 from app.models.experience import Experience
 from app.models.profile import Profile
+from app.models.referentiel import EmergentSkill, ExtractedSkill, OfferFetchCache, RawOffer
 from app.models.rome import RomeAppellation, RomeCompetence, RomeMetier
 from app.models.user import User
 
@@ -21,4 +23,10 @@ __all__ = [
     "RomeMetier",
     "RomeCompetence",
     "RomeAppellation",
+    "RawOffer",
+    "OfferFetchCache",
+    "ExtractedSkill",
+    "EmergentSkill",
+    "LlmResponseCache",
+    "EmbeddingCache",
 ]
@@ -0,0 +1,86 @@
+"""Cache models -- persistent caches of model outputs, shared by all workers."""
+
+from datetime import datetime
+
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class LlmResponseCache(Base):
+    """Reponse LLM mise en cache.
+
+    Cle : sha256(modele, version du prompt, texte d'entree normalise).
+    Eviction LRU sur last_used_at quand la taille maximale est depassee.
+    """
+
+    __tablename__ = "llm_response_cache"
+
+    key: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="sha256 hex de (modele, version prompt, entree normalisee)",
+    )
+    model: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+    prompt_version: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+    )
+    response: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="Contenu brut de la reponse du LLM",
+    )
+    hits: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (Index("ix_llm_response_cache_last_used_at", "last_used_at"),)
+
+
+class EmbeddingCache(Base):
+    """Vecteur d'embedding mis en cache, adresse par son contenu.
+
+    Cle : sha256(modele, type e5, texte normalise). Stocke en demi-precision
+    (halfvec) : la moitie de la place, sans effet mesurable sur les cosinus.
+    Pas d'eviction : une ligne par texte distinct, bornee par le vocabulaire.
+    """
+
+    __tablename__ = "embedding_cache"
+
+    key: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="sha256 hex de (modele, query|passage, texte normalise)",
+    )
+    model: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+    embedding = mapped_column(
+        HALFVEC(1024),
+        nullable=False,
+        comment="Vecteur normalise (e5-multilingual, dim 1024, float16)",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
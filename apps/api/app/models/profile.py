@@ -3,7 +3,7 @@
 import uuid
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin
@@ -63,3 +63,18 @@ class Profile(TimestampMixin, Base):
         back_populates="recipient",
         cascade="all, delete-orphan",
     )
+
+    __table_args__ = (
+        Index(
+            "ix_profiles_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index(
+            "ix_profiles_zone_disponibilite",
+            "zone_geographique",
+            "disponibilite",
+        ),
+    )
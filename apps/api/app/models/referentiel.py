@@ -0,0 +1,271 @@
+"""Emergent referential models -- raw offers, extracted skills, canonical skills.
+
+The emergent referential (E-10b) is inferred from real New Caledonian job
+offers: offers are collected into raw_offers, the LLM extracts skills into
+extracted_skills, and clustering groups them into emergent_skills.
+"""
+
+import uuid
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy import text as sql_text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class RawOffer(Base):
+    """Offre d'emploi brute collectee depuis une source NC.
+
+    Sources: emploi_nc | dtefp_csv | facebook | aidant
+    """
+
+    __tablename__ = "raw_offers"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    source: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="emploi_nc | dtefp_csv | facebook | aidant",
+    )
+    source_url: Mapped[str | None] = mapped_column(
+        String(1000),
+        nullable=True,
+    )
+    text: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="Texte brut de l'offre",
+    )
+    zone: Mapped[str | None] = mapped_column(
+        String(120),
+        nullable=True,
+        comment="Zone geographique (Noumea, Kone, Lifou...)",
+    )
+    sector: Mapped[str | None] = mapped_column(
+        String(120),
+        nullable=True,
+        comment="Secteur d'activite si identifie",
+    )
+    collected_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    processed: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        comment="True si l'offre a ete traitee par le LLM",
+    )
+    minhash_bands: Mapped[list[int] | None] = mapped_column(
+        ARRAY(BigInteger),
+        nullable=True,
+        comment="Bandes LSH MinHash du texte (detection de quasi-doublons)",
+    )
+    duplicate_of: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("raw_offers.id", ondelete="SET NULL"),
+        nullable=True,
+        comment="Offre canonique si cette offre est un quasi-doublon",
+    )
+
+    __table_args__ = (
+        UniqueConstraint("source_url", name="uq_raw_offers_source_url"),
+        Index(
+            "ix_raw_offers_minhash_bands",
+            "minhash_bands",
+            postgresql_using="gin",
+            # "text" is a column name in this class body
+            postgresql_where=sql_text("duplicate_of IS NULL"),
+        ),
+        Index(
+            "ix_raw_offers_pending",
+            "collected_at",
+            postgresql_where=sql_text("processed = false AND duplicate_of IS NULL"),
+        ),
+    )
+
+
+class OfferFetchCache(Base):
+    """Validateurs HTTP (ETag / Last-Modified) par URL collectee.
+
+    Permet des GET conditionnels : une page inchangee repond 304 et n'est
+    ni re-telechargee ni re-analysee.
+    """
+
+    __tablename__ = "offer_fetch_cache"
+
+    url: Mapped[str] = mapped_column(
+        String(1000),
+        primary_key=True,
+    )
+    etag: Mapped[str | None] = mapped_column(
+        String(255),
+        nullable=True,
+    )
+    last_modified: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Valeur brute de l'en-tete Last-Modified",
+    )
+    checked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class EmergentSkill(Base):
+    """Competence canonique du referentiel emergent (un cluster)."""
+
+    __tablename__ = "emergent_skills"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    canonical_label: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Label canonique de la competence emergente",
+    )
+    variant_labels: Mapped[list] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+        comment="Labels variantes issus du clustering",
+    )
+    frequency: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Nombre d'offres mentionnant cette competence",
+    )
+    sectors: Mapped[list] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+        comment="Secteurs d'activite associes",
+    )
+    zones: Mapped[list] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+        comment="Zones geographiques associees",
+    )
+    embedding = mapped_column(
+        Vector(1024),
+        nullable=True,
+        comment="Vecteur d'embedding (e5-multilingual, dim 1024)",
+    )
+    rome_code: Mapped[str | None] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="Code ROME v4 associe si similarite > 0.8 (arriere-plan)",
+    )
+    rome_kind: Mapped[str | None] = mapped_column(
+        String(20),
+        nullable=True,
+        comment="competence | appellation (type de rome_code)",
+    )
+    rome_label: Mapped[str | None] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="Libelle ROME associe",
+    )
+    first_seen: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    last_seen: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_emergent_skills_canonical_label_unaccent_trgm",
+            sql_text("f_unaccent(canonical_label) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_emergent_skills_canonical_label_fts",
+            sql_text("to_tsvector('french_unaccent', canonical_label)"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_emergent_skills_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+
+class ExtractedSkill(Base):
+    """Competence extraite d'une offre par le LLM (mots de l'offre)."""
+
+    __tablename__ = "extracted_skills"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    offer_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("raw_offers.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    label: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        comment="Competence extraite par le LLM (mots de l'offre)",
+    )
+    level: Mapped[str | None] = mapped_column(
+        String(30),
+        nullable=True,
+        comment="debutant | intermediaire | confirme | expert",
+    )
+    context: Mapped[str | None] = mapped_column(
+        String(255),
+        nullable=True,
+        comment="Contexte d'extraction (chantier, mine, service...)",
+    )
+    emergent_skill_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("emergent_skills.id", ondelete="SET NULL"),
+        nullable=True,
+        comment="Competence canonique apres clustering",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_extracted_skills_pending",
+            "offer_id",
+            postgresql_where=sql_text("emergent_skill_id IS NULL"),
+        ),
+    )
@@ -5,6 +5,7 @@ national job taxonomy maintained by Pole Emploi / France Travail. Kompetens
 uses it as the backbone for competence mapping and matching.
 """
 
+from pgvector.sqlalchemy import Vector
 from sqlalchemy import ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -34,6 +35,11 @@ class RomeMetier(Base):
         nullable=True,
         comment="Definition detaillee du metier",
     )
+    content_hash: Mapped[str | None] = mapped_column(
+        String(32),
+        nullable=True,
+        comment="md5 du contenu de la ligne (import incremental)",
+    )
 
     # --- relationships ---
     appellations: Mapped[list["RomeAppellation"]] = relationship(
@@ -76,6 +82,36 @@ class RomeCompetence(Base):
         nullable=False,
         comment="savoir-faire | savoir-etre | savoir",
     )
+    content_hash: Mapped[str | None] = mapped_column(
+        String(32),
+        nullable=True,
+        comment="md5 du contenu de la ligne (import incremental)",
+    )
+    embedding = mapped_column(
+        Vector(1024),
+        nullable=True,
+        comment="Vecteur du libelle (e5-multilingual, dim 1024)",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_rome_competences_libelle_unaccent_trgm",
+            text("f_unaccent(libelle) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_rome_competences_libelle_fts",
+            text("to_tsvector('french_unaccent', libelle)"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_rome_competences_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
 
 
 class RomeAppellation(Base):
@@ -102,6 +138,16 @@ class RomeAppellation(Base):
         ForeignKey("rome_metiers.code_rome", ondelete="CASCADE"),
         nullable=False,
     )
+    content_hash: Mapped[str | None] = mapped_column(
+        String(32),
+        nullable=True,
+        comment="md5 du contenu de la ligne (import incremental)",
+    )
+    embedding = mapped_column(
+        Vector(1024),
+        nullable=True,
+        comment="Vecteur du libelle (e5-multilingual, dim 1024)",
+    )
 
     # --- relationship ---
     metier: Mapped["RomeMetier"] = relationship(
@@ -114,4 +160,21 @@ class RomeAppellation(Base):
             text("libelle gin_trgm_ops"),
             postgresql_using="gin",
         ),
+        Index(
+            "ix_rome_appellations_libelle_unaccent_trgm",
+            text("f_unaccent(libelle) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_rome_appellations_libelle_fts",
+            text("to_tsvector('french_unaccent', libelle)"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_rome_appellations_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
     )
@@ -0,0 +1,186 @@
+"""Request profiling -- sampled flamegraphs, stored with the request's SQL timeline.
+
+Opt-in (PROFILING_ENABLED). A request (HTTP or WebSocket, e.g. the voice
+turn) is profiled when:
+
+- it carries the PROFILING_HEADER header with PROFILING_TOKEN as value
+  (the header is ignored while no token is set: a 1 ms profile is not
+  something any client may ask for); or
+- it is drawn with probability PROFILING_SAMPLE_RATE, among the paths
+  starting with one of PROFILING_PATHS.
+
+A profiled request runs under pyinstrument, a sampling profiler (one stack
+sample every PROFILING_INTERVAL_MS, taken from a C extension): with its
+async mode only the request's own task is attributed, time spent awaiting
+shows up as ``[await]``. At most one request is profiled at a time. Two
+files are written to PROFILING_DIR, named after the profile id (returned
+in the ``x-profile-id`` response header of HTTP requests):
+
+- ``<id>.speedscope.json``: the flamegraph, for https://www.speedscope.app;
+- ``<id>.json``: the request (method, path, status, duration) and every
+  SQL statement it ran, with its start offset and duration.
+
+Only the PROFILING_MAX_PROFILES most recent profiles are kept: older ones
+are deleted after each write.
+
+A request that is not profiled pays one header lookup and one random draw.
+Requires the profiling extras: pip install -e ".[profiling]".
+"""
+
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import record_queries, route_template
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_SUFFIXES = (".speedscope.json", ".json")
+
+
+def write_profile(directory: Path, profile_id: str, profiler, request: dict) -> None:
+    """Render the flamegraph and write both files (blocking: run off the loop)."""
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile_id}.speedscope.json").write_text(
+        profiler.output(SpeedscopeRenderer()), encoding="utf-8"
+    )
+    (directory / f"{profile_id}.json").write_text(
+        json.dumps(request, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+
+
+def prune_profiles(directory: Path, keep: int) -> int:
+    """Delete all but the ``keep`` most recent profiles; return how many were deleted.
+
+    Profile ids start with their timestamp (to the microsecond, profiles are
+    taken one at a time): the name order is the age order.
+    """
+    ids = sorted(
+        path.name.removesuffix(".speedscope.json") for path in directory.glob("*.speedscope.json")
+    )
+    stale = ids[: max(len(ids) - keep, 0)]
+    for profile_id in stale:
+        for suffix in PROFILE_SUFFIXES:
+            (directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+    return len(stale)
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI : profilage echantillonne de requetes HTTP et WebSocket."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str | Path,
+        sample_rate: float = 0.0,
+        paths: tuple[str, ...] = (),
+        header: str = "x-profile",
+        token: str = "",
+        interval_ms: float = 1.0,
+        max_profiles: int = 100,
+    ) -> None:
+        try:
+            from pyinstrument import Profiler
+        except ImportError as exc:
+            raise RuntimeError(
+                "pyinstrument is not installed. "
+                'Install the profiling extras: pip install -e ".[profiling]"'
+            ) from exc
+        self.app = app
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.paths = tuple(paths)
+        self.header = header.lower()
+        self.token = token
+        self.interval_s = interval_ms / 1000
+        self.max_profiles = max_profiles
+        self._profiler_class = Profiler
+        self._busy = False
+
+    def wanted(self, scope: Scope) -> bool:
+        """Whether this request asks for, or is drawn for, a profile."""
+        requested = Headers(scope=scope).get(self.header)
+        if requested is not None and self.token:
+            return secrets.compare_digest(requested.encode(), self.token.encode())
+        return (
+            self.sample_rate > 0
+            and scope["path"].startswith(self.paths)
+            and random.random() < self.sample_rate
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or self._busy or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._busy = False
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{uuid4().hex[:8]}"
+        status: int | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        profiler = self._profiler_class(interval=self.interval_s, async_mode="enabled")
+        started = time.perf_counter()
+        with record_queries(timeline=True) as queries:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+                request = {
+                    "id": profile_id,
+                    "type": scope["type"],
+                    "method": scope.get("method"),
+                    "path": scope["path"],
+                    "route": route_template(scope),
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "sql": {
+                        "count": queries.count,
+                        "duration_ms": round(queries.seconds * 1000, 3),
+                        "timeline": queries.timeline,
+                    },
+                }
+                # Rendering walks every sample: keep it off the event loop
+                try:
+                    await asyncio.to_thread(
+                        write_profile, self.directory, profile_id, profiler, request
+                    )
+                    await asyncio.to_thread(prune_profiles, self.directory, self.max_profiles)
+                except Exception:
+                    logger.exception("profile %s could not be written", profile_id)
+        logger.info(
+            "profiled %s %s in %.0f ms: %s",
+            request["method"] or "WS",
+            scope["path"],
+            request["duration_ms"],
+            self.directory / profile_id,
+        )
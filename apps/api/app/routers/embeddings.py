@@ -0,0 +1,41 @@
+"""Embeddings router -- batch text encoding with the shared e5 model."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from app.schemas.embeddings import RequeteEmbeddings, ResultatEmbeddings, StatsEmbeddings
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+
+router = APIRouter(prefix="/api/embeddings", tags=["embeddings"])
+
+
+@router.post("", response_model=ResultatEmbeddings)
+async def embed(
+    payload: RequeteEmbeddings,
+    embedder: Annotated[CachedEmbedder, Depends(get_embedder)],
+) -> ResultatEmbeddings:
+    """Encode un lot de textes (cache, puis micro-batching avec les requetes concurrentes)."""
+    vectors = await embedder.embed(payload.texts, payload.kind)
+    return ResultatEmbeddings(
+        model=embedder.model_name,
+        dimension=embedder.dimension,
+        embeddings=vectors,
+    )
+
+
+@router.get("/stats", response_model=StatsEmbeddings)
+async def stats(
+    embedder: Annotated[CachedEmbedder, Depends(get_embedder)],
+) -> StatsEmbeddings:
+    """Taux de hit du cache et taille moyenne des micro-lots depuis le demarrage."""
+    cache, batches = embedder.stats, embedder.service.stats
+    return StatsEmbeddings(
+        model=embedder.model_name,
+        cache_lookups=cache.lookups,
+        cache_memory_hits=cache.memory_hits,
+        cache_store_hits=cache.store_hits,
+        cache_hit_rate=cache.hit_rate,
+        batches=batches.batches,
+        mean_batch_size=batches.mean_batch_size,
+    )
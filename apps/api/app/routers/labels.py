@@ -0,0 +1,33 @@
+"""Labels router -- hybrid resolution of spoken / typed skill labels."""
+
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session
+from app.schemas.labels import LabelResolu, ResultatLabels
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+from app.services.label_search import ALL_SOURCES, search_labels
+
+router = APIRouter(prefix="/api/labels", tags=["labels"])
+
+
+@router.get("/search", response_model=ResultatLabels)
+async def search(
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    embedder: Annotated[CachedEmbedder, Depends(get_embedder)],
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Ex: le menage")],
+    source: Annotated[
+        list[Literal["emergent", "competence", "appellation"]] | None,
+        Query(description="Referentiels interroges (defaut: tous)"),
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+    vector: Annotated[bool, Query(description="Inclure la recherche vectorielle")] = True,
+) -> ResultatLabels:
+    """Resout un label libre (trigrammes + plein texte + vecteurs, fusion RRF)."""
+    embedding = await embedder.embed_query(q) if vector else None
+    matches = await search_labels(
+        session, q, embedding, sources=source or ALL_SOURCES, limit=limit
+    )
+    return ResultatLabels(query=q, results=[LabelResolu(**vars(m)) for m in matches])
@@ -0,0 +1,38 @@
+"""Matching router -- semantic candidate search for recruiters (E-03)."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_session
+from app.schemas.matching import CandidatMatching, RechercheMatching, ResultatMatching
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+from app.services.matching import search_profiles
+
+router = APIRouter(prefix="/api/matching", tags=["matching"])
+
+
+@router.post("/search", response_model=ResultatMatching)
+async def search(
+    payload: RechercheMatching,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    embedder: Annotated[CachedEmbedder, Depends(get_embedder)],
+) -> ResultatMatching:
+    """Recherche les profils les plus proches du besoin recruteur."""
+    embedding = payload.embedding
+    if embedding is None:
+        embedding = await embedder.embed_query(payload.texte)
+    matches, ef_search = await search_profiles(
+        session,
+        embedding,
+        zone_geographique=payload.zone_geographique,
+        disponibilite=payload.disponibilite,
+        limit=payload.limit,
+        min_score=payload.min_score,
+        ef_search=payload.ef_search,
+    )
+    return ResultatMatching(
+        results=[CandidatMatching(**vars(m)) for m in matches],
+        ef_search=ef_search,
+    )
@@ -0,0 +1,95 @@
+"""STT router -- streaming dictation over a WebSocket.
+
+Protocol (one connection per dictation):
+- client -> server: binary frames of PCM 16-bit little-endian, mono, at
+  STT_SAMPLE_RATE (16 kHz), any chunk size; then the text message
+  {"type": "end"} when the VocalButton is released;
+- server -> client: {"type": "partial" | "final", "segment", "text",
+  "start", "end"} as soon as each segment is decoded, then
+  {"type": "done", "text"} with the full final transcript.
+"""
+
+import asyncio
+import contextlib
+import json
+from typing import Annotated, Protocol
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from app.schemas.stt import StatsStt
+from app.services.stt import StreamingTranscription, SttService, get_stt_service
+
+router = APIRouter(prefix="/api/stt", tags=["stt"])
+
+
+class AudioSink(Protocol):
+    """Consommateur de l'audio recu (StreamingTranscription, VoiceTurn)."""
+
+    def feed(self, pcm: bytes) -> None: ...
+
+    def finish(self) -> None: ...
+
+    def cancel(self) -> None: ...
+
+
+async def receive_audio(websocket: WebSocket, stream: AudioSink) -> bool:
+    """Feed the stream until the client sends "end"; False if it disconnected."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            stream.cancel()
+            return False
+        if message.get("bytes"):
+            stream.feed(message["bytes"])
+        elif message.get("text"):
+            try:
+                payload = json.loads(message["text"])
+            except ValueError:
+                continue
+            # Valid JSON is not necessarily an object ("[]", "1")
+            if isinstance(payload, dict) and payload.get("type") == "end":
+                stream.finish()
+                return True
+
+
+@router.websocket("/stream")
+async def stream(
+    websocket: WebSocket,
+    service: Annotated[SttService, Depends(get_stt_service)],
+) -> None:
+    """Dictee en continu : transcriptions partielles puis finales par segment."""
+    await websocket.accept()
+    transcription = StreamingTranscription(service)
+    # Audio is received while earlier segments are being decoded
+    receiver = asyncio.create_task(receive_audio(websocket, transcription))
+    try:
+        async for result in transcription.results():
+            await websocket.send_json(result)
+        if await receiver:
+            await websocket.send_json({"type": "done", "text": transcription.text})
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect):
+            await receiver
+
+
+@router.get("/stats", response_model=StatsStt)
+async def stats(service: Annotated[SttService, Depends(get_stt_service)]) -> StatsStt:
+    """Profondeur de file, taille moyenne des lots et facteur temps reel du STT."""
+    counters = service.stats
+    return StatsStt(
+        model=service.model_name,
+        queue_depth=service.queue_depth,
+        partials=counters.partials,
+        finals=counters.finals,
+        skipped_partials=counters.skipped_partials,
+        batches=counters.batches,
+        mean_batch_size=counters.mean_batch_size,
+        mean_queue_wait_ms=(
+            counters.queue_wait_s / counters.segments * 1000 if counters.segments else 0.0
+        ),
+        real_time_factor=counters.real_time_factor,
+    )
@@ -0,0 +1,51 @@
+"""TTS router -- sentence-streamed speech synthesis."""
+
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.schemas.tts import RequeteTts, StatsTts
+from app.services.tts import TtsService, get_tts_service, wav_header
+
+router = APIRouter(prefix="/api/tts", tags=["tts"])
+
+
+@router.post("", response_class=StreamingResponse)
+async def synthesize(
+    payload: RequeteTts,
+    service: Annotated[TtsService, Depends(get_tts_service)],
+) -> StreamingResponse:
+    """Synthetise un texte ; l'audio de chaque phrase part des qu'elle est prete."""
+
+    async def audio() -> AsyncIterator[bytes]:
+        if payload.format == "wav":
+            yield wav_header(service.sample_rate)
+        async for pcm in service.stream(payload.text):
+            yield pcm
+
+    # Raw PCM is little-endian (Piper's output): audio/L16 would claim
+    # big-endian (RFC 2586), so the format is given in a header instead
+    headers = {"X-Sample-Rate": str(service.sample_rate)}
+    if payload.format == "pcm":
+        headers["X-Audio-Format"] = "s16le"
+    return StreamingResponse(
+        audio(),
+        media_type="audio/wav" if payload.format == "wav" else "application/octet-stream",
+        headers=headers,
+    )
+
+
+@router.get("/stats", response_model=StatsTts)
+async def stats(service: Annotated[TtsService, Depends(get_tts_service)]) -> StatsTts:
+    """Taux de hit du cache de phrases et facteur temps reel de la synthese."""
+    counters = service.stats
+    return StatsTts(
+        model=service.model_name,
+        sample_rate=service.sample_rate,
+        sentences=counters.sentences,
+        cache_hits=counters.cache_hits,
+        cache_hit_rate=counters.hit_rate,
+        real_time_factor=counters.real_time_factor,
+    )
@@ -0,0 +1,80 @@
+"""Voice router -- one conversational turn over a WebSocket (STT -> LLM -> TTS).
+
+Protocol (one connection per turn):
+- server -> client: {"type": "start", "sample_rate"} (rate of the audio
+  it will send);
+- client -> server: binary PCM 16-bit mono 16 kHz frames, then
+  {"type": "end"}, as for /api/stt/stream;
+- server -> client, as soon as each is ready: {"type": "partial" |
+  "final", ...} (transcribed segments, as for /api/stt/stream),
+  {"type": "reply", "text"} (LLM text deltas),
+  binary frames (PCM 16-bit audio of each reply sentence), then
+  {"type": "done", "transcript", "reply", "response_ms", "timeline"};
+- if a stage (STT, LLM, TTS) fails: {"type": "error", "detail"},
+  then the server closes the connection (code 1011).
+"""
+
+import asyncio
+import contextlib
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+
+from app.config import settings
+from app.routers.stt import receive_audio
+from app.services.llm import LLMClient, LLMError, get_llm
+from app.services.stt import SttService, get_stt_service
+from app.services.tts import TtsService, get_tts_service
+from app.services.voice_turn import VoiceTurn
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/voice", tags=["voice"])
+
+
+def failure_detail(exc: Exception) -> str:
+    """Client-facing cause of a failed turn (stage errors come as an ExceptionGroup)."""
+    if isinstance(exc, LLMError) or (
+        isinstance(exc, ExceptionGroup) and exc.subgroup(LLMError) is not None
+    ):
+        return "reply generation failed"
+    return "voice turn failed"
+
+
+@router.websocket("/turn")
+async def turn(
+    websocket: WebSocket,
+    stt: Annotated[SttService, Depends(get_stt_service)],
+    llm: Annotated[LLMClient, Depends(get_llm)],
+    tts: Annotated[TtsService, Depends(get_tts_service)],
+) -> None:
+    """Tour vocal : transcription, reponse du LLM et audio, en flux continu."""
+    await websocket.accept()
+    voice_turn = VoiceTurn(stt, llm, tts, max_tokens=settings.VOICE_TURN_MAX_TOKENS)
+    await websocket.send_json({"type": "start", "sample_rate": tts.sample_rate})
+    receiver = asyncio.create_task(receive_audio(websocket, voice_turn))
+    summary: dict = {}
+    try:
+        async for event in voice_turn.events():
+            if isinstance(event, bytes):
+                await websocket.send_bytes(event)
+            elif event["type"] == "done":
+                summary = event
+            else:
+                await websocket.send_json(event)
+        if await receiver:
+            await websocket.send_json(summary)
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as exc:
+        # STT before the stages start, LLM / TTS inside them (ExceptionGroup)
+        logger.exception("voice turn failed")
+        with contextlib.suppress(WebSocketDisconnect, RuntimeError):
+            await websocket.send_json({"type": "error", "detail": failure_detail(exc)})
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        receiver.cancel()
+        with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect):
+            await receiver
@@ -0,0 +1,21 @@
+"""Kompetens API schemas -- re-export all Pydantic models for convenience."""
+
+from app.schemas.embeddings import RequeteEmbeddings, ResultatEmbeddings, StatsEmbeddings
+from app.schemas.labels import LabelResolu, ResultatLabels
+from app.schemas.matching import CandidatMatching, RechercheMatching, ResultatMatching
+from app.schemas.stt import StatsStt
+from app.schemas.tts import RequeteTts, StatsTts
+
+__all__ = [
+    "RechercheMatching",
+    "CandidatMatching",
+    "ResultatMatching",
+    "RequeteEmbeddings",
+    "ResultatEmbeddings",
+    "StatsEmbeddings",
+    "LabelResolu",
+    "ResultatLabels",
+    "StatsStt",
+    "RequeteTts",
+    "StatsTts",
+]
@@ -0,0 +1,36 @@
+"""Embedding schemas -- batch text encoding request and vectors."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class RequeteEmbeddings(BaseModel):
+    """Lot de textes a encoder.
+
+    ``kind`` choisit le prefixe e5 : "query" pour un besoin recherche,
+    "passage" pour un contenu indexe (profil, offre).
+    """
+
+    texts: list[str] = Field(min_length=1, max_length=256)
+    kind: Literal["query", "passage"] = "query"
+
+
+class ResultatEmbeddings(BaseModel):
+    """Vecteurs normalises, dans l'ordre des textes."""
+
+    model: str
+    dimension: int
+    embeddings: list[list[float]]
+
+
+class StatsEmbeddings(BaseModel):
+    """Compteurs du cache d'embeddings et du micro-batching."""
+
+    model: str
+    cache_lookups: int
+    cache_memory_hits: int
+    cache_store_hits: int
+    cache_hit_rate: float
+    batches: int
+    mean_batch_size: float
@@ -0,0 +1,28 @@
+"""Label search schemas -- free-text label resolution results."""
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class LabelResolu(BaseModel):
+    """Label du referentiel correspondant au texte recherche.
+
+    ``source`` : emergent (referentiel emergent), competence ou appellation
+    (ROME). ``ranks`` donne le rang du label dans chaque recherche
+    (lexical, fulltext, vector) qui l'a trouve.
+    """
+
+    source: Literal["emergent", "competence", "appellation"]
+    id: str
+    label: str
+    rome_code: str | None = None
+    score: float
+    ranks: dict[str, int]
+
+
+class ResultatLabels(BaseModel):
+    """Labels resolus, meilleur score RRF en premier."""
+
+    query: str
+    results: list[LabelResolu]
@@ -0,0 +1,74 @@
+"""Matching schemas -- recruiter search request and anonymised results."""
+
+import uuid
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.config import settings
+
+
+class RechercheMatching(BaseModel):
+    """Requete de recherche recruteur.
+
+    Le besoin est exprime soit en texte (encode par le service d'embedding,
+    avec cache), soit directement sous forme de vecteur (meme espace
+    vectoriel que les profils), avec des filtres optionnels.
+    """
+
+    texte: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=2000,
+        description="Besoin en langage naturel (Ex: conducteur d'engins, permis C)",
+    )
+    embedding: list[float] | None = Field(
+        default=None,
+        description="Vecteur du besoin (e5-multilingual, dim EMBEDDING_DIMENSION)",
+    )
+    zone_geographique: str | None = Field(default=None, description="Ex: Noumea, Kone")
+    disponibilite: str | None = Field(default=None, description="Ex: immediate, 1 mois")
+    limit: int = Field(default=20, ge=1, le=100)
+    min_score: float | None = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Similarite cosinus minimale (defaut: MATCHING_MIN_SCORE)",
+    )
+    ef_search: int | None = Field(
+        default=None,
+        ge=1,
+        le=1000,
+        description="Taille de la liste candidate HNSW (defaut: MATCHING_EF_SEARCH)",
+    )
+
+    @field_validator("embedding")
+    @classmethod
+    def check_dimension(cls, value: list[float] | None) -> list[float] | None:
+        if value is not None and len(value) != settings.EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"embedding must have {settings.EMBEDDING_DIMENSION} dimensions, got {len(value)}"
+            )
+        return value
+
+    @model_validator(mode="after")
+    def check_need(self) -> "RechercheMatching":
+        if (self.texte is None) == (self.embedding is None):
+            raise ValueError("exactly one of texte or embedding is required")
+        return self
+
+
+class CandidatMatching(BaseModel):
+    """Profil candidat anonymise retourne au recruteur (aucune donnee identifiante)."""
+
+    profile_id: uuid.UUID
+    score: float
+    zone_geographique: str | None = None
+    disponibilite: str | None = None
+    competences: list[str] = []
+
+
+class ResultatMatching(BaseModel):
+    """Resultat d'une recherche de matching."""
+
+    results: list[CandidatMatching]
+    ef_search: int
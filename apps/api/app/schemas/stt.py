@@ -0,0 +1,17 @@
+"""STT schemas -- scheduler counters of the streaming dictation."""
+
+from pydantic import BaseModel
+
+
+class StatsStt(BaseModel):
+    """Compteurs de l'ordonnanceur STT (file, lots, temps reel)."""
+
+    model: str
+    queue_depth: int
+    partials: int
+    finals: int
+    skipped_partials: int
+    batches: int
+    mean_batch_size: float
+    mean_queue_wait_ms: float
+    real_time_factor: float
@@ -0,0 +1,28 @@
+"""TTS schemas -- speech synthesis request and counters."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class RequeteTts(BaseModel):
+    """Texte a prononcer.
+
+    ``format`` : "wav" (en-tete WAV puis PCM, lisible directement par le
+    navigateur) ou "pcm" (PCM 16 bits little-endian brut, pour un lecteur
+    Web Audio ; en-tetes X-Audio-Format: s16le et X-Sample-Rate).
+    """
+
+    text: str = Field(min_length=1, max_length=2000)
+    format: Literal["wav", "pcm"] = "wav"
+
+
+class StatsTts(BaseModel):
+    """Compteurs du cache de phrases et de la synthese."""
+
+    model: str
+    sample_rate: int
+    sentences: int
+    cache_hits: int
+    cache_hit_rate: float
+    real_time_factor: float
@@ -0,0 +1,167 @@
+"""Clustering engine -- groups skill label embeddings on a sparse k-NN graph.
+
+Agglomerative clustering over a full similarity matrix is O(n^2) in memory
+(100k labels -> 40 GB of float32). Here every label is linked only to its k
+nearest neighbours, found with an ANN index (hnswlib HNSW; exact blocked
+search when hnswlib is not installed), so memory stays O(n * (d + k)):
+
+1. k-NN graph: for each label, its k most similar labels (cosine).
+2. Edges below the threshold (0.85) are dropped; the others are processed
+   by decreasing similarity, merging clusters with a union-find.
+3. Two clusters are merged only if their centroids are also above the
+   threshold (centroid linkage): a chain of close pairs
+   ("soudure" ~ "soudure TIG" ~ "soudage inox" ~ ...) cannot glue unrelated
+   labels together the way single linkage would.
+
+Vectors must be L2-normalized float32 rows (what the embedding service
+returns). Requires numpy (ML extras: pip install -e ".[ml]").
+"""
+
+import logging
+from typing import Literal
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_K = 10
+# Similarity scores kept in memory at once by the exact search (~256 MB)
+EXACT_BLOCK_BUDGET = 64 * 1024 * 1024
+
+KnnBackend = Literal["auto", "hnsw", "exact"]
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Exact top-k of each query row against the corpus rows (inner product).
+
+    Blocked matrix products: at most EXACT_BLOCK_BUDGET scores are held in
+    memory at once, whatever the sizes. Returns (indexes, similarities),
+    both of shape (len(queries), k), best first.
+    """
+    n = len(queries)
+    k = min(k, len(corpus))
+    indexes = np.empty((n, k), dtype=np.int64)
+    sims = np.empty((n, k), dtype=np.float32)
+    block = max(1, EXACT_BLOCK_BUDGET // max(len(corpus), 1))
+    for start in range(0, n, block):
+        scores = queries[start : start + block] @ corpus.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        indexes[start : start + block] = np.take_along_axis(top, order, axis=1)
+        sims[start : start + block] = np.take_along_axis(top_scores, order, axis=1)
+    return indexes, sims
+
+
+def exact_knn(vectors: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Exact k-NN of every vector among all vectors (itself included)."""
+    return top_k(vectors, vectors, k)
+
+
+def hnsw_knn(
+    vectors: np.ndarray,
+    k: int,
+    m: int = 16,
+    ef_construction: int = 200,
+    threads: int = -1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Approximate k-NN with an in-memory hnswlib HNSW index (inner product)."""
+    import hnswlib
+
+    n, dim = vectors.shape
+    k = min(k, n)
+    index = hnswlib.Index(space="ip", dim=dim)
+    index.init_index(max_elements=n, M=m, ef_construction=ef_construction)
+    index.add_items(vectors, np.arange(n), num_threads=threads)
+    # ef must be >= k; 4k keeps recall close to exact at these sizes
+    index.set_ef(max(4 * k, 50))
+    neighbors, distances = index.knn_query(vectors, k=k, num_threads=threads)
+    return neighbors.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+
+def build_knn_graph(
+    vectors: np.ndarray, k: int = DEFAULT_K, backend: KnnBackend = "auto"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return (neighbors, similarities), both of shape (n, k), best first."""
+    if backend == "auto":
+        try:
+            import hnswlib  # noqa: F401
+
+            backend = "hnsw"
+        except ImportError:
+            backend = "exact"
+    logger.info("k-NN graph: %d vectors, k=%d, backend=%s", len(vectors), k, backend)
+    if backend == "hnsw":
+        return hnsw_knn(vectors, k)
+    return exact_knn(vectors, k)
+
+
+def cluster_knn_graph(
+    vectors: np.ndarray,
+    neighbors: np.ndarray,
+    sims: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """Cluster the k-NN graph; return a cluster id (0..c-1) per vector.
+
+    ``weights`` (e.g. label frequencies) weight the centroids, so that a
+    frequent label pulls its cluster's centroid more than a rare typo.
+    """
+    n, k = neighbors.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    weights = np.ones(n, dtype=np.float32) if weights is None else weights.astype(np.float32)
+
+    # Undirected edges above the threshold, each pair once, strongest first
+    rows = np.repeat(np.arange(n), k)
+    cols = neighbors.ravel()
+    scores = sims.ravel()
+    keep = (scores >= threshold) & (cols != rows) & (cols >= 0)
+    a = np.minimum(rows[keep], cols[keep])
+    b = np.maximum(rows[keep], cols[keep])
+    pairs, first = np.unique(a * n + b, return_index=True)
+    order = np.argsort(-scores[keep][first], kind="stable")
+    edges_a = (pairs[order] // n).tolist()
+    edges_b = (pairs[order] % n).tolist()
+
+    parent = list(range(n))
+    size = [1] * n
+    sums = vectors.astype(np.float32) * weights[:, None]
+
+    def find(i: int) -> int:
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    merges = 0
+    for i, j in zip(edges_a, edges_b, strict=True):
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            continue
+        si, sj = sums[ri], sums[rj]
+        centroid_sim = float(si @ sj) / float(np.linalg.norm(si) * np.linalg.norm(sj) or 1.0)
+        if centroid_sim < threshold:
+            continue
+        if size[ri] < size[rj]:
+            ri, rj = rj, ri
+        parent[rj] = ri
+        size[ri] += size[rj]
+        sums[ri] += sums[rj]
+        merges += 1
+
+    roots = np.fromiter((find(i) for i in range(n)), dtype=np.int64, count=n)
+    _, labels = np.unique(roots, return_inverse=True)
+    logger.info(
+        "clustering: %d vectors, %d edges >= %.2f, %d merges -> %d clusters",
+        n,
+        len(edges_a),
+        threshold,
+        merges,
+        n - merges,
+    )
+    return labels
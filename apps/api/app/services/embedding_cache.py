@@ -0,0 +1,200 @@
+"""Embedding cache -- content-addressed vectors shared by every embedding path.
+
+The same labels ("conduite d'engins", "soudure") recur across thousands of
+extracted_skills, competences and profile resumes. CachedEmbedder sits in
+front of the EmbeddingService and looks vectors up by
+sha256(model, e5 kind, normalized text):
+
+1. an in-process LRU (``max_memory_entries`` vectors);
+2. the embedding_cache table (halfvec, migration 009), shared by the API,
+   the clustering script and every worker;
+3. the model, for the remaining misses only (deduplicated).
+
+Texts are normalized before hashing *and* before encoding (NFC, collapsed
+whitespace; case is kept, e5 reads it), so spacing variants of a text share
+one entry. Vectors are kept in half precision, like the halfvec column:
+every path (memory, store, model) returns the model's vector rounded to
+float16, so a hit and a miss of the same text give the same vector.
+"""
+
+import hashlib
+import struct
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Collection
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.db.session import async_session_factory, read_session_factory
+from app.models import EmbeddingCache
+from app.services.embeddings import EmbeddingKind, EmbeddingService, get_embedding_service
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace (case is meaningful to the model)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def to_half(vector: list[float]) -> bytes:
+    """Pack a vector as float16 (the precision of the halfvec column)."""
+    return struct.pack(f"<{len(vector)}e", *vector)
+
+
+def from_half(packed: bytes) -> list[float]:
+    return list(struct.unpack(f"<{len(packed) // 2}e", packed))
+
+
+def embedding_key(model: str, kind: EmbeddingKind, normalized_text: str) -> str:
+    """Return the cache key (sha256 hex) of one text."""
+    payload = "\x1f".join((model, kind, normalized_text))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Compteurs de hits du cache d'embeddings."""
+
+    memory_hits: int = 0
+    store_hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.store_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.store_hits) / self.lookups if self.lookups else 0.0
+
+
+class EmbeddingStore(Protocol):
+    """Stockage persistant des vecteurs (cle -> vecteur)."""
+
+    async def get_many(self, keys: Collection[str]) -> dict[str, list[float]]: ...
+
+    async def put_many(self, model: str, vectors: dict[str, list[float]]) -> None: ...
+
+
+class PostgresEmbeddingStore:
+    """EmbeddingStore backed by embedding_cache; lookups are plain reads.
+
+    Lookups go through ``read_session_factory`` (the replica when one is
+    configured): a vector written moments ago and not replicated yet is a
+    miss, recomputed and inserted again as a no-op.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+
+    async def get_many(self, keys: Collection[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        stmt = select(EmbeddingCache.key, EmbeddingCache.embedding).where(
+            EmbeddingCache.key.in_(list(keys))
+        )
+        async with self.read_session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+        return {row.key: row.embedding for row in rows}
+
+    async def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+        stmt = (
+            insert(EmbeddingCache)
+            .values([{"key": k, "model": model, "embedding": v} for k, v in vectors.items()])
+            .on_conflict_do_nothing(index_elements=[EmbeddingCache.key])
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+class CachedEmbedder:
+    """Embeddings avec cache memoire LRU + cache persistant, meme API que EmbeddingService."""
+
+    def __init__(
+        self,
+        service: EmbeddingService,
+        store: EmbeddingStore | None = None,
+        max_memory_entries: int = 50_000,
+    ) -> None:
+        self.service = service
+        self.store = store
+        self.max_memory_entries = max_memory_entries
+        self.stats = CacheStats()
+        # float16 bytes: 2 KB per 1024-d vector instead of ~33 KB as a list
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+
+    @property
+    def dimension(self) -> int:
+        return self.service.dimension
+
+    @property
+    def model_name(self) -> str:
+        return self.service.model_name
+
+    def _remember(self, key: str, vector: list[float]) -> list[float]:
+        # Misses and store hits alike are returned rounded to float16
+        packed = self._memory[key] = to_half(vector)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+        return from_half(packed)
+
+    async def embed(self, texts: list[str], kind: EmbeddingKind) -> list[list[float]]:
+        """Embed texts, encoding only those found in neither cache."""
+        normalized = [normalize_text(t) for t in texts]
+        keys = [embedding_key(self.model_name, kind, n) for n in normalized]
+        found: dict[str, list[float]] = {}
+
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = from_half(self._memory[key])
+        self.stats.memory_hits += len(found)
+
+        missing = {k: n for k, n in zip(keys, normalized, strict=True) if k not in found}
+        if missing and self.store is not None:
+            stored = await self.store.get_many(missing.keys())
+            self.stats.store_hits += len(stored)
+            for key, vector in stored.items():
+                found[key] = self._remember(key, vector)
+                del missing[key]
+
+        if missing:
+            self.stats.misses += len(missing)
+            vectors = await self.service.embed(list(missing.values()), kind)
+            fresh = dict(zip(missing, vectors, strict=True))
+            for key, vector in fresh.items():
+                found[key] = self._remember(key, vector)
+            if self.store is not None:
+                await self.store.put_many(self.model_name, fresh)
+
+        return [found[key] for key in keys]
+
+    async def embed_query(self, text: str) -> list[float]:
+        return (await self.embed([text], "query"))[0]
+
+    async def embed_passage(self, text: str) -> list[float]:
+        return (await self.embed([text], "passage"))[0]
+
+
+@lru_cache
+def get_embedder() -> CachedEmbedder:
+    """Dependency FastAPI -- embeddings avec cache partage (memoire + Postgres)."""
+    return CachedEmbedder(
+        get_embedding_service(),
+        PostgresEmbeddingStore(async_session_factory, read_session_factory),
+        max_memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+    )
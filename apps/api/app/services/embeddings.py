@@ -0,0 +1,274 @@
+"""Embedding service -- in-process e5-multilingual encoder with micro-batching.
+
+Callers ask for one or a few texts at a time; the service coalesces every
+concurrent request into micro-batches (up to ``max_batch_size`` texts,
+waiting at most ``max_wait_ms`` for the batch to fill) and runs inference in
+a worker thread pool, so the event loop is never blocked by the model.
+
+e5 models expect a prefix on every input: "query: " for what is searched
+(a recruiter need), "passage: " for what is indexed (profiles, offers). For
+symmetric tasks such as clustering labels, use "query" on both sides.
+
+Backends:
+- sentence-transformers (EMBEDDING_BACKEND=sentence-transformers): the real
+  model, optional dependency (pip install -e ".[ml]").
+- hashing (EMBEDDING_BACKEND=hashing): deterministic character-trigram
+  feature hashing, pure Python. A CPU stand-in for tests and development
+  without the model; vectors are not comparable with e5 vectors.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal, Protocol
+
+from app.config import settings
+from app.metrics import observe_inference
+
+logger = logging.getLogger(__name__)
+
+EmbeddingKind = Literal["query", "passage"]
+E5_PREFIXES: dict[str, str] = {"query": "query: ", "passage": "passage: "}
+
+
+class Encoder(Protocol):
+    """Modele d'embedding synchrone (appele dans un thread du pool)."""
+
+    name: str
+    dimension: int
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        """Return one L2-normalized vector per text."""
+        ...
+
+
+class SentenceTransformerEncoder:
+    """Encoder sentence-transformers (e5-multilingual en production)."""
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 32) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise RuntimeError(
+                "sentence-transformers is not installed. "
+                'Install the ML extras: pip install -e ".[ml]"'
+            ) from exc
+        self.name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+
+class HashingEncoder:
+    """Encoder de substitution : hachage de trigrammes de caracteres (CPU, deterministe)."""
+
+    def __init__(self, dimension: int = 1024) -> None:
+        self.name = f"hashing-{dimension}"
+        self.dimension = dimension
+
+    def _encode_one(self, text: str) -> list[float]:
+        for prefix in E5_PREFIXES.values():
+            text = text.removeprefix(prefix)
+        decomposed = unicodedata.normalize("NFKD", text.lower())
+        folded = " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+        padded = f" {folded} "
+        vector = [0.0] * self.dimension
+        for i in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[i : i + 3].encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "big") % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        return [self._encode_one(t) for t in texts]
+
+
+@dataclass
+class BatchStats:
+    """Compteurs du micro-batching."""
+
+    requests: int = 0
+    texts: int = 0
+    batches: int = 0
+    encode_s: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
+
+
+_Pending = tuple[str, asyncio.Future]
+
+
+class EmbeddingService:
+    """Moteur d'embedding : file d'attente, micro-lots, pool de threads."""
+
+    def __init__(
+        self,
+        encoder: Encoder,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        workers: int = 1,
+    ) -> None:
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.workers = workers
+        self.stats = BatchStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+        self._queue: asyncio.Queue[_Pending] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def dimension(self) -> int:
+        return self.encoder.dimension
+
+    @property
+    def model_name(self) -> str:
+        return self.encoder.name
+
+    # -- public API ---------------------------------------------------------
+
+    async def embed(self, texts: list[str], kind: EmbeddingKind) -> list[list[float]]:
+        """Embed texts with the e5 prefix of ``kind``; vectors come back in order.
+
+        Any number of texts can be passed: they are split into micro-batches
+        together with the texts of concurrent callers.
+        """
+        if not texts:
+            return []
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        futures: list[asyncio.Future] = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((E5_PREFIXES[kind] + text, future))
+            futures.append(future)
+        self.stats.requests += 1
+        return list(await asyncio.gather(*futures))
+
+    async def embed_query(self, text: str) -> list[float]:
+        return (await self.embed([text], "query"))[0]
+
+    async def embed_passage(self, text: str) -> list[float]:
+        return (await self.embed([text], "passage"))[0]
+
+    async def warmup(self) -> None:
+        """Encode one text outside the stats (first-call costs paid upfront)."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.encoder.encode, ["query: warmup"])
+
+    async def aclose(self) -> None:
+        """Stop the batching loop and the thread pool."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- batching -----------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        # (Re)start on first use and whenever the running loop changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._loop_task is None or self._loop_task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.workers)
+            self._loop_task = asyncio.create_task(self._batch_loop(), name="embedding-batcher")
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            # At most ``workers`` batches encode at once; the next batch keeps
+            # filling while they run
+            await self._slots.acquire()
+            task = asyncio.create_task(self._encode_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _encode_batch(self, batch: list[_Pending]) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            with observe_inference("embeddings", self.model_name):
+                vectors = await loop.run_in_executor(
+                    self._executor, self.encoder.encode, [text for text, _ in batch]
+                )
+        except Exception as exc:
+            logger.exception("embedding batch of %d texts failed", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            self._slots.release()
+        self.stats.batches += 1
+        self.stats.texts += len(batch)
+        self.stats.encode_s += loop.time() - started
+        for (_, future), vector in zip(batch, vectors, strict=True):
+            if not future.done():
+                future.set_result(vector)
+
+
+def build_encoder(backend: str | None = None) -> Encoder:
+    """Instantiate the encoder configured by EMBEDDING_BACKEND."""
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "hashing":
+        return HashingEncoder(settings.EMBEDDING_DIMENSION)
+    if backend == "sentence-transformers":
+        return SentenceTransformerEncoder(
+            settings.EMBEDDING_MODEL, device=settings.EMBEDDING_DEVICE
+        )
+    raise ValueError(f"unknown EMBEDDING_BACKEND: {backend!r}")
+
+
+@lru_cache
+def get_embedding_service() -> EmbeddingService:
+    """Dependency FastAPI -- service d'embedding partage (charge au premier appel)."""
+    encoder = build_encoder()
+    if encoder.dimension != settings.EMBEDDING_DIMENSION:
+        raise RuntimeError(
+            f"{encoder.name} produces {encoder.dimension}-d vectors, "
+            f"EMBEDDING_DIMENSION is {settings.EMBEDDING_DIMENSION}"
+        )
+    return EmbeddingService(
+        encoder,
+        max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+        max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+        workers=settings.EMBEDDING_WORKERS,
+    )
@@ -0,0 +1,198 @@
+"""Label search -- hybrid lexical + vector resolution of free-text skill labels.
+
+Voice transcriptions give fuzzy, colloquial labels ("les gros camions",
+"le menage"). Each source (emergent skills, ROME competences, ROME
+appellations) is searched three ways, every leg served by an index
+(migration 011):
+
+- trigram word similarity on f_unaccent(label): typos, partial words;
+- French full-text on to_tsvector('french_unaccent', label): stemming
+  ("soudeur" ~ "souder"), accents ignored;
+- cosine similarity on the label embedding (HNSW): synonyms and paraphrases.
+
+The three legs run as one SQL statement (one round trip) and return their
+top candidates with a rank; the ranks are fused with reciprocal rank fusion
+(RRF): score = sum over legs of 1 / (k + rank). RRF needs no score
+calibration across legs, and a label found by several legs goes up.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    CompoundSelect,
+    String,
+    bindparam,
+    cast,
+    func,
+    literal,
+    literal_column,
+    select,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import BindParameter, ColumnElement
+
+from app.config import settings
+from app.models import EmergentSkill, RomeAppellation, RomeCompetence
+
+LabelSource = Literal["emergent", "competence", "appellation"]
+SearchLeg = Literal["lexical", "fulltext", "vector"]
+
+ALL_SOURCES: tuple[LabelSource, ...] = ("emergent", "competence", "appellation")
+# unaccent + French stemming (migration 011)
+TS_CONFIG = literal_column("'french_unaccent'::regconfig")
+
+
+@dataclass
+class LabelMatch:
+    """Label resolu, avec son rang dans chaque recherche."""
+
+    source: LabelSource
+    id: str
+    label: str
+    rome_code: str | None
+    score: float = 0.0
+    ranks: dict[str, int] = field(default_factory=dict)
+
+
+def _columns(source: LabelSource) -> tuple[ColumnElement, ...]:
+    """(id, label, rome_code, embedding) columns of one source."""
+    if source == "emergent":
+        return (
+            cast(EmergentSkill.id, String),
+            EmergentSkill.canonical_label,
+            EmergentSkill.rome_code,
+            EmergentSkill.embedding,
+        )
+    if source == "competence":
+        return (
+            RomeCompetence.code,
+            RomeCompetence.libelle,
+            RomeCompetence.code,
+            RomeCompetence.embedding,
+        )
+    return (
+        RomeAppellation.code,
+        RomeAppellation.libelle,
+        RomeAppellation.code_rome,
+        RomeAppellation.embedding,
+    )
+
+
+def _leg(
+    leg: SearchLeg,
+    sources: Sequence[LabelSource],
+    query: BindParameter,
+    embedding: BindParameter,
+    candidates: int,
+) -> Select:
+    """Top ``candidates`` of one leg over every source, ranked 1..n."""
+    parts = []
+    for source in sources:
+        id_col, label, rome_code, vector = _columns(source)
+        if leg == "lexical":
+            # q <% label: q is similar to a word sequence of label (trigram index)
+            unaccented = func.f_unaccent(label)
+            needle = func.f_unaccent(query)
+            score = func.word_similarity(needle, unaccented)
+            condition = needle.op("<%")(unaccented)
+        elif leg == "fulltext":
+            tsvector = func.to_tsvector(TS_CONFIG, label)
+            tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+            score = func.ts_rank(tsvector, tsquery)
+            condition = tsvector.op("@@")(tsquery)
+        else:
+            score = 1 - vector.cosine_distance(embedding)
+            condition = vector.is_not(None)
+        order = vector.cosine_distance(embedding) if leg == "vector" else score.desc()
+        parts.append(
+            select(
+                literal(source).label("source"),
+                id_col.label("id"),
+                label.label("label"),
+                rome_code.label("rome_code"),
+                score.label("score"),
+            )
+            .where(condition)
+            .order_by(order)
+            .limit(candidates)
+        )
+    merged = union_all(*parts).subquery(f"{leg}_candidates")
+    rank = func.row_number().over(order_by=merged.c.score.desc())
+    return (
+        select(
+            literal(leg).label("leg"),
+            merged.c.source,
+            merged.c.id,
+            merged.c.label,
+            merged.c.rome_code,
+            rank.label("rank"),
+        )
+        .order_by(merged.c.score.desc())
+        .limit(candidates)
+    )
+
+
+def hybrid_search_statement(
+    query: str,
+    embedding: list[float] | None,
+    *,
+    sources: Sequence[LabelSource] = ALL_SOURCES,
+    candidates: int = 20,
+) -> CompoundSelect:
+    """One SQL statement returning (leg, source, id, label, rome_code, rank) rows."""
+    legs: list[SearchLeg] = ["lexical", "fulltext"]
+    if embedding is not None:
+        legs.append("vector")
+    # Named parameters: the query text and vector are sent once, not once per use
+    query_param = bindparam("query", query, type_=String)
+    embedding_param = bindparam("embedding", embedding, type_=Vector())
+    return union_all(
+        *(
+            _leg(leg, sources, query_param, embedding_param, candidates).subquery().select()
+            for leg in legs
+        )
+    )
+
+
+def reciprocal_rank_fusion(rows: Iterable, k: int = 60) -> list[LabelMatch]:
+    """Fuse ranked rows (leg, source, id, label, rome_code, rank), best first."""
+    fused: dict[tuple[str, str], LabelMatch] = {}
+    for row in rows:
+        match = fused.get((row.source, row.id))
+        if match is None:
+            match = fused[(row.source, row.id)] = LabelMatch(
+                source=row.source, id=row.id, label=row.label, rome_code=row.rome_code
+            )
+        match.ranks[row.leg] = row.rank
+    for match in fused.values():
+        match.score = sum(1.0 / (k + rank) for rank in match.ranks.values())
+    return sorted(fused.values(), key=lambda m: (-m.score, m.label))
+
+
+async def search_labels(
+    session: AsyncSession,
+    query: str,
+    embedding: list[float] | None,
+    *,
+    sources: Sequence[LabelSource] = ALL_SOURCES,
+    limit: int = 10,
+    candidates: int | None = None,
+) -> list[LabelMatch]:
+    """Resolve a free-text label against the referentials, best matches first.
+
+    ``embedding`` is the e5 "query" vector of ``query``; without it only the
+    lexical legs run.
+    """
+    stmt = hybrid_search_statement(
+        query,
+        embedding,
+        sources=sources,
+        candidates=max(candidates or settings.LABEL_SEARCH_CANDIDATES, limit),
+    )
+    rows = await session.execute(stmt)
+    return reciprocal_rank_fusion(rows, settings.LABEL_SEARCH_RRF_K)[:limit]
@@ -0,0 +1,261 @@
+"""LLM client -- async calls to the local vLLM server (OpenAI-compatible API).
+
+A single pooled httpx.AsyncClient is shared by every caller; vLLM batches
+concurrent requests on the GPU (continuous batching), so throughput comes
+from keeping many requests in flight rather than from sending big prompts.
+
+ExtractionClient adds the layer used by batch extraction:
+
+- a response cache keyed by (model, prompt version, normalized input), so
+  unchanged inputs are never sent twice (see llm_cache.py);
+- prefix-cache friendly scheduling: every request starts with the same
+  byte-identical system prompt, the first request of a client warms vLLM's
+  automatic prefix cache before the fan-out, and misses are sent sorted by
+  input so requests sharing a user-prompt prefix run side by side.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Generic, TypeVar
+
+import httpx
+
+from app.config import settings
+from app.metrics import observe_inference, record_inference
+from app.services.llm_cache import ResponseCache, cache_key, normalize_input
+
+T = TypeVar("T")
+
+
+class LLMError(RuntimeError):
+    """Reponse invalide ou erreur HTTP du serveur LLM."""
+
+
+@dataclass
+class ChatResult:
+    """Reponse d'un appel chat completions."""
+
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMClient:
+    """Client chat completions pour vLLM (API compatible OpenAI)."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        model: str | None = None,
+    ) -> None:
+        self.client = client
+        self.model = model or settings.VLLM_MODEL
+
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 512,
+        json_mode: bool = False,
+    ) -> ChatResult:
+        """Send one chat completion request and return the first choice."""
+        payload: dict = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        try:
+            with observe_inference("llm", self.model):
+                resp = await self.client.post("/chat/completions", json=payload)
+            resp.raise_for_status()
+            body = resp.json()
+            content = body["choices"][0]["message"]["content"] or ""
+        except (httpx.HTTPError, ValueError, KeyError, IndexError) as exc:
+            raise LLMError(f"chat completion failed: {exc}") from exc
+        usage = body.get("usage") or {}
+        return ChatResult(
+            content=content,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float = 0.0,
+        max_tokens: int = 512,
+    ) -> AsyncIterator[str]:
+        """Stream one chat completion (server-sent events); yield content deltas."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        # Only the generation is timed: the clock stops while the consumer
+        # holds a delta (e.g. while TTS synthesizes the sentence)
+        generation_s = 0.0
+        try:
+            started = time.perf_counter()
+            async with self.client.stream("POST", "/chat/completions", json=payload) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line.removeprefix("data:").strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta") or {}
+                    if delta.get("content"):
+                        generation_s += time.perf_counter() - started
+                        yield delta["content"]
+                        started = time.perf_counter()
+            generation_s += time.perf_counter() - started
+        except (httpx.HTTPError, ValueError, KeyError, IndexError) as exc:
+            raise LLMError(f"chat completion stream failed: {exc}") from exc
+        record_inference("llm", self.model, generation_s)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Prompt versionne.
+
+    ``version`` fait partie de la cle de cache : l'incrementer des que le
+    prompt change de sens invalide les reponses en cache.
+    """
+
+    version: str
+    system: str
+    user: str
+    max_input_chars: int | None = None
+
+    def messages(self, text: str) -> list[dict[str, str]]:
+        """Chat messages for one input: the constant system prompt always comes first."""
+        if self.max_input_chars is not None:
+            text = text[: self.max_input_chars]
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(text=text)},
+        ]
+
+
+@dataclass
+class Completion(Generic[T]):
+    """Resultat d'une extraction : valeur analysee ou erreur."""
+
+    value: T | None = None
+    error: str | None = None
+    completion_tokens: int = 0
+    cached: bool = False
+
+
+class ExtractionClient(Generic[T]):
+    """Extraction par lots : cache de reponses + ordonnancement prefix-cache."""
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        prompt: PromptTemplate,
+        parse: Callable[[str], T],
+        cache: ResponseCache | None = None,
+        concurrency: int = 64,
+        max_tokens: int = 512,
+    ) -> None:
+        self.llm = llm
+        self.prompt = prompt
+        self.parse = parse
+        self.cache = cache
+        self.concurrency = concurrency
+        self.max_tokens = max_tokens
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._warmup_lock = asyncio.Lock()
+        self._warm = False
+
+    async def _complete(self, text: str) -> tuple[Completion[T], str | None]:
+        async with self._semaphore:
+            try:
+                result = await self.llm.chat(
+                    self.prompt.messages(text), max_tokens=self.max_tokens, json_mode=True
+                )
+                value = self.parse(result.content)
+            except (LLMError, ValueError) as exc:
+                return Completion(error=str(exc)), None
+        return Completion(value=value, completion_tokens=result.completion_tokens), result.content
+
+    async def run(self, texts: list[str]) -> list[Completion[T]]:
+        """Extract every text; answers come back in input order.
+
+        Identical (normalized) inputs are sent once. Only answers that parse
+        are cached, so a malformed answer is retried on the next run.
+        """
+        inputs = [normalize_input(t) for t in texts]
+        keys = [cache_key(self.llm.model, self.prompt.version, i) for i in inputs]
+        done: dict[str, Completion[T]] = {}
+
+        if self.cache is not None:
+            for key, content in (await self.cache.get_many(set(keys))).items():
+                try:
+                    done[key] = Completion(value=self.parse(content), cached=True)
+                except ValueError:
+                    continue
+
+        pending = {k: i for k, i in zip(keys, inputs, strict=True) if k not in done}
+        # Sorted by input: requests sharing a prefix are scheduled together
+        misses = sorted(pending.items(), key=lambda item: item[1])
+        fresh: dict[str, str] = {}
+
+        async def complete(key: str, text: str) -> None:
+            done[key], content = await self._complete(text)
+            if content is not None:
+                fresh[key] = content
+
+        if misses and not self._warm:
+            # Concurrent requests cannot share prefix blocks that are not
+            # computed yet: send one request alone so the rest hit the cache
+            async with self._warmup_lock:
+                if not self._warm:
+                    await complete(*misses.pop(0))
+                    self._warm = True
+        async with asyncio.TaskGroup() as tg:
+            for key, text in misses:
+                tg.create_task(complete(key, text))
+
+        if self.cache is not None and fresh:
+            await self.cache.put_many(self.llm.model, self.prompt.version, fresh)
+        return [done[key] for key in keys]
+
+
+def make_llm_client(
+    base_url: str | None = None,
+    max_connections: int = 128,
+    timeout_s: float = 120.0,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Build the pooled HTTP client for vLLM, sized for high in-flight concurrency."""
+    return httpx.AsyncClient(
+        base_url=base_url or settings.VLLM_BASE_URL,
+        timeout=timeout_s,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        # vLLM does not require an API key by default
+        headers={"Authorization": "Bearer not-needed"},
+        transport=transport,
+    )
+
+
+@lru_cache
+def get_llm() -> LLMClient:
+    """Dependency FastAPI -- client vLLM partage (pool de connexions du processus)."""
+    return LLMClient(make_llm_client())
@@ -0,0 +1,149 @@
+"""LLM response cache -- persistent, size-bounded cache of LLM answers.
+
+Entries are keyed by sha256(model, prompt version, normalized input): the
+same input sent with the same prompt to the same model is answered from the
+cache, whatever the code around it changed. Bumping a prompt's version (or
+changing model) naturally misses, and stale entries age out through LRU
+eviction on last_used_at.
+"""
+
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Collection
+from typing import Protocol
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import LlmResponseCache
+
+
+def normalize_input(text: str) -> str:
+    """NFC-normalize and collapse whitespace, keeping line breaks.
+
+    Reposts, re-exports and re-transcriptions of the same text often differ
+    only by spacing; they must hit the same cache entry.
+    """
+    lines = (" ".join(line.split()) for line in unicodedata.normalize("NFC", text).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(model: str, prompt_version: str, normalized_input: str) -> str:
+    """Return the cache key (sha256 hex) of one request."""
+    payload = "\x1f".join((model, prompt_version, normalized_input))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache(Protocol):
+    """Cache des reponses LLM (cle -> contenu brut)."""
+
+    async def get_many(self, keys: Collection[str]) -> dict[str, str]: ...
+
+    async def put_many(self, model: str, prompt_version: str, entries: dict[str, str]) -> None: ...
+
+
+class MemoryResponseCache:
+    """In-process LRU ResponseCache, bounded to ``max_entries``."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, str] = OrderedDict()
+
+    async def get_many(self, keys: Collection[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        for key in keys:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                found[key] = self.entries[key]
+        return found
+
+    async def put_many(self, model: str, prompt_version: str, entries: dict[str, str]) -> None:
+        for key, response in entries.items():
+            self.entries[key] = response
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class PostgresResponseCache:
+    """ResponseCache backed by llm_response_cache, shared by every worker.
+
+    Lookups are plain SELECTs; the hits are then touched (last_used_at,
+    hits) in one batched UPDATE that locks rows in key order and skips rows
+    locked by another worker, so concurrent workers never deadlock and
+    never wait on a touch. Eviction deletes everything past the
+    ``max_entries`` most recently used rows; it runs every ``evict_every``
+    writes and on demand via evict().
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_entries: int = 200_000,
+        evict_every: int = 50,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._writes = 0
+
+    async def get_many(self, keys: Collection[str]) -> dict[str, str]:
+        if not keys:
+            return {}
+        lookup = select(LlmResponseCache.key, LlmResponseCache.response).where(
+            LlmResponseCache.key.in_(list(keys))
+        )
+        async with self.session_factory() as session:
+            found = {row.key: row.response for row in await session.execute(lookup)}
+            if found:
+                # LRU touch, best effort: a row another worker holds keeps its date
+                locked = (
+                    select(LlmResponseCache.key)
+                    .where(LlmResponseCache.key.in_(list(found)))
+                    .order_by(LlmResponseCache.key)
+                    .with_for_update(skip_locked=True)
+                    .cte("locked")
+                )
+                await session.execute(
+                    update(LlmResponseCache)
+                    .where(LlmResponseCache.key == locked.c.key)
+                    .values(last_used_at=func.now(), hits=LlmResponseCache.hits + 1)
+                )
+            await session.commit()
+        return found
+
+    async def put_many(self, model: str, prompt_version: str, entries: dict[str, str]) -> None:
+        if not entries:
+            return
+        stmt = insert(LlmResponseCache).values(
+            [
+                {"key": key, "model": model, "prompt_version": prompt_version, "response": resp}
+                # Rows locked in key order, like the lookups' touch
+                for key, resp in sorted(entries.items())
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LlmResponseCache.key],
+            set_={"response": stmt.excluded.response, "last_used_at": func.now()},
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+        self._writes += 1
+        if self._writes % self.evict_every == 0:
+            await self.evict()
+
+    async def evict(self) -> int:
+        """Delete least recently used entries beyond max_entries; return rows deleted."""
+        stale = (
+            select(LlmResponseCache.key)
+            .order_by(LlmResponseCache.last_used_at.desc())
+            .offset(self.max_entries)
+        )
+        stmt = delete(LlmResponseCache).where(LlmResponseCache.key.in_(stale))
+        async with self.session_factory() as session:
+            deleted = (await session.execute(stmt)).rowcount
+            await session.commit()
+        return deleted
@@ -0,0 +1,132 @@
+"""Matching service -- ANN search over profiles.embedding (pgvector HNSW).
+
+The ORDER BY embedding <=> :query LIMIT k query is served by the
+ix_profiles_embedding_hnsw index (migration 003). Recall is tuned per query
+with hnsw.ef_search, and pgvector's iterative scan keeps filtered queries
+(zone, disponibilite) from returning fewer than k rows. In relaxed_order mode
+the scan may return rows slightly out of order, so the index scan runs in a
+materialized CTE and the outer query sorts by distance again.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Competence, Profile
+
+
+@dataclass
+class ProfileMatch:
+    """Profil trouve par la recherche semantique."""
+
+    profile_id: uuid.UUID
+    score: float
+    zone_geographique: str | None
+    disponibilite: str | None
+    competences: list[str] = field(default_factory=list)
+
+
+async def configure_hnsw(session: AsyncSession, ef_search: int) -> None:
+    """Set the HNSW search parameters for the current transaction only."""
+    await session.execute(
+        text("SELECT set_config('hnsw.ef_search', :ef, true)"),
+        {"ef": str(ef_search)},
+    )
+    if settings.MATCHING_ITERATIVE_SCAN != "off":
+        await session.execute(
+            text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+            {"mode": settings.MATCHING_ITERATIVE_SCAN},
+        )
+
+
+def nearest_profiles_query(
+    embedding: list[float],
+    *,
+    zone_geographique: str | None = None,
+    disponibilite: str | None = None,
+    limit: int = 20,
+) -> Select:
+    """Build the ANN query: an HNSW index scan re-sorted by exact distance."""
+    distance = Profile.embedding.cosine_distance(embedding)
+    scan = (
+        select(
+            Profile.id,
+            Profile.zone_geographique,
+            Profile.disponibilite,
+            distance.label("distance"),
+        )
+        .where(Profile.embedding.is_not(None))
+        .order_by(distance)
+        .limit(limit)
+    )
+    if zone_geographique:
+        scan = scan.where(Profile.zone_geographique == zone_geographique)
+    if disponibilite:
+        scan = scan.where(Profile.disponibilite == disponibilite)
+
+    # MATERIALIZED keeps the planner from inlining the CTE, so the inner
+    # ORDER BY ... LIMIT is still served by the index
+    nearest = scan.cte("nearest").prefix_with("MATERIALIZED")
+    return select(nearest).order_by(nearest.c.distance)
+
+
+async def search_profiles(
+    session: AsyncSession,
+    embedding: list[float],
+    *,
+    zone_geographique: str | None = None,
+    disponibilite: str | None = None,
+    limit: int = 20,
+    min_score: float | None = None,
+    ef_search: int | None = None,
+) -> tuple[list[ProfileMatch], int]:
+    """Return the profiles closest to ``embedding`` and the ef_search used.
+
+    ``ef_search`` is never lower than ``limit``: HNSW cannot return more rows
+    than its candidate list.
+    """
+    ef = max(ef_search or settings.MATCHING_EF_SEARCH, limit)
+    threshold = settings.MATCHING_MIN_SCORE if min_score is None else min_score
+
+    await configure_hnsw(session, ef)
+
+    rows = (
+        await session.execute(
+            nearest_profiles_query(
+                embedding,
+                zone_geographique=zone_geographique,
+                disponibilite=disponibilite,
+                limit=limit,
+            )
+        )
+    ).all()
+
+    # Threshold applied after the index scan so the planner keeps the
+    # ORDER BY ... LIMIT shape that HNSW can serve.
+    matches = [
+        ProfileMatch(
+            profile_id=row.id,
+            score=round(1.0 - row.distance, 4),
+            zone_geographique=row.zone_geographique,
+            disponibilite=row.disponibilite,
+        )
+        for row in rows
+        if 1.0 - row.distance >= threshold
+    ]
+    if not matches:
+        return [], ef
+
+    # One round trip for the competence labels of every matched profile
+    labels_stmt = (
+        select(Competence.profile_id, func.array_agg(Competence.label))
+        .where(Competence.profile_id.in_([m.profile_id for m in matches]))
+        .group_by(Competence.profile_id)
+    )
+    labels = dict((await session.execute(labels_stmt)).all())
+    for match in matches:
+        match.competences = sorted(labels.get(match.profile_id, []))
+
+    return matches, ef
@@ -0,0 +1,194 @@
+"""Model registry -- loads, warms and releases the in-process models.
+
+Every model-backed service (embeddings, STT, ...) is a process-wide
+singleton behind an ``lru_cache`` getter, which is also its FastAPI
+dependency. Without the registry the first request pays for loading the
+weights (tens of seconds for Whisper large-v3) and for the first inference
+(CUDA context, kernel selection). The registry, driven by the lifespan:
+
+1. loads the models listed in MODEL_PRELOAD at startup, one after the
+   other, in a worker thread;
+2. warms each one with a dummy inference;
+3. records load time, warm-up time and the memory each load added;
+4. closes the loaded models at shutdown.
+
+A model that fails to load is reported as "failed" (with the error) rather
+than aborting startup: routes that do not need it keep working.
+
+Models live in the worker process: run the API with a single uvicorn
+worker per GPU and scale with the services' own batching and thread pools,
+not with ``--workers`` (each worker would load its own copy).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Literal, Protocol
+
+from app.services.embedding_cache import get_embedder
+from app.services.embeddings import get_embedding_service
+from app.services.stt import get_stt_service
+from app.services.tts import get_tts_service
+
+logger = logging.getLogger(__name__)
+
+ModelStatus = Literal["pending", "loading", "ready", "failed"]
+
+
+class ManagedModel(Protocol):
+    """Service portant un modele (singleton du processus)."""
+
+    model_name: str
+
+    async def warmup(self) -> None:
+        """Run one dummy inference (first-call costs paid at startup)."""
+        ...
+
+    async def aclose(self) -> None: ...
+
+
+@dataclass
+class ModelInfo:
+    """Etat et cout de chargement d'un modele."""
+
+    name: str
+    status: ModelStatus = "pending"
+    model: str | None = None
+    load_s: float = 0.0
+    warmup_s: float = 0.0
+    # Memory added by the load (resident set; CUDA allocator when torch is used)
+    rss_bytes: int | None = None
+    gpu_bytes: int | None = None
+    error: str | None = None
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size of the process (Linux), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def gpu_bytes() -> int | None:
+    """CUDA memory held by torch, if torch is loaded and a GPU is present.
+
+    CTranslate2 (faster-whisper) allocates outside torch: its GPU memory is
+    not seen here.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return torch.cuda.memory_allocated()
+
+
+def _delta(before: int | None, after: int | None) -> int | None:
+    return after - before if before is not None and after is not None else None
+
+
+class ModelRegistry:
+    """Registre des modeles du processus : chargement, prechauffage, liberation."""
+
+    def __init__(self) -> None:
+        self._getters: dict[str, Callable[[], ManagedModel]] = {}
+        self._dependents: dict[str, tuple[Callable[[], object], ...]] = {}
+        self._infos: dict[str, ModelInfo] = {}
+
+    def register(
+        self,
+        name: str,
+        getter: Callable[[], ManagedModel],
+        dependents: tuple[Callable[[], object], ...] = (),
+    ) -> None:
+        """Register the ``lru_cache`` getter (FastAPI dependency) of a model.
+
+        ``dependents`` are ``lru_cache`` getters of objects wrapping the
+        model (e.g. the cached embedder): cleared with it on close.
+        """
+        self._getters[name] = getter
+        self._dependents[name] = dependents
+        self._infos[name] = ModelInfo(name)
+
+    def is_loaded(self, name: str) -> bool:
+        return self._getters[name].cache_info().currsize > 0
+
+    def info(self) -> list[ModelInfo]:
+        for name, info in self._infos.items():
+            if info.status == "pending" and self.is_loaded(name):
+                # Not preloaded, loaded by a first request
+                info.status = "ready"
+                info.model = self._getters[name]().model_name
+        return list(self._infos.values())
+
+    async def load(self, name: str, warmup: bool = True) -> ModelInfo:
+        """Load (once) and warm one model; never raises, see ``status``."""
+        info = self._infos[name]
+        if info.status == "ready":
+            return info
+        info.status = "loading"
+        rss, gpu = rss_bytes(), gpu_bytes()
+        started = time.perf_counter()
+        try:
+            # Loading reads weights and may compile kernels: keep it off the loop
+            model = await asyncio.to_thread(self._getters[name])
+            info.load_s = time.perf_counter() - started
+            if warmup:
+                started = time.perf_counter()
+                await model.warmup()
+                info.warmup_s = time.perf_counter() - started
+        except Exception as exc:
+            logger.exception("model %s failed to load", name)
+            info.status = "failed"
+            info.error = f"{type(exc).__name__}: {exc}"
+            return info
+        info.model = model.model_name
+        info.rss_bytes = _delta(rss, rss_bytes())
+        info.gpu_bytes = _delta(gpu, gpu_bytes())
+        info.status = "ready"
+        info.error = None
+        logger.info(
+            "model %s (%s) ready: load %.1fs, warm-up %.2fs",
+            name,
+            info.model,
+            info.load_s,
+            info.warmup_s,
+        )
+        return info
+
+    async def load_all(self, names: Iterable[str], warmup: bool = True) -> list[ModelInfo]:
+        """Load models one after the other (memory deltas stay per model)."""
+        names = list(names)
+        unknown = set(names) - set(self._getters)
+        if unknown:
+            raise ValueError(f"unknown models in MODEL_PRELOAD: {sorted(unknown)}")
+        return [await self.load(name, warmup) for name in names]
+
+    async def aclose(self) -> None:
+        """Release every loaded model (preloaded or loaded on first use)."""
+        for name, getter in self._getters.items():
+            if self.is_loaded(name):
+                await getter().aclose()
+                getter.cache_clear()
+                self._infos[name] = ModelInfo(name)
+            # A wrapper would keep handing out the closed model
+            for dependent in self._dependents[name]:
+                dependent.cache_clear()
+
+    def as_dict(self) -> dict:
+        return {"pid": os.getpid(), "models": [asdict(info) for info in self.info()]}
+
+
+@lru_cache
+def get_model_registry() -> ModelRegistry:
+    """Registre des modeles du processus."""
+    registry = ModelRegistry()
+    registry.register("embeddings", get_embedding_service, dependents=(get_embedder,))
+    registry.register("stt", get_stt_service)
+    registry.register("tts", get_tts_service)
+    return registry
@@ -0,0 +1,145 @@
+"""Near-duplicate detection for job offers -- MinHash signatures with LSH banding.
+
+The same NC offer is often reposted on emploi.nc, in DTEFP exports, on
+Facebook and by aidants, with small wording or formatting changes ("URGENT",
+accents dropped, a phone number added). Offers are compared on their sets of
+word 3-shingles: two offers whose Jaccard similarity is at least
+MIN_JACCARD are treated as the same offer.
+
+Each offer gets a MinHash signature of NUM_PERM values, cut into BANDS bands
+of ROWS values; each band is hashed to one BIGINT and stored in
+raw_offers.minhash_bands (GIN-indexed, migration 006). Offers sharing at
+least one band are candidates (found with the && array-overlap operator),
+and candidates are confirmed with the exact Jaccard similarity. With 16
+bands of 4 rows, a pair at J=0.7 becomes a candidate with p ~ 0.99, while
+unrelated offers almost never collide -- lookups stay sub-linear.
+"""
+
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+MIN_JACCARD = 0.7
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Fixed seed: fingerprints must be stable across runs and processes
+_rng = random.Random(20260218)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+@dataclass
+class OfferFingerprint:
+    """Empreinte d'une offre : shingles (verification) et bandes LSH (index)."""
+
+    shingles: frozenset[str]
+    bands: list[int]
+
+
+def normalize_text(text: str) -> list[str]:
+    """Lowercase, strip accents and punctuation; return the word list."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return _WORD_RE.findall(folded)
+
+
+def shingles(text: str) -> frozenset[str]:
+    """Return the set of word SHINGLE_SIZE-grams of the text."""
+    words = normalize_text(text)
+    if len(words) < SHINGLE_SIZE:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(
+        " ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+    )
+
+
+def _hash32(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "big")
+
+
+def minhash_signature(shingle_set: Iterable[str]) -> list[int]:
+    """Return the NUM_PERM MinHash values of a shingle set."""
+    hashes = [_hash32(s) for s in shingle_set]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_bands(signature: list[int]) -> list[int]:
+    """Hash each band of ROWS signature values to a signed 64-bit integer.
+
+    The band position is part of the hash, so equal values in different
+    bands never collide.
+    """
+    bands: list[int] = []
+    for i in range(BANDS):
+        packed = struct.pack(f">H{ROWS}I", i, *signature[i * ROWS : (i + 1) * ROWS])
+        digest = hashlib.blake2b(packed, digest_size=8).digest()
+        bands.append(int.from_bytes(digest, "big", signed=True))
+    return bands
+
+
+def fingerprint(text: str) -> OfferFingerprint:
+    shingle_set = shingles(text)
+    return OfferFingerprint(shingles=shingle_set, bands=lsh_bands(minhash_signature(shingle_set)))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def assign_duplicates(
+    new: list[tuple[uuid.UUID, OfferFingerprint]],
+    candidates: Iterable[tuple[uuid.UUID, OfferFingerprint]],
+    min_jaccard: float = MIN_JACCARD,
+) -> dict[uuid.UUID, uuid.UUID]:
+    """Map each near-duplicate offer of ``new`` to its canonical offer id.
+
+    ``candidates`` are canonical offers already stored. Offers of ``new``
+    are processed in order, so the first copy of a repost inside a batch
+    becomes the canonical one for the following copies.
+    """
+    buckets: dict[int, list[tuple[uuid.UUID, OfferFingerprint]]] = {}
+
+    def add(offer_id: uuid.UUID, fp: OfferFingerprint) -> None:
+        for band in fp.bands:
+            buckets.setdefault(band, []).append((offer_id, fp))
+
+    for offer_id, fp in candidates:
+        add(offer_id, fp)
+
+    duplicates: dict[uuid.UUID, uuid.UUID] = {}
+    for offer_id, fp in new:
+        best_id, best_score = None, min_jaccard
+        seen: set[uuid.UUID] = set()
+        for band in fp.bands:
+            for other_id, other_fp in buckets.get(band, []):
+                if other_id in seen:
+                    continue
+                seen.add(other_id)
+                score = jaccard(fp.shingles, other_fp.shingles)
+                if score >= best_score:
+                    best_id, best_score = other_id, score
+        if best_id is None:
+            add(offer_id, fp)
+        else:
+            duplicates[offer_id] = best_id
+    return duplicates
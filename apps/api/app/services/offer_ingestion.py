@@ -0,0 +1,582 @@
+"""Offer ingestion service -- async collection of NC job offers into raw_offers.
+
+One shared httpx.AsyncClient (connection pool) serves every source; each
+source has its own concurrency limit so a slow site cannot starve the
+others. Listing pages are fetched with conditional GETs (ETag /
+If-Modified-Since), offers already stored are skipped by source_url, and new
+offers are written in batches. Each batch is checked for near-duplicates
+of offers already stored (reposts across sources, see near_duplicates.py);
+offers stored before near-duplicate detection get their LSH bands
+backfilled first (PostgresOfferStore.backfill_bands).
+
+Used by scripts/collect_offers.py (make collect-offers).
+"""
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Protocol
+from urllib.parse import urljoin
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import OfferFetchCache, RawOffer
+from app.services.near_duplicates import OfferFingerprint, assign_duplicates, fingerprint, shingles
+
+logger = logging.getLogger(__name__)
+
+# The 33 communes of New Caledonia, used to tag an offer's zone
+NC_COMMUNES = [
+    "Belep",
+    "Boulouparis",
+    "Bourail",
+    "Canala",
+    "Dumbea",
+    "Farino",
+    "Hienghene",
+    "Houailou",
+    "Ile des Pins",
+    "Kaala-Gomen",
+    "Kone",
+    "Kouaoua",
+    "Koumac",
+    "La Foa",
+    "Lifou",
+    "Mare",
+    "Moindou",
+    "Mont-Dore",
+    "Noumea",
+    "Ouegoa",
+    "Ouvea",
+    "Paita",
+    "Poindimie",
+    "Ponerihouen",
+    "Pouebo",
+    "Pouembout",
+    "Poum",
+    "Poya",
+    "Sarramea",
+    "Thio",
+    "Touho",
+    "Voh",
+    "Yate",
+]
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CollectedOffer:
+    """Offre prete a etre inseree dans raw_offers."""
+
+    source: str
+    source_url: str | None
+    text: str
+    zone: str | None = None
+    sector: str | None = None
+
+
+@dataclass
+class FetchValidators:
+    """Validateurs HTTP d'une URL pour les GET conditionnels."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass
+class OfferSource:
+    """Source d'offres HTTP (ex: emploi_nc).
+
+    ``parse_listing`` turns a listing page into offer URLs, ``parse_offer``
+    turns an offer page into a CollectedOffer (or None to skip it).
+    """
+
+    name: str
+    listing_urls: list[str]
+    parse_listing: Callable[[str, str], list[str]]
+    parse_offer: Callable[[str, str, str], CollectedOffer | None]
+    max_concurrency: int = 4
+
+
+@dataclass
+class SourceStats:
+    """Compteurs de collecte pour une source."""
+
+    listings_fetched: int = 0
+    listings_not_modified: int = 0
+    offers_seen: int = 0
+    offers_known: int = 0
+    offers_fetched: int = 0
+    offers_inserted: int = 0
+    offers_duplicates: int = 0
+    errors: int = 0
+    elapsed_s: float = 0.0
+    # Error that stopped the source (e.g. the database), None if it completed
+    failure: str | None = None
+
+    @property
+    def offers_per_s(self) -> float:
+        return self.offers_fetched / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Parsing helpers
+# ---------------------------------------------------------------------------
+
+_HREF_RE = re.compile(r"""href\s*=\s*["']([^"'#]+)["']""", re.IGNORECASE)
+
+
+def extract_links(base_url: str, html: str, pattern: str) -> list[str]:
+    """Return the absolute URLs of links matching ``pattern``, in page order."""
+    link_re = re.compile(pattern)
+    links: dict[str, None] = {}
+    for href in _HREF_RE.findall(html):
+        url = urljoin(base_url, href)
+        if link_re.search(url):
+            links[url] = None
+    return list(links)
+
+
+class _TextExtractor(HTMLParser):
+    """Collect visible text, skipping script/style/nav blocks."""
+
+    _SKIP = {"script", "style", "nav", "header", "footer", "noscript"}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in self._SKIP:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth and data.strip():
+            self.parts.append(data.strip())
+
+
+def html_to_text(html: str) -> str:
+    """Strip tags from an offer page and collapse whitespace."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    return re.sub(r"\s+", " ", " ".join(parser.parts)).strip()
+
+
+def _fold(value: str) -> str:
+    """Lowercase and strip accents (Nouméa -> noumea)."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+_COMMUNE_RES = [
+    (commune, re.compile(rf"\b{re.escape(_fold(commune))}\b")) for commune in NC_COMMUNES
+]
+
+
+def detect_zone(text: str) -> str | None:
+    """Return the first NC commune mentioned in ``text``."""
+    folded = _fold(text)
+    for commune, commune_re in _COMMUNE_RES:
+        if commune_re.search(folded):
+            return commune
+    return None
+
+
+def html_offer_parser(source: str) -> Callable[[str, str, str], CollectedOffer | None]:
+    """Default offer parser: page text as offer text, zone from commune names."""
+
+    def parse(url: str, html: str, content_type: str) -> CollectedOffer | None:
+        text = html_to_text(html) if "html" in content_type else html.strip()
+        if not text:
+            return None
+        return CollectedOffer(source=source, source_url=url, text=text, zone=detect_zone(text))
+
+    return parse
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class OfferStore(Protocol):
+    """Persistance des offres et des validateurs HTTP."""
+
+    async def known_urls(self, urls: Iterable[str]) -> set[str]: ...
+
+    async def get_validators(self, url: str) -> FetchValidators | None: ...
+
+    async def save_validators(self, url: str, validators: FetchValidators) -> None: ...
+
+    async def save_offers(self, offers: list[CollectedOffer]) -> tuple[int, int]:
+        """Store a batch; return (inserted, of which near-duplicates)."""
+        ...
+
+
+class PostgresOfferStore:
+    """OfferStore backed by raw_offers / offer_fetch_cache."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+        # Sources flush concurrently: serialize so that two copies of the same
+        # offer in different batches cannot both be stored as canonical
+        self._save_lock = asyncio.Lock()
+
+    async def known_urls(self, urls: Iterable[str]) -> set[str]:
+        urls = list(urls)
+        if not urls:
+            return set()
+        async with self.session_factory() as session:
+            stmt = select(RawOffer.source_url).where(RawOffer.source_url.in_(urls))
+            return set((await session.scalars(stmt)).all())
+
+    async def get_validators(self, url: str) -> FetchValidators | None:
+        async with self.session_factory() as session:
+            entry = await session.get(OfferFetchCache, url)
+            if entry is None:
+                return None
+            return FetchValidators(etag=entry.etag, last_modified=entry.last_modified)
+
+    async def save_validators(self, url: str, validators: FetchValidators) -> None:
+        stmt = insert(OfferFetchCache).values(
+            url=url,
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OfferFetchCache.url],
+            set_={
+                "etag": stmt.excluded.etag,
+                "last_modified": stmt.excluded.last_modified,
+                "checked_at": stmt.excluded.checked_at,
+            },
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def save_offers(self, offers: list[CollectedOffer]) -> tuple[int, int]:
+        """Insert a batch; duplicates on source_url are ignored.
+
+        Near-duplicates of a canonical offer (stored or earlier in the batch)
+        get duplicate_of set and are stored as processed, so the LLM only
+        extracts skills from the canonical copy. Canonical offers are
+        inserted first: copies then point at the id actually stored under
+        their canonical's URL (see resolve_canonicals).
+        """
+        if not offers:
+            return 0, 0
+        new = [(uuid.uuid4(), fingerprint(o.text)) for o in offers]
+        all_bands = sorted({band for _, fp in new for band in fp.bands})
+        batch_urls = {offer_id: o.source_url for o, (offer_id, _) in zip(offers, new, strict=True)}
+
+        def rows(canonical: dict[uuid.UUID, uuid.UUID | None]) -> list[dict]:
+            return [
+                {
+                    "id": offer_id,
+                    "source": o.source,
+                    "source_url": o.source_url,
+                    "text": o.text,
+                    "zone": o.zone,
+                    "sector": o.sector,
+                    "minhash_bands": fp.bands,
+                    "duplicate_of": canonical[offer_id],
+                    "processed": canonical[offer_id] is not None,
+                }
+                for o, (offer_id, fp) in zip(offers, new, strict=True)
+                if offer_id in canonical
+            ]
+
+        async with self._save_lock, self.session_factory() as session:
+            stmt = select(RawOffer.id, RawOffer.text, RawOffer.minhash_bands).where(
+                RawOffer.duplicate_of.is_(None),
+                RawOffer.minhash_bands.overlap(all_bands),
+            )
+            candidates = [
+                (row.id, OfferFingerprint(shingles=shingles(row.text), bands=row.minhash_bands))
+                for row in await session.execute(stmt)
+            ]
+            duplicates = assign_duplicates(new, candidates)
+
+            stored = await self._insert_offers(
+                session,
+                rows({offer_id: None for offer_id, _ in new if offer_id not in duplicates}),
+            )
+            inserted = len(stored)
+            # In-batch canonicals dropped by ON CONFLICT (source_url): their
+            # URL is already stored, under another id
+            canonical_urls = {batch_urls[c] for c in duplicates.values() if c in batch_urls}
+            dropped = canonical_urls - stored.keys()
+            if dropped:
+                existing = select(
+                    RawOffer.source_url, func.coalesce(RawOffer.duplicate_of, RawOffer.id)
+                ).where(RawOffer.source_url.in_(dropped))
+                stored.update((await session.execute(existing)).tuples().all())
+
+            resolved = resolve_canonicals(duplicates, batch_urls, stored)
+            copies = await self._insert_offers(
+                session, rows({offer_id: resolved.get(offer_id) for offer_id in duplicates})
+            )
+            await session.commit()
+
+        inserted += len(copies)
+        return inserted, len(set(copies.values()) & resolved.keys())
+
+    @staticmethod
+    async def _insert_offers(session: AsyncSession, rows: list[dict]) -> dict[str, uuid.UUID]:
+        """Insert rows in one statement; return source_url -> id of the rows inserted."""
+        if not rows:
+            return {}
+        stmt = (
+            insert(RawOffer)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[RawOffer.source_url])
+            .returning(RawOffer.source_url, RawOffer.id)
+        )
+        return dict((await session.execute(stmt)).tuples().all())
+
+    async def backfill_bands(self, batch_size: int = 500) -> int:
+        """Compute minhash_bands for offers stored without them; return the count.
+
+        Offers stored before migration 006 are otherwise never found as
+        candidates. Only the bands are written: those offers may already
+        have been extracted, so they are not flagged as duplicates.
+        """
+        filled = 0
+        while True:
+            async with self._save_lock, self.session_factory() as session:
+                stmt = (
+                    select(RawOffer.id, RawOffer.text)
+                    .where(RawOffer.minhash_bands.is_(None))
+                    .limit(batch_size)
+                )
+                batch = (await session.execute(stmt)).all()
+                if not batch:
+                    return filled
+                await session.execute(
+                    update(RawOffer),
+                    [
+                        {"id": row.id, "minhash_bands": fingerprint(row.text).bands}
+                        for row in batch
+                    ],
+                )
+                await session.commit()
+            filled += len(batch)
+
+
+def resolve_canonicals(
+    duplicates: dict[uuid.UUID, uuid.UUID],
+    batch_urls: dict[uuid.UUID, str],
+    stored: dict[str, uuid.UUID],
+) -> dict[uuid.UUID, uuid.UUID]:
+    """Map each near-duplicate to the id of a canonical offer that is stored.
+
+    ``duplicates`` comes from assign_duplicates; a canonical that is part of
+    the batch (``batch_urls``: id -> source_url) is replaced by the id
+    stored under its URL (``stored``), which differs when the insert was
+    skipped on a source_url conflict. A copy whose canonical is not stored
+    is kept as canonical itself.
+    """
+    resolved: dict[uuid.UUID, uuid.UUID] = {}
+    for offer_id, canonical_id in duplicates.items():
+        if canonical_id in batch_urls:
+            canonical_id = stored.get(batch_urls[canonical_id])
+        if canonical_id is not None and canonical_id != offer_id:
+            resolved[offer_id] = canonical_id
+    return resolved
+
+
+# ---------------------------------------------------------------------------
+# Collector
+# ---------------------------------------------------------------------------
+
+
+class OfferCollector:
+    """Moteur de collecte asynchrone, concurrence bornee par source."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        store: OfferStore,
+        batch_size: int = 100,
+    ) -> None:
+        self.client = client
+        self.store = store
+        self.batch_size = batch_size
+
+    async def fetch(self, url: str, conditional: bool) -> httpx.Response | None:
+        """GET ``url``; return None when the server answers 304 Not Modified.
+
+        The response's validators are not saved here: a listing's are saved
+        by ``collect_source`` once all of its offers are stored.
+        """
+        headers: dict[str, str] = {}
+        if conditional:
+            validators = await self.store.get_validators(url)
+            if validators is not None:
+                if validators.etag:
+                    headers["If-None-Match"] = validators.etag
+                if validators.last_modified:
+                    headers["If-Modified-Since"] = validators.last_modified
+
+        resp = await self.client.get(url, headers=headers)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        return resp
+
+    async def collect_source(self, source: OfferSource) -> SourceStats:
+        """Collect every new offer of one source."""
+        stats = SourceStats()
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(source.max_concurrency)
+        pending: list[CollectedOffer] = []
+        flush_lock = asyncio.Lock()
+        # listing url -> (offer urls, validators to save once they are stored)
+        listings: dict[str, tuple[list[str], FetchValidators]] = {}
+        failed: set[str] = set()
+
+        async def flush(force: bool = False) -> None:
+            async with flush_lock:
+                if pending and (force or len(pending) >= self.batch_size):
+                    batch = pending[:]
+                    pending.clear()
+                    inserted, duplicates = await self.store.save_offers(batch)
+                    stats.offers_inserted += inserted
+                    stats.offers_duplicates += duplicates
+
+        async def fetch_listing(url: str) -> list[str]:
+            async with semaphore:
+                try:
+                    resp = await self.fetch(url, conditional=True)
+                except httpx.HTTPError as exc:
+                    logger.warning("[%s] listing %s failed: %s", source.name, url, exc)
+                    stats.errors += 1
+                    return []
+            if resp is None:
+                stats.listings_not_modified += 1
+                return []
+            stats.listings_fetched += 1
+            try:
+                links = source.parse_listing(url, resp.text)
+            except Exception as exc:
+                # A malformed page skips this listing, not the source
+                logger.warning("[%s] listing %s unparsable: %r", source.name, url, exc)
+                stats.errors += 1
+                return []
+            etag, last_modified = resp.headers.get("etag"), resp.headers.get("last-modified")
+            if etag or last_modified:
+                listings[url] = (links, FetchValidators(etag, last_modified))
+            return links
+
+        async def fetch_offer(url: str) -> None:
+            async with semaphore:
+                try:
+                    resp = await self.fetch(url, conditional=False)
+                except httpx.HTTPError as exc:
+                    logger.warning("[%s] offer %s failed: %s", source.name, url, exc)
+                    stats.errors += 1
+                    failed.add(url)
+                    return
+            stats.offers_fetched += 1
+            try:
+                offer = source.parse_offer(url, resp.text, resp.headers.get("content-type", ""))
+            except Exception as exc:
+                logger.warning("[%s] offer %s unparsable: %r", source.name, url, exc)
+                stats.errors += 1
+                failed.add(url)
+                return
+            if offer is not None:
+                pending.append(offer)
+                await flush()
+
+        async with asyncio.TaskGroup() as tg:
+            listing_tasks = [tg.create_task(fetch_listing(u)) for u in source.listing_urls]
+
+        # Dedupe within the run (dict keeps page order) and against raw_offers
+        offer_urls = list(dict.fromkeys(u for t in listing_tasks for u in t.result()))
+        stats.offers_seen = len(offer_urls)
+        known = await self.store.known_urls(offer_urls)
+        stats.offers_known = len(known)
+
+        async with asyncio.TaskGroup() as tg:
+            for url in offer_urls:
+                if url not in known:
+                    tg.create_task(fetch_offer(url))
+        await flush(force=True)
+
+        # Only now are the listings' offers stored: a listing with a failed
+        # offer keeps its old validators, so the next run fetches it again
+        for url, (links, validators) in listings.items():
+            if failed.isdisjoint(links):
+                await self.store.save_validators(url, validators)
+
+        stats.elapsed_s = time.perf_counter() - started
+        logger.info(
+            "[%s] %d offers seen, %d known, %d fetched, %d inserted "
+            "(%d near-duplicates), %d errors in %.2fs (%.1f offers/s)",
+            source.name,
+            stats.offers_seen,
+            stats.offers_known,
+            stats.offers_fetched,
+            stats.offers_inserted,
+            stats.offers_duplicates,
+            stats.errors,
+            stats.elapsed_s,
+            stats.offers_per_s,
+        )
+        return stats
+
+    async def collect_isolated(self, source: OfferSource) -> SourceStats:
+        """``collect_source``, with an error stopping this source only.
+
+        Per-offer errors are counted by ``collect_source``; what escapes it
+        (a database error while storing a batch) is reported in ``failure``.
+        """
+        try:
+            return await self.collect_source(source)
+        except Exception as exc:
+            logger.exception("[%s] collection failed", source.name)
+            return SourceStats(errors=1, failure=repr(exc))
+
+    async def collect(self, sources: list[OfferSource]) -> dict[str, SourceStats]:
+        """Collect all sources concurrently; return stats per source name."""
+        async with asyncio.TaskGroup() as tg:
+            tasks = {s.name: tg.create_task(self.collect_isolated(s)) for s in sources}
+        return {name: task.result() for name, task in tasks.items()}
+
+
+def make_client(
+    max_connections: int = 32,
+    timeout_s: float = 30.0,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Build the shared, pooled HTTP client used by the collector."""
+    return httpx.AsyncClient(
+        timeout=timeout_s,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        headers={"User-Agent": "kompetens-collector/0.1"},
+        transport=transport,
+    )
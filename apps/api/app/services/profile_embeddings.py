@@ -0,0 +1,57 @@
+"""Profile embeddings -- (re)compute profiles.embedding from resume and skills.
+
+Each profile is encoded as an e5 "passage" built from its competence labels
+and its LLM resume, through the shared CachedEmbedder: unchanged profiles
+and recurring texts are never re-encoded.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Competence, Profile
+from app.services.embedding_cache import CachedEmbedder
+
+
+def profile_passage(resume_text: str | None, labels: list[str]) -> str:
+    """Text embedded for a profile: skills first, then the resume."""
+    parts = []
+    if labels:
+        parts.append("Competences : " + ", ".join(sorted(labels)))
+    if resume_text:
+        parts.append(resume_text)
+    return "\n".join(parts)
+
+
+async def refresh_profile_embeddings(
+    session: AsyncSession,
+    embedder: CachedEmbedder,
+    *,
+    only_missing: bool = True,
+    batch_size: int = 64,
+) -> int:
+    """Embed profiles (only those without a vector by default); return profiles updated."""
+    labels = func.array_remove(func.array_agg(Competence.label), None)
+    stmt = (
+        select(Profile.id, Profile.resume_text, labels.label("labels"))
+        .outerjoin(Competence, Competence.profile_id == Profile.id)
+        .group_by(Profile.id)
+        .order_by(Profile.id)
+    )
+    if only_missing:
+        stmt = stmt.where(Profile.embedding.is_(None))
+    passages = {
+        row.id: passage
+        for row in await session.execute(stmt)
+        if (passage := profile_passage(row.resume_text, row.labels))
+    }
+
+    ids = list(passages)
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start : start + batch_size]
+        vectors = await embedder.embed([passages[i] for i in chunk], "passage")
+        await session.execute(
+            update(Profile),
+            [{"id": i, "embedding": v} for i, v in zip(chunk, vectors, strict=True)],
+        )
+    await session.commit()
+    return len(ids)
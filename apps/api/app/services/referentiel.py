@@ -0,0 +1,450 @@
+"""Emergent referential -- from extracted_skills labels to emergent_skills rows.
+
+Labels are grouped by their normalized form (lowercase, collapsed
+whitespace) directly in SQL, so the builder handles one row per distinct
+label rather than one per extracted skill. Each cluster found by the
+clustering engine becomes one EmergentSkill: canonical label, variants,
+frequency, sectors and zones.
+
+Emergent skill ids are derived from the canonical label (uuid5), so a
+rebuild keeps the ids (and the ROME alignment) of skills that did not
+change.
+
+Incremental mode: new labels (extracted skills not linked yet) are looked
+up against emergent_skills.embedding (HNSW) and attached to their nearest
+skill above the threshold. The others stay in the pending pool, which is
+clustered on its own; pending clusters cited by enough offers become new
+emergent skills, smaller ones wait for the next run.
+"""
+
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Text, column, func, literal_column, select, table, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models import EmergentSkill, ExtractedSkill, RawOffer
+from app.services.matching import configure_hnsw
+
+WRITE_CHUNK = 1000
+
+
+def label_key(label: ColumnElement[str]) -> ColumnElement[str]:
+    """SQL normalization of a label: trimmed, lowercase, single spaces."""
+    return func.lower(func.regexp_replace(func.btrim(label), r"\s+", " ", "g"))
+
+
+def emergent_skill_id(key: str) -> uuid.UUID:
+    """Deterministic id of the emergent skill whose canonical label has this key."""
+    return uuid.uuid5(uuid.NAMESPACE_DNS, f"kompetens.nc.emergent_skill.{key}")
+
+
+@dataclass
+class LabelGroup:
+    """Toutes les occurrences d'un meme label normalise."""
+
+    key: str
+    label: str
+    frequency: int
+    sectors: Counter = field(default_factory=Counter)
+    zones: Counter = field(default_factory=Counter)
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+
+
+@dataclass
+class SkillCluster:
+    """Cluster de labels -> une ligne emergent_skills."""
+
+    id: uuid.UUID
+    canonical_label: str
+    variant_labels: list[str]
+    frequency: int
+    sectors: list[str]
+    zones: list[str]
+    embedding: list[float]
+    keys: list[str]
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+
+
+async def load_label_groups(
+    session: AsyncSession, only_unassigned: bool = False
+) -> list[LabelGroup]:
+    """Aggregate extracted_skills per normalized label (one SQL round trip).
+
+    ``frequency`` is the number of distinct offers using the label; the
+    displayed label is its most common spelling.
+    """
+    key = label_key(ExtractedSkill.label).label("key")
+    stmt = (
+        select(
+            key,
+            func.mode().within_group(ExtractedSkill.label).label("label"),
+            func.count(func.distinct(ExtractedSkill.offer_id)).label("frequency"),
+            func.array_remove(func.array_agg(RawOffer.sector), None).label("sectors"),
+            func.array_remove(func.array_agg(RawOffer.zone), None).label("zones"),
+            func.min(ExtractedSkill.created_at).label("first_seen"),
+            func.max(ExtractedSkill.created_at).label("last_seen"),
+        )
+        .join(RawOffer, RawOffer.id == ExtractedSkill.offer_id)
+        .group_by(literal_column("key"))
+        .order_by(literal_column("key"))
+    )
+    if only_unassigned:
+        stmt = stmt.where(ExtractedSkill.emergent_skill_id.is_(None))
+    return [
+        LabelGroup(
+            key=row.key,
+            label=row.label,
+            frequency=row.frequency,
+            sectors=Counter(row.sectors),
+            zones=Counter(row.zones),
+            first_seen=row.first_seen,
+            last_seen=row.last_seen,
+        )
+        for row in await session.execute(stmt)
+        if row.key
+    ]
+
+
+def _ranked(counter: Counter) -> list[str]:
+    return [name for name, _ in sorted(counter.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def build_clusters(
+    groups: list[LabelGroup], vectors: np.ndarray, cluster_ids: np.ndarray
+) -> list[SkillCluster]:
+    """Summarize each cluster of label groups, most frequent clusters first."""
+    members: dict[int, list[int]] = {}
+    for i, cluster_id in enumerate(cluster_ids.tolist()):
+        members.setdefault(cluster_id, []).append(i)
+
+    clusters: list[SkillCluster] = []
+    for indexes in members.values():
+        # Most frequent label first; shorter label on ties ("soudure" over "soudure ")
+        indexes.sort(key=lambda i: (-groups[i].frequency, len(groups[i].label), groups[i].key))
+        items = [groups[i] for i in indexes]
+        weights = np.array([g.frequency for g in items], dtype=np.float32)
+        centroid = (vectors[indexes] * weights[:, None]).sum(axis=0)
+        centroid /= np.linalg.norm(centroid) or 1.0
+        sectors: Counter = Counter()
+        zones: Counter = Counter()
+        for g in items:
+            sectors.update(g.sectors)
+            zones.update(g.zones)
+        seen = [g.first_seen for g in items if g.first_seen is not None]
+        last = [g.last_seen for g in items if g.last_seen is not None]
+        clusters.append(
+            SkillCluster(
+                id=emergent_skill_id(items[0].key),
+                canonical_label=items[0].label,
+                variant_labels=[g.label for g in items[1:]],
+                frequency=sum(g.frequency for g in items),
+                sectors=_ranked(sectors),
+                zones=_ranked(zones),
+                embedding=centroid.tolist(),
+                keys=[g.key for g in items],
+                first_seen=min(seen, default=None),
+                last_seen=max(last, default=None),
+            )
+        )
+    clusters.sort(key=lambda c: (-c.frequency, c.canonical_label))
+    return clusters
+
+
+_assignment = table("_label_assignment", column("key", Text), column("emergent_skill_id"))
+_pending = table("_pending_labels", column("key", Text), column("embedding", Vector()))
+
+
+async def _link_labels(
+    session: AsyncSession, assignments: list[tuple[str, uuid.UUID]], pending_only: bool
+) -> int:
+    """Link extracted skills to emergent skills by label key; return rows linked.
+
+    Stages (key, emergent_skill_id) in a temp table dropped at commit, then
+    one set-based UPDATE joins every extracted skill to its skill, and the
+    frequencies of the skills involved are recomputed exactly (an offer
+    citing two variants of a skill counts once).
+    """
+    await session.execute(
+        text(
+            "CREATE TEMP TABLE _label_assignment "
+            "(key text PRIMARY KEY, emergent_skill_id uuid NOT NULL) ON COMMIT DROP"
+        )
+    )
+    rows = [{"key": key, "emergent_skill_id": skill_id} for key, skill_id in assignments]
+    for start in range(0, len(rows), WRITE_CHUNK * 10):
+        await session.execute(_assignment.insert(), rows[start : start + WRITE_CHUNK * 10])
+
+    # pending_only: only the unlinked rows (ix_extracted_skills_pending)
+    linked = await session.execute(
+        text(
+            "UPDATE extracted_skills e SET emergent_skill_id = a.emergent_skill_id "
+            "FROM _label_assignment a "
+            "WHERE lower(regexp_replace(btrim(e.label), '\\s+', ' ', 'g')) = a.key "
+            + (
+                "AND e.emergent_skill_id IS NULL"
+                if pending_only
+                else "AND e.emergent_skill_id IS DISTINCT FROM a.emergent_skill_id"
+            )
+        )
+    )
+    await session.execute(
+        text(
+            "UPDATE emergent_skills s SET frequency = c.n "
+            "FROM (SELECT emergent_skill_id, count(DISTINCT offer_id) AS n "
+            "      FROM extracted_skills "
+            "      WHERE emergent_skill_id IN (SELECT emergent_skill_id FROM _label_assignment) "
+            "      GROUP BY emergent_skill_id) c "
+            "WHERE s.id = c.emergent_skill_id AND s.frequency <> c.n"
+        )
+    )
+    return linked.rowcount
+
+
+async def write_referentiel(
+    session: AsyncSession, clusters: list[SkillCluster], replace: bool = True
+) -> int:
+    """Upsert the clusters and link every extracted skill to its cluster, atomically.
+
+    With ``replace``, emergent skills absent from ``clusters`` are deleted
+    (their extracted skills are unlinked by the ON DELETE SET NULL). The
+    ROME alignment of kept skills is preserved. Returns extracted skills linked.
+
+    Without ``replace`` (pending clusters), a cluster whose id is already an
+    emergent skill (same canonical key, centroid under the threshold) is
+    merged into it instead of overwriting it.
+    """
+    written = clusters
+    if not replace:
+        written = await _merge_existing(session, clusters)
+    for start in range(0, len(written), WRITE_CHUNK):
+        chunk = written[start : start + WRITE_CHUNK]
+        stmt = insert(EmergentSkill).values(
+            [
+                {
+                    "id": c.id,
+                    "canonical_label": c.canonical_label[:255],
+                    "variant_labels": c.variant_labels,
+                    "frequency": c.frequency,
+                    "sectors": c.sectors,
+                    "zones": c.zones,
+                    "embedding": c.embedding,
+                    "first_seen": c.first_seen or func.now(),
+                    "last_seen": c.last_seen or func.now(),
+                }
+                for c in chunk
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EmergentSkill.id],
+            set_={
+                "canonical_label": stmt.excluded.canonical_label,
+                "variant_labels": stmt.excluded.variant_labels,
+                "frequency": stmt.excluded.frequency,
+                "sectors": stmt.excluded.sectors,
+                "zones": stmt.excluded.zones,
+                "embedding": stmt.excluded.embedding,
+                "first_seen": func.least(EmergentSkill.first_seen, stmt.excluded.first_seen),
+                "last_seen": func.greatest(EmergentSkill.last_seen, stmt.excluded.last_seen),
+            },
+        )
+        await session.execute(stmt)
+
+    linked = await _link_labels(
+        session, [(key, c.id) for c in clusters for key in c.keys], pending_only=not replace
+    )
+    if replace:
+        await session.execute(
+            text(
+                "DELETE FROM emergent_skills s WHERE NOT EXISTS "
+                "(SELECT 1 FROM _label_assignment a WHERE a.emergent_skill_id = s.id)"
+            )
+        )
+    await session.commit()
+    return linked
+
+
+# ---------------------------------------------------------------------------
+# Incremental assignment
+# ---------------------------------------------------------------------------
+
+
+async def nearest_skills(
+    session: AsyncSession, keys: list[str], vectors: np.ndarray, ef_search: int
+) -> list[tuple[uuid.UUID | None, float]]:
+    """Nearest emergent skill (id, cosine similarity) of each label, in order.
+
+    The labels are staged in a temp table and matched with one LATERAL
+    query: each ORDER BY embedding <=> ... LIMIT 1 is an HNSW index lookup
+    (ix_emergent_skills_embedding_hnsw), not a scan of the referential.
+    """
+    await configure_hnsw(session, ef_search)
+    await session.execute(
+        text(
+            "CREATE TEMP TABLE _pending_labels "
+            f"(key text PRIMARY KEY, embedding vector({vectors.shape[1]})) ON COMMIT DROP"
+        )
+    )
+    for start in range(0, len(keys), WRITE_CHUNK):
+        await session.execute(
+            _pending.insert(),
+            [
+                {"key": key, "embedding": vector}
+                for key, vector in zip(
+                    keys[start : start + WRITE_CHUNK],
+                    vectors[start : start + WRITE_CHUNK],
+                    strict=True,
+                )
+            ],
+        )
+    rows = await session.execute(
+        text(
+            "SELECT p.key, s.id, 1 - s.distance AS similarity FROM _pending_labels p "
+            "CROSS JOIN LATERAL (SELECT id, embedding <=> p.embedding AS distance "
+            "                    FROM emergent_skills WHERE embedding IS NOT NULL "
+            "                    ORDER BY embedding <=> p.embedding LIMIT 1) s"
+        )
+    )
+    found = {row.key: (row.id, float(row.similarity)) for row in rows}
+    return [found.get(key, (None, 0.0)) for key in keys]
+
+
+def merge_labels(skill: EmergentSkill, groups: list[LabelGroup]) -> dict[str, object]:
+    """New variant_labels / sectors / zones / last_seen of a skill gaining ``groups``."""
+    known = {
+        label_text.casefold() for label_text in [skill.canonical_label, *skill.variant_labels]
+    }
+    variants = list(skill.variant_labels)
+    for group in sorted(groups, key=lambda g: -g.frequency):
+        if group.label.casefold() not in known:
+            known.add(group.label.casefold())
+            variants.append(group.label)
+    sectors: Counter = Counter()
+    zones: Counter = Counter()
+    for group in groups:
+        sectors.update(group.sectors)
+        zones.update(group.zones)
+    last_seen = max(
+        (t for t in [skill.last_seen, *(g.last_seen for g in groups)] if t is not None),
+        default=None,
+    )
+    return {
+        "variant_labels": variants,
+        # Existing ranking kept, new sectors / zones appended by frequency
+        "sectors": [*skill.sectors, *(s for s in _ranked(sectors) if s not in skill.sectors)],
+        "zones": [*skill.zones, *(z for z in _ranked(zones) if z not in skill.zones)],
+        "last_seen": last_seen,
+    }
+
+
+def merge_cluster(skill: EmergentSkill, cluster: SkillCluster) -> dict[str, object]:
+    """New variants / sectors / zones / seen dates of a skill absorbing a cluster.
+
+    The skill keeps its canonical label, ranking and embedding; its frequency
+    is recomputed when the cluster's labels are linked.
+    """
+    known = {
+        label_text.casefold() for label_text in [skill.canonical_label, *skill.variant_labels]
+    }
+    variants = list(skill.variant_labels)
+    for label_text in [cluster.canonical_label, *cluster.variant_labels]:
+        if label_text.casefold() not in known:
+            known.add(label_text.casefold())
+            variants.append(label_text)
+    first = [t for t in (skill.first_seen, cluster.first_seen) if t is not None]
+    last = [t for t in (skill.last_seen, cluster.last_seen) if t is not None]
+    return {
+        "variant_labels": variants,
+        "sectors": [*skill.sectors, *(s for s in cluster.sectors if s not in skill.sectors)],
+        "zones": [*skill.zones, *(z for z in cluster.zones if z not in skill.zones)],
+        "first_seen": min(first, default=None),
+        "last_seen": max(last, default=None),
+    }
+
+
+async def _merge_existing(
+    session: AsyncSession, clusters: list[SkillCluster]
+) -> list[SkillCluster]:
+    """Merge clusters whose id already exists into those skills; return the others."""
+    by_id = {c.id: c for c in clusters}
+    existing = list(
+        await session.scalars(
+            select(EmergentSkill)
+            .options(
+                load_only(
+                    EmergentSkill.canonical_label,
+                    EmergentSkill.variant_labels,
+                    EmergentSkill.sectors,
+                    EmergentSkill.zones,
+                    EmergentSkill.first_seen,
+                    EmergentSkill.last_seen,
+                )
+            )
+            .where(EmergentSkill.id.in_(list(by_id)))
+        )
+    )
+    if existing:
+        updates = [{"id": skill.id, **merge_cluster(skill, by_id[skill.id])} for skill in existing]
+        # ORM bulk UPDATE by primary key (executemany)
+        await session.execute(update(EmergentSkill), updates)
+    merged = {skill.id for skill in existing}
+    return [c for c in clusters if c.id not in merged]
+
+
+async def assign_labels(
+    session: AsyncSession,
+    groups: list[LabelGroup],
+    vectors: np.ndarray,
+    threshold: float,
+    ef_search: int,
+) -> tuple[int, list[int]]:
+    """Attach new labels to their nearest emergent skill when similar enough.
+
+    Matched skills get the new variants, sectors, zones, last_seen and an
+    exact frequency, in bulk and in one transaction. Returns the number of
+    extracted skills linked and the indexes of the groups left pending.
+    """
+    nearest = await nearest_skills(session, [g.key for g in groups], vectors, ef_search)
+    matched: dict[uuid.UUID, list[LabelGroup]] = {}
+    pending: list[int] = []
+    for i, (skill_id, similarity) in enumerate(nearest):
+        if skill_id is not None and similarity >= threshold:
+            matched.setdefault(skill_id, []).append(groups[i])
+        else:
+            pending.append(i)
+    if not matched:
+        await session.commit()
+        return 0, pending
+
+    linked = await _link_labels(
+        session,
+        [(g.key, skill_id) for skill_id, items in matched.items() for g in items],
+        pending_only=True,
+    )
+    skills = await session.scalars(
+        select(EmergentSkill)
+        .options(
+            load_only(
+                EmergentSkill.canonical_label,
+                EmergentSkill.variant_labels,
+                EmergentSkill.sectors,
+                EmergentSkill.zones,
+                EmergentSkill.last_seen,
+            )
+        )
+        .where(EmergentSkill.id.in_(select(_assignment.c.emergent_skill_id)))
+    )
+    updates = [{"id": skill.id, **merge_labels(skill, matched[skill.id])} for skill in skills]
+    # ORM bulk UPDATE by primary key (executemany)
+    await session.execute(update(EmergentSkill), updates)
+    await session.commit()
+    return linked, pending
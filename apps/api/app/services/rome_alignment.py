@@ -0,0 +1,269 @@
+"""ROME alignment -- maps every emergent skill to its closest ROME v4 entry.
+
+The ROME stays in the background (interoperability): an emergent skill gets
+a rome_code / rome_label only when its embedding is close enough (cosine >
+0.8) to a ROME competence or appellation label.
+
+The whole referential is aligned in one batch:
+
+1. every rome_competences / rome_appellations label is embedded once (e5
+   "query", like skill labels) and the matrix is cached on disk as .npz,
+   keyed by a fingerprint of the model and the labels;
+2. skills x ROME similarities come from blocked matrix products with a
+   top-k per skill (clustering.top_k), never from per-skill queries;
+3. the changed rows are written with one bulk UPDATE.
+
+The matrix is also copied into rome_competences / rome_appellations
+.embedding, the vector leg of the label search (label_search.py).
+
+A competence match stores the competence code; an appellation match stores
+the code of its fiche metier (code_rome) with the appellation label.
+rome_kind records which of the two a skill's rome_code is.
+"""
+
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import literal, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import EmergentSkill, RomeAppellation, RomeCompetence
+from app.services.clustering import top_k
+from app.services.embedding_cache import CachedEmbedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8
+EMBED_CHUNK = 1024
+
+
+@dataclass
+class RomeMatrix:
+    """Labels ROME et leurs vecteurs (une ligne par label, float32 normalise)."""
+
+    kinds: list[str]
+    keys: list[str]
+    codes: list[str]
+    labels: list[str]
+    vectors: np.ndarray
+    fingerprint: str
+    # True when loaded from the .npz cache (not saved)
+    from_cache: bool = False
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                kinds=np.array(self.kinds),
+                keys=np.array(self.keys),
+                codes=np.array(self.codes),
+                labels=np.array(self.labels),
+                vectors=self.vectors,
+                fingerprint=np.array(self.fingerprint),
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "RomeMatrix | None":
+        """Load a cached matrix; None if the file is missing or unreadable."""
+        try:
+            with np.load(path) as data:
+                return cls(
+                    kinds=data["kinds"].tolist(),
+                    keys=data["keys"].tolist(),
+                    codes=data["codes"].tolist(),
+                    labels=data["labels"].tolist(),
+                    vectors=data["vectors"].astype(np.float32, copy=False),
+                    fingerprint=str(data["fingerprint"]),
+                    from_cache=True,
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+@dataclass
+class Alignment:
+    """Meilleure entree ROME d'une competence emergente."""
+
+    skill_id: uuid.UUID
+    rome_code: str | None
+    rome_label: str | None
+    similarity: float
+    kind: str | None = None
+
+
+async def load_rome_labels(session: AsyncSession) -> list[tuple[str, str, str, str]]:
+    """Return (kind, key, code, label) for every ROME competence and appellation.
+
+    ``key`` is the row's primary key, ``code`` the code stored on an
+    aligned skill (the fiche metier for an appellation).
+    """
+    stmt = union_all(
+        select(
+            literal("competence").label("kind"),
+            RomeCompetence.code.label("key"),
+            RomeCompetence.code.label("code"),
+            RomeCompetence.libelle.label("label"),
+        ),
+        select(
+            literal("appellation").label("kind"),
+            RomeAppellation.code.label("key"),
+            RomeAppellation.code_rome.label("code"),
+            RomeAppellation.libelle.label("label"),
+        ),
+    ).order_by("kind", "key")
+    return [(row.kind, row.key, row.code, row.label) for row in await session.execute(stmt)]
+
+
+def rome_fingerprint(model: str, rows: list[tuple[str, ...]]) -> str:
+    """Identify one (model, ROME labels) combination; changes on any ROME update."""
+    digest = hashlib.sha256(model.encode())
+    for row in rows:
+        digest.update("\x1f".join(row).encode() + b"\x1e")
+    return digest.hexdigest()
+
+
+async def rome_matrix(
+    session: AsyncSession, embedder: CachedEmbedder, cache_path: Path | None = None
+) -> RomeMatrix:
+    """Return the ROME label matrix, from the .npz cache when still valid."""
+    rows = await load_rome_labels(session)
+    fingerprint = rome_fingerprint(embedder.model_name, rows)
+    if cache_path is not None:
+        cached = RomeMatrix.load(cache_path)
+        if cached is not None and cached.fingerprint == fingerprint:
+            logger.info("ROME matrix: %d labels from %s", len(cached.labels), cache_path)
+            return cached
+
+    vectors = np.empty((len(rows), embedder.dimension), dtype=np.float32)
+    labels = [label for *_, label in rows]
+    for start in range(0, len(labels), EMBED_CHUNK):
+        chunk = labels[start : start + EMBED_CHUNK]
+        vectors[start : start + len(chunk)] = await embedder.embed(chunk, "query")
+    matrix = RomeMatrix(
+        kinds=[row[0] for row in rows],
+        keys=[row[1] for row in rows],
+        codes=[row[2] for row in rows],
+        labels=labels,
+        vectors=vectors,
+        fingerprint=fingerprint,
+    )
+    if cache_path is not None:
+        matrix.save(cache_path)
+    logger.info("ROME matrix: %d labels embedded", len(labels))
+    return matrix
+
+
+def align(
+    skill_ids: list[uuid.UUID],
+    skill_vectors: np.ndarray,
+    rome: RomeMatrix,
+    threshold: float = DEFAULT_THRESHOLD,
+    k: int = 5,
+) -> list[Alignment]:
+    """Best ROME entry of every skill; no code unless similarity > ``threshold``.
+
+    Among the top-k candidates above the threshold, competences are
+    preferred over appellations: the referential aligns skills, appellations
+    are job titles.
+    """
+    if not skill_ids or not rome.labels:
+        return [Alignment(skill_id, None, None, 0.0) for skill_id in skill_ids]
+    indexes, sims = top_k(skill_vectors, rome.vectors, k)
+    alignments: list[Alignment] = []
+    for skill_id, candidates, scores in zip(
+        skill_ids, indexes.tolist(), sims.tolist(), strict=True
+    ):
+        above = [
+            (entry, score)
+            for entry, score in zip(candidates, scores, strict=True)
+            if score > threshold
+        ]
+        if not above:
+            alignments.append(Alignment(skill_id, None, None, scores[0]))
+            continue
+        competences = [c for c in above if rome.kinds[c[0]] == "competence"]
+        entry, score = (competences or above)[0]
+        alignments.append(
+            Alignment(skill_id, rome.codes[entry], rome.labels[entry], score, rome.kinds[entry])
+        )
+    return alignments
+
+
+async def store_rome_embeddings(session: AsyncSession, rome: RomeMatrix) -> int:
+    """Copy the matrix into rome_*.embedding (label search); return rows written.
+
+    A freshly embedded matrix is written entirely; a matrix from the cache
+    only fills the rows that have no vector yet.
+    """
+    written = 0
+    for kind, model in (("competence", RomeCompetence), ("appellation", RomeAppellation)):
+        rows = [i for i, k in enumerate(rome.kinds) if k == kind]
+        if rome.from_cache:
+            missing = set(
+                await session.scalars(select(model.code).where(model.embedding.is_(None)))
+            )
+            rows = [i for i in rows if rome.keys[i] in missing]
+        for start in range(0, len(rows), EMBED_CHUNK):
+            chunk = rows[start : start + EMBED_CHUNK]
+            await session.execute(
+                update(model),
+                [{"code": rome.keys[i], "embedding": rome.vectors[i]} for i in chunk],
+            )
+        written += len(rows)
+    await session.commit()
+    return written
+
+
+async def load_skill_vectors(
+    session: AsyncSession,
+) -> tuple[
+    list[uuid.UUID], np.ndarray, dict[uuid.UUID, tuple[str | None, str | None, str | None]]
+]:
+    """Return skill ids, their embeddings as one matrix, and their current alignment."""
+    rows = (
+        await session.execute(
+            select(
+                EmergentSkill.id,
+                EmergentSkill.embedding,
+                EmergentSkill.rome_code,
+                EmergentSkill.rome_label,
+                EmergentSkill.rome_kind,
+            ).where(EmergentSkill.embedding.is_not(None))
+        )
+    ).all()
+    ids = [row.id for row in rows]
+    vectors = (
+        np.stack([np.asarray(row.embedding, dtype=np.float32) for row in rows])
+        if rows
+        else np.empty((0, 0), dtype=np.float32)
+    )
+    current = {row.id: (row.rome_code, row.rome_label, row.rome_kind) for row in rows}
+    return ids, vectors, current
+
+
+async def write_alignments(
+    session: AsyncSession,
+    alignments: list[Alignment],
+    current: dict[uuid.UUID, tuple[str | None, str | None, str | None]],
+) -> int:
+    """Write changed alignments with one bulk UPDATE; return rows updated."""
+    changed = [
+        {
+            "id": a.skill_id,
+            "rome_code": a.rome_code,
+            "rome_label": a.rome_label,
+            "rome_kind": a.kind,
+        }
+        for a in alignments
+        if current.get(a.skill_id) != (a.rome_code, a.rome_label, a.kind)
+    ]
+    if changed:
+        # ORM bulk UPDATE by primary key (executemany)
+        await session.execute(update(EmergentSkill), changed)
+        await session.commit()
+    return len(changed)
@@ -0,0 +1,320 @@
+"""Skill extraction worker -- drains unprocessed raw_offers through the LLM.
+
+Offers are claimed in batches with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of workers (processes or loops) can run side by side without ever
+extracting the same offer twice. A batch stays locked in its transaction
+while its offers are sent to vLLM; the extracted skills are then
+bulk-inserted into extracted_skills and the offers flipped to processed in
+the same commit. A worker killed mid-batch simply releases its locks: the
+run is resumable and nothing is half-written.
+
+Throughput comes from vLLM continuous batching: each worker keeps up to
+``concurrency`` requests in flight, spread over several claimed batches so
+the GPU stays busy while one batch is being committed. Requests go through
+ExtractionClient (app/services/llm.py): offers already answered with the
+same prompt version come from the response cache without a GPU call.
+
+Used by scripts/extract_skills.py (make extract-skills).
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+import unicodedata
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+from typing import Protocol
+
+from sqlalchemy import false, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import ExtractedSkill, RawOffer
+from app.services.llm import ExtractionClient, LLMClient, PromptTemplate
+from app.services.llm_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("debutant", "intermediaire", "confirme", "expert")
+MAX_OFFER_CHARS = 6000
+
+SYSTEM_PROMPT = (
+    "Tu es un assistant specialise dans l'extraction de competences professionnelles. "
+    "A partir d'une offre d'emploi de Nouvelle-Caledonie, extrais les competences "
+    "demandees, y compris celles exprimees en langage informel "
+    '("cherche quelqu\'un de serieux", "debrouillard"). '
+    'Reponds uniquement en JSON : {"competences": [{"label": "...", '
+    '"niveau": "debutant|intermediaire|confirme|expert" ou null, '
+    '"contexte": "..." ou null}]}. '
+    "Le label reprend les mots de l'offre ; le contexte est le cadre de travail "
+    "(chantier, mine, service...)."
+)
+
+# Bump the version whenever the prompt changes meaning: cached answers of
+# the previous version are then ignored (see app/services/llm_cache.py)
+OFFER_PROMPT = PromptTemplate(
+    version="offer-skills-v1",
+    system=SYSTEM_PROMPT,
+    user="Offre d'emploi :\n\n{text}\n\nExtrais les competences au format JSON.",
+    max_input_chars=MAX_OFFER_CHARS,
+)
+
+
+@dataclass
+class PendingOffer:
+    """Offre reservee pour extraction."""
+
+    id: uuid.UUID
+    text: str
+
+
+@dataclass
+class SkillData:
+    """Competence extraite, avant insertion dans extracted_skills."""
+
+    label: str
+    level: str | None = None
+    context: str | None = None
+
+
+@dataclass
+class ExtractionStats:
+    """Compteurs d'un passage du worker."""
+
+    offers_processed: int = 0
+    offers_failed: int = 0
+    skills_inserted: int = 0
+    cache_hits: int = 0
+    completion_tokens: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def offers_per_s(self) -> float:
+        return self.offers_processed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def tokens_per_s(self) -> float:
+        return self.completion_tokens / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Prompt and response parsing
+# ---------------------------------------------------------------------------
+
+
+def _fold(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip().lower()
+
+
+def _clean(value: object, max_length: int = 255) -> str | None:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip()[:max_length]
+
+
+def parse_skills(content: str) -> list[SkillData]:
+    """Parse the LLM answer into skills; raise ValueError if it is not JSON.
+
+    Tolerates markdown code fences, text around the JSON, a bare list
+    instead of {"competences": [...]}, and accents in the level.
+    """
+    start = min((i for i in (content.find("{"), content.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON in LLM answer")
+    data, _ = json.JSONDecoder().raw_decode(content[start:])
+    if isinstance(data, dict):
+        data = data.get("competences", data.get("skills", []))
+    if not isinstance(data, list):
+        raise ValueError("unexpected JSON shape in LLM answer")
+
+    skills: list[SkillData] = []
+    seen: set[str] = set()
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        label = _clean(item.get("label"))
+        if label is None or label.casefold() in seen:
+            continue
+        seen.add(label.casefold())
+        level = _fold(item.get("niveau") or item.get("level") or "")
+        skills.append(
+            SkillData(
+                label=label,
+                level=level if level in LEVELS else None,
+                context=_clean(item.get("contexte", item.get("context"))),
+            )
+        )
+    return skills
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class ClaimedBatch(Protocol):
+    """Lot d'offres reservees ; complete() ecrit les resultats."""
+
+    offers: list[PendingOffer]
+
+    async def complete(self, results: dict[uuid.UUID, list[SkillData]]) -> int:
+        """Store the skills and mark the offers processed; return skills inserted."""
+        ...
+
+
+class ExtractionStore(Protocol):
+    """Reservation des offres non traitees et ecriture des competences."""
+
+    def claim(
+        self, limit: int, exclude: set[uuid.UUID]
+    ) -> AbstractAsyncContextManager[ClaimedBatch]: ...
+
+
+class _PostgresBatch:
+    def __init__(self, session: AsyncSession, offers: list[PendingOffer]) -> None:
+        self.session = session
+        self.offers = offers
+
+    async def complete(self, results: dict[uuid.UUID, list[SkillData]]) -> int:
+        rows = [
+            {
+                "offer_id": offer_id,
+                "label": skill.label,
+                "level": skill.level,
+                "context": skill.context,
+            }
+            for offer_id, skills in results.items()
+            for skill in skills
+        ]
+        if rows:
+            await self.session.execute(insert(ExtractedSkill), rows)
+        if results:
+            await self.session.execute(
+                update(RawOffer).where(RawOffer.id.in_(list(results))).values(processed=True)
+            )
+        return len(rows)
+
+
+class PostgresExtractionStore:
+    """ExtractionStore backed by raw_offers / extracted_skills."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+
+    @asynccontextmanager
+    async def claim(self, limit: int, exclude: set[uuid.UUID]) -> AsyncIterator[_PostgresBatch]:
+        """Lock up to ``limit`` offers for the duration of the block.
+
+        Near-duplicates are never claimed (they are stored processed). The
+        block runs in one transaction: leaving it normally commits the
+        results, an exception rolls everything back and releases the locks.
+        """
+        async with self.session_factory() as session, session.begin():
+            stmt = (
+                select(RawOffer.id, RawOffer.text)
+                .where(RawOffer.processed == false(), RawOffer.duplicate_of.is_(None))
+                .order_by(RawOffer.collected_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            if exclude:
+                stmt = stmt.where(RawOffer.id.not_in(exclude))
+            rows = (await session.execute(stmt)).all()
+            yield _PostgresBatch(session, [PendingOffer(id=r.id, text=r.text) for r in rows])
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+
+def make_offer_extractor(
+    llm: LLMClient,
+    cache: ResponseCache | None = None,
+    concurrency: int = 64,
+    max_tokens: int = 512,
+) -> ExtractionClient[list[SkillData]]:
+    """ExtractionClient for job offers (OFFER_PROMPT + parse_skills)."""
+    return ExtractionClient(
+        llm,
+        OFFER_PROMPT,
+        parse_skills,
+        cache=cache,
+        concurrency=concurrency,
+        max_tokens=max_tokens,
+    )
+
+
+class ExtractionWorker:
+    """Worker d'extraction : lots SKIP LOCKED, requetes LLM concurrentes."""
+
+    def __init__(
+        self,
+        store: ExtractionStore,
+        extractor: ExtractionClient[list[SkillData]],
+        batch_size: int = 32,
+    ) -> None:
+        self.store = store
+        self.extractor = extractor
+        self.batch_size = batch_size
+
+    async def run(self, limit: int | None = None) -> ExtractionStats:
+        """Process unprocessed offers until none are left (or ``limit`` is reached)."""
+        stats = ExtractionStats()
+        started = time.perf_counter()
+        # Offers that failed in this run are not claimed again by this worker
+        failed: set[uuid.UUID] = set()
+        remaining = limit if limit is not None else math.inf
+
+        async def batch_loop() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                size = int(min(self.batch_size, remaining))
+                async with self.store.claim(size, failed) as batch:
+                    if not batch.offers:
+                        return
+                    remaining -= len(batch.offers)
+                    completions = await self.extractor.run([o.text for o in batch.offers])
+                    results: dict[uuid.UUID, list[SkillData]] = {}
+                    for offer, completion in zip(batch.offers, completions, strict=True):
+                        if completion.value is None:
+                            logger.warning(
+                                "offer %s: extraction failed: %s", offer.id, completion.error
+                            )
+                            failed.add(offer.id)
+                            stats.offers_failed += 1
+                            continue
+                        results[offer.id] = completion.value
+                        stats.completion_tokens += completion.completion_tokens
+                        stats.cache_hits += completion.cached
+                    stats.skills_inserted += await batch.complete(results)
+                stats.offers_processed += len(results)
+                logger.info(
+                    "batch done: %d offers, %d processed so far",
+                    len(batch.offers),
+                    stats.offers_processed,
+                )
+
+        # Enough batches to fill the in-flight window, plus one being committed
+        loops = math.ceil(self.extractor.concurrency / self.batch_size) + 1
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(loops):
+                tg.create_task(batch_loop())
+
+        stats.elapsed_s = time.perf_counter() - started
+        logger.info(
+            "%d offers processed (%d from cache), %d failed, %d skills in %.2fs "
+            "(%.1f offers/s, %.0f tok/s)",
+            stats.offers_processed,
+            stats.cache_hits,
+            stats.offers_failed,
+            stats.skills_inserted,
+            stats.elapsed_s,
+            stats.offers_per_s,
+            stats.tokens_per_s,
+        )
+        return stats
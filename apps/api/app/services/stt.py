@@ -0,0 +1,570 @@
+"""Streaming STT -- VAD-segmented incremental Whisper decoding.
+
+The PWA streams raw audio (PCM 16-bit little-endian, mono, 16 kHz) while
+the user holds the VocalButton. Instead of transcribing the whole utterance
+once it ends, the stream is cut into speech segments by an energy VAD:
+
+- while a segment grows, it is re-decoded every ``partial_interval_ms``
+  (greedy, beam 1) and pushed as a *partial* transcript;
+- when ``silence_ms`` of silence ends it (or it reaches ``max_segment_s``),
+  it is decoded once more with the full beam and pushed as *final*.
+
+Decoding cost is bounded by the segment length, not by the utterance
+length, so the first words arrive after about one partial interval however
+long the user speaks. Partials that are already stale when their turn
+comes (a newer job is queued) are skipped; finals are never skipped.
+
+Segments of all sessions go through one scheduler: every batch takes at
+most one segment per session, sessions served in round-robin order, and
+decodes them together (batched encoder + beam search), so throughput grows
+with the batch size rather than with the number of model calls. When the
+queue is full, partials are shed and finals wait (backpressure).
+
+Backends:
+- faster-whisper (CTranslate2), optional dependency (pip install -e
+  ".[voice]"): large-v3 / cuda / float16 in production, tiny / cpu / int8
+  for tests and development;
+- stub: a fixed text after a configurable delay, for load tests without a
+  GPU (STT_BACKEND=stub).
+"""
+
+import asyncio
+import logging
+import math
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal, Protocol
+
+from app.config import settings
+from app.metrics import observe_inference
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # bytes per sample, PCM 16-bit
+FRAME_MS = 30
+PREROLL_MS = 300  # audio kept before speech onset, so first syllables are not clipped
+PROMPT_CHARS = 200  # previous final text passed to Whisper as context
+MAX_DECODE_TOKENS = 448  # Whisper text context
+
+SegmentKind = Literal["partial", "final"]
+
+
+class Transcriber(Protocol):
+    """Modele STT synchrone (appele dans un thread du pool)."""
+
+    name: str
+
+    def transcribe_batch(
+        self, pcms: list[bytes], *, beam_size: int, prompts: list[str | None]
+    ) -> list[str]:
+        """Transcribe PCM 16-bit mono segments (at most 30 s each), in order."""
+        ...
+
+
+class WhisperTranscriber:
+    """Transcriber faster-whisper (CTranslate2), decodage par lots."""
+
+    def __init__(
+        self,
+        model_size: str,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        language: str = "fr",
+    ) -> None:
+        try:
+            from faster_whisper import WhisperModel
+            from faster_whisper.tokenizer import Tokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "faster-whisper is not installed. "
+                'Install the voice extras: pip install -e ".[voice]"'
+            ) from exc
+        self.name = f"whisper-{model_size}"
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        self.tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task="transcribe",
+            language=language,
+        )
+
+    def _prompt(self, text: str | None) -> list[int]:
+        tokens: list[int] = []
+        if text:
+            previous = self.tokenizer.encode(" " + text.strip())
+            tokens = [self.tokenizer.sot_prev, *previous[-(MAX_DECODE_TOKENS // 2 - 1) :]]
+        return [*tokens, *self.tokenizer.sot_sequence, self.tokenizer.no_timestamps]
+
+    def transcribe_batch(
+        self, pcms: list[bytes], *, beam_size: int, prompts: list[str | None]
+    ) -> list[str]:
+        import numpy as np
+        from faster_whisper.audio import pad_or_trim
+
+        # Same path as faster-whisper's BatchedInferencePipeline (one padded
+        # 30 s window per segment, batched encode + generate), but the batch
+        # is made of segments from different sessions.
+        features = np.stack(
+            [
+                pad_or_trim(
+                    self.model.feature_extractor(
+                        np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+                    )
+                )
+                for pcm in pcms
+            ]
+        )
+        results = self.model.model.generate(
+            self.model.encode(features),
+            [self._prompt(prompt) for prompt in prompts],
+            beam_size=beam_size,
+            max_length=MAX_DECODE_TOKENS,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+        )
+        return [self.tokenizer.decode(r.sequences_ids[0]).strip() for r in results]
+
+
+class StubTranscriber:
+    """Transcriber factice : texte fixe, latence proportionnelle a l'audio."""
+
+    name = "stub"
+    TEXT = "je conduis des engins sur les chantiers depuis cinq ans"
+
+    def __init__(self, rtf: float = 0.05, sample_rate: int = 16000) -> None:
+        self.rtf = rtf
+        self.sample_rate = sample_rate
+
+    def transcribe_batch(
+        self, pcms: list[bytes], *, beam_size: int, prompts: list[str | None]
+    ) -> list[str]:
+        # A batch costs about as much as its longest segment (padded windows)
+        longest_s = max(len(pcm) for pcm in pcms) / SAMPLE_WIDTH / self.sample_rate
+        time.sleep(self.rtf * longest_s)
+        return [self.TEXT] * len(pcms)
+
+
+def build_transcriber(backend: str | None = None) -> Transcriber:
+    """Instantiate the transcriber configured by STT_BACKEND."""
+    backend = backend or settings.STT_BACKEND
+    if backend == "whisper":
+        return WhisperTranscriber(
+            settings.WHISPER_MODEL_SIZE,
+            device=settings.WHISPER_DEVICE,
+            compute_type=settings.WHISPER_COMPUTE_TYPE,
+            language=settings.WHISPER_LANGUAGE,
+        )
+    if backend == "stub":
+        return StubTranscriber(settings.STT_STUB_RTF, settings.STT_SAMPLE_RATE)
+    raise ValueError(f"unknown STT_BACKEND: {backend!r}")
+
+
+# ---------------------------------------------------------------------------
+# VAD segmentation
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SpeechSegment:
+    """Segment de parole a decoder (partiel ou final)."""
+
+    kind: SegmentKind
+    index: int
+    pcm: bytes
+    start_s: float
+    end_s: float
+
+
+def frame_rms(frame: bytes) -> float:
+    """Root mean square of a PCM 16-bit frame, normalized to 0..1."""
+    samples = array("h")
+    samples.frombytes(frame)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples)) / 32768.0
+
+
+class SpeechSegmenter:
+    """Decoupe un flux PCM en segments de parole (VAD par energie)."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        threshold: float = 0.015,
+        silence_ms: int = 600,
+        partial_interval_ms: int = 800,
+        max_segment_s: float = 15.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * SAMPLE_WIDTH
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.partial_frames = max(1, partial_interval_ms // FRAME_MS)
+        self.max_frames = max(1, int(max_segment_s * 1000) // FRAME_MS)
+        self._pending = b""
+        self._preroll: deque[bytes] = deque(maxlen=max(1, PREROLL_MS // FRAME_MS))
+        self._segment = bytearray()
+        self._in_speech = False
+        self._silent = 0
+        self._since_partial = 0
+        self._index = 0
+        self._frames_seen = 0
+        self._segment_start = 0
+
+    def _bounds(self) -> tuple[float, float]:
+        frame_s = FRAME_MS / 1000
+        return self._segment_start * frame_s, self._frames_seen * frame_s
+
+    def _emit(self, kind: SegmentKind) -> SpeechSegment:
+        start_s, end_s = self._bounds()
+        return SpeechSegment(kind, self._index, bytes(self._segment), start_s, end_s)
+
+    def _close(self) -> SpeechSegment:
+        segment = self._emit("final")
+        self._index += 1
+        self._segment.clear()
+        self._since_partial = 0
+        self._silent = 0
+        return segment
+
+    def feed(self, pcm: bytes) -> Iterator[SpeechSegment]:
+        """Consume audio; yield the partial / final segments it completes."""
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = data[usable:]
+        for offset in range(0, usable, self.frame_bytes):
+            frame = data[offset : offset + self.frame_bytes]
+            self._frames_seen += 1
+            speech = frame_rms(frame) >= self.threshold
+            if not self._in_speech:
+                self._preroll.append(frame)
+                if speech:
+                    self._in_speech = True
+                    self._segment_start = self._frames_seen - len(self._preroll)
+                    self._segment.extend(b"".join(self._preroll))
+                    self._preroll.clear()
+                continue
+
+            self._segment.extend(frame)
+            self._silent = 0 if speech else self._silent + 1
+            self._since_partial += 1
+            if self._silent >= self.silence_frames:
+                self._in_speech = False
+                yield self._close()
+            elif len(self._segment) >= self.max_frames * self.frame_bytes:
+                # Long monologue: cut, keep listening in the same utterance
+                yield self._close()
+                self._segment_start = self._frames_seen
+            elif self._since_partial >= self.partial_frames and speech:
+                # Not during a pause: the final is probably about to come
+                self._since_partial = 0
+                yield self._emit("partial")
+
+    def flush(self) -> Iterator[SpeechSegment]:
+        """End of stream: yield the segment in progress as final."""
+        if self._in_speech and self._segment:
+            self._in_speech = False
+            yield self._close()
+
+
+# ---------------------------------------------------------------------------
+# Service and streaming session
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SttStats:
+    """Compteurs du service STT."""
+
+    partials: int = 0
+    finals: int = 0
+    skipped_partials: int = 0
+    batches: int = 0
+    audio_s: float = 0.0
+    decode_s: float = 0.0
+    queue_wait_s: float = 0.0
+
+    @property
+    def segments(self) -> int:
+        return self.partials + self.finals
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.segments / self.batches if self.batches else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        """Decoding time per second of audio (below 1: faster than real time)."""
+        return self.decode_s / self.audio_s if self.audio_s else 0.0
+
+
+@dataclass
+class _Job:
+    pcm: bytes
+    final: bool
+    prompt: str | None
+    future: asyncio.Future
+    queued_at: float
+
+
+class SttService:
+    """Moteur STT partage : ordonnanceur equitable, lots, pool de decodage."""
+
+    def __init__(
+        self,
+        transcriber: Transcriber,
+        workers: int = 1,
+        beam_size: int = 5,
+        sample_rate: int = 16000,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0,
+        max_queue: int = 64,
+    ) -> None:
+        self.transcriber = transcriber
+        self.beam_size = beam_size
+        self.sample_rate = sample_rate
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.workers = workers
+        self.stats = SttStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt")
+        # Pending jobs per session, sessions in round-robin order
+        self._sessions: OrderedDict[Hashable, deque[_Job]] = OrderedDict()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._work: asyncio.Event | None = None
+        self._space: asyncio.Semaphore | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def model_name(self) -> str:
+        return self.transcriber.name
+
+    @property
+    def queue_depth(self) -> int:
+        """Segments waiting for a batch (all sessions)."""
+        return sum(len(jobs) for jobs in self._sessions.values())
+
+    # -- public API ---------------------------------------------------------
+
+    async def transcribe(
+        self,
+        pcm: bytes,
+        *,
+        final: bool,
+        prompt: str | None = None,
+        session: Hashable | None = None,
+    ) -> str | None:
+        """Decode one segment (greedy for partials) in the next fitting batch.
+
+        Segments of one ``session`` are decoded in order, one per batch.
+        When ``max_queue`` segments are already waiting, a partial is shed
+        (returns None) and a final waits for room.
+        """
+        self._ensure_started()
+        if not final and self._space.locked():
+            self.stats.skipped_partials += 1
+            return None
+        await self._space.acquire()
+        loop = asyncio.get_running_loop()
+        job = _Job(pcm, final, prompt, loop.create_future(), loop.time())
+        key = object() if session is None else session
+        self._sessions.setdefault(key, deque()).append(job)
+        self._work.set()
+        return await job.future
+
+    async def warmup(self) -> None:
+        """Decode one second of silence outside the scheduler and the stats."""
+        loop = asyncio.get_running_loop()
+        silence = bytes(self.sample_rate * SAMPLE_WIDTH)
+        await loop.run_in_executor(
+            self._executor,
+            lambda: self.transcriber.transcribe_batch(
+                [silence], beam_size=self.beam_size, prompts=[None]
+            ),
+        )
+
+    def segmenter(self) -> SpeechSegmenter:
+        """A segmenter configured from the STT_* settings."""
+        return SpeechSegmenter(
+            sample_rate=self.sample_rate,
+            threshold=settings.STT_VAD_THRESHOLD,
+            silence_ms=settings.STT_SILENCE_MS,
+            partial_interval_ms=settings.STT_PARTIAL_INTERVAL_MS,
+            max_segment_s=settings.STT_MAX_SEGMENT_S,
+        )
+
+    async def aclose(self) -> None:
+        """Stop the scheduler and the thread pool."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- scheduling ---------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        # (Re)start on first use and whenever the running loop changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._loop_task is None or self._loop_task.done():
+            self._loop = loop
+            self._sessions.clear()
+            self._work = asyncio.Event()
+            self._space = asyncio.Semaphore(self.max_queue)
+            self._slots = asyncio.Semaphore(self.workers)
+            self._loop_task = asyncio.create_task(self._schedule_loop(), name="stt-scheduler")
+
+    def _take_batch(self) -> list[_Job]:
+        """One job per session, round-robin, all with the same beam size."""
+        batch: list[_Job] = []
+        final: bool | None = None
+        for session in list(self._sessions):
+            jobs = self._sessions[session]
+            if final is None:
+                final = jobs[0].final
+            if jobs[0].final != final:
+                # Decoded with another beam size: first in line for the next batch
+                continue
+            batch.append(jobs.popleft())
+            if jobs:
+                self._sessions.move_to_end(session)
+            else:
+                del self._sessions[session]
+            if len(batch) == self.max_batch_size:
+                break
+        return batch
+
+    async def _schedule_loop(self) -> None:
+        while True:
+            await self._work.wait()
+            if len(self._sessions) < self.max_batch_size and self.max_wait_s > 0:
+                # Let other sessions join the batch
+                await asyncio.sleep(self.max_wait_s)
+            # At most ``workers`` batches decode at once; the queue keeps
+            # filling (and the next batch grows) while they run
+            await self._slots.acquire()
+            batch = self._take_batch()
+            if not self._sessions:
+                self._work.clear()
+            for _ in batch:
+                self._space.release()
+            task = asyncio.create_task(self._decode_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _decode_batch(self, batch: list[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        beam_size = self.beam_size if batch[0].final else 1
+        try:
+            with observe_inference("stt", self.model_name):
+                texts = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.transcriber.transcribe_batch(
+                        [job.pcm for job in batch],
+                        beam_size=beam_size,
+                        prompts=[job.prompt for job in batch],
+                    ),
+                )
+        except Exception as exc:
+            logger.exception("STT batch of %d segments failed", len(batch))
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+        finally:
+            self._slots.release()
+        self.stats.batches += 1
+        self.stats.decode_s += loop.time() - started
+        for job, text in zip(batch, texts, strict=True):
+            self.stats.queue_wait_s += started - job.queued_at
+            self.stats.audio_s += len(job.pcm) / SAMPLE_WIDTH / self.sample_rate
+            if job.final:
+                self.stats.finals += 1
+            else:
+                self.stats.partials += 1
+            if not job.future.done():
+                job.future.set_result(text)
+
+
+class StreamingTranscription:
+    """Une session de dictee : audio en entree, transcriptions en sortie."""
+
+    def __init__(self, service: SttService, segmenter: SpeechSegmenter | None = None) -> None:
+        self.service = service
+        self.segmenter = segmenter or service.segmenter()
+        self._jobs: asyncio.Queue[SpeechSegment | None] = asyncio.Queue()
+        self._finals: list[str] = []
+
+    def feed(self, pcm: bytes) -> None:
+        """Queue the segments completed by this audio chunk (never blocks)."""
+        for segment in self.segmenter.feed(pcm):
+            self._jobs.put_nowait(segment)
+
+    def finish(self) -> None:
+        """End of audio: flush the last segment and close the result stream."""
+        for segment in self.segmenter.flush():
+            self._jobs.put_nowait(segment)
+        self._jobs.put_nowait(None)
+
+    def cancel(self) -> None:
+        """Client gone: drop the queued segments and close the result stream."""
+        while not self._jobs.empty():
+            self._jobs.get_nowait()
+        self._jobs.put_nowait(None)
+
+    @property
+    def text(self) -> str:
+        """Final transcript so far."""
+        return " ".join(t for t in self._finals if t)
+
+    async def results(self) -> AsyncIterator[dict]:
+        """Yield partial / final messages in order, until ``finish``."""
+        while (segment := await self._jobs.get()) is not None:
+            if segment.kind == "partial" and not self._jobs.empty():
+                # A longer partial or the final of this segment is queued
+                self.service.stats.skipped_partials += 1
+                continue
+            prompt = self.text[-PROMPT_CHARS:] or None
+            text = await self.service.transcribe(
+                segment.pcm, final=segment.kind == "final", prompt=prompt, session=self
+            )
+            if text is None:
+                # Partial shed by a full queue
+                continue
+            if segment.kind == "final":
+                self._finals.append(text)
+            yield {
+                "type": segment.kind,
+                "segment": segment.index,
+                "text": text,
+                "start": round(segment.start_s, 2),
+                "end": round(segment.end_s, 2),
+            }
+
+
+@lru_cache
+def get_stt_service() -> SttService:
+    """Dependency FastAPI -- service STT partage (modele charge au premier appel)."""
+    return SttService(
+        build_transcriber(),
+        workers=settings.STT_WORKERS,
+        beam_size=settings.WHISPER_BEAM_SIZE,
+        sample_rate=settings.STT_SAMPLE_RATE,
+        max_batch_size=settings.STT_MAX_BATCH_SIZE,
+        max_wait_ms=settings.STT_MAX_WAIT_MS,
+        max_queue=settings.STT_MAX_QUEUE,
+    )
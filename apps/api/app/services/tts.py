@@ -0,0 +1,380 @@
+"""Streaming TTS -- sentence-level Piper synthesis with a persistent phrase cache.
+
+Synthesizing a whole answer before playing it makes the user wait for the
+last sentence. The text is split into sentences instead, and each sentence
+is sent as soon as it is synthesized: time to first audio is the synthesis
+time of the first sentence. While one sentence is streamed, the next one
+is already being synthesized.
+
+Most of what the assistant says is fixed (greetings, confirmations,
+instructions), so every synthesized sentence is cached on disk, keyed by
+(voice, sample rate, normalized text), with an in-memory LRU in front: a
+repeated prompt costs a file read, then nothing.
+
+Audio is PCM 16-bit little-endian mono at the voice's sample rate.
+
+Backends:
+- Piper (ONNX), optional dependency (pip install -e ".[voice]");
+- stub: silence after a configurable delay, for load tests without a
+  voice model (TTS_BACKEND=stub).
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import re
+import struct
+import tempfile
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+from app.config import settings
+from app.metrics import observe_inference
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # bytes per sample, PCM 16-bit
+# End of sentence: . ! ? ... followed by a space (or the end of the text)
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+# Sentences longer than this are also cut at ; and :
+MAX_SENTENCE_CHARS = 200
+CLAUSE_END = re.compile(r"(?<=[;:])\s+")
+
+
+class Synthesizer(Protocol):
+    """Voix TTS synchrone (appelee dans un thread du pool)."""
+
+    name: str
+    sample_rate: int
+
+    def synthesize(self, text: str) -> bytes:
+        """Return the PCM 16-bit mono audio of one sentence."""
+        ...
+
+
+class PiperSynthesizer:
+    """Synthesizer Piper (modele ONNX + config JSON a cote)."""
+
+    def __init__(self, model_path: str, sample_rate: int = 22050) -> None:
+        try:
+            from piper import PiperVoice
+        except ImportError as exc:
+            raise RuntimeError(
+                'piper-tts is not installed. Install the voice extras: pip install -e ".[voice]"'
+            ) from exc
+        self.voice = PiperVoice.load(model_path)
+        self.name = Path(model_path).stem
+        self.sample_rate = getattr(self.voice.config, "sample_rate", sample_rate)
+
+    def synthesize(self, text: str) -> bytes:
+        if hasattr(self.voice, "synthesize_stream_raw"):
+            return b"".join(self.voice.synthesize_stream_raw(text))
+        # piper-tts >= 1.3: synthesize() yields AudioChunk objects
+        return b"".join(chunk.audio_int16_bytes for chunk in self.voice.synthesize(text))
+
+
+class StubSynthesizer:
+    """Synthesizer factice : silence de la duree d'une lecture, latence configurable."""
+
+    name = "stub"
+    MS_PER_CHAR = 60  # speaking rate of a French voice, about 15 characters/s
+
+    def __init__(self, rtf: float = 0.1, sample_rate: int = 16000) -> None:
+        self.rtf = rtf
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: str) -> bytes:
+        duration_s = len(text) * self.MS_PER_CHAR / 1000
+        time.sleep(self.rtf * duration_s)
+        return bytes(int(duration_s * self.sample_rate) * SAMPLE_WIDTH)
+
+
+def build_synthesizer(backend: str | None = None) -> Synthesizer:
+    """Instantiate the synthesizer configured by TTS_BACKEND."""
+    backend = backend or settings.TTS_BACKEND
+    if backend == "piper":
+        return PiperSynthesizer(settings.PIPER_MODEL_PATH, settings.PIPER_SAMPLE_RATE)
+    if backend == "stub":
+        return StubSynthesizer(settings.TTS_STUB_RTF)
+    raise ValueError(f"unknown TTS_BACKEND: {backend!r}")
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize and collapse whitespace (cache key, synthesis input)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split a text into sentences; long sentences are also cut at ; and :."""
+    sentences: list[str] = []
+    for sentence in SENTENCE_END.split(normalize_text(text)):
+        if len(sentence) > MAX_SENTENCE_CHARS:
+            sentences.extend(CLAUSE_END.split(sentence))
+        elif sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+class SentenceChunker:
+    """Decoupe un flux de texte (tokens du LLM) en phrases a synthetiser."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add streamed text; return the sentences it completes."""
+        self._buffer += text
+        # A sentence is complete once the space after its end mark has arrived
+        *complete, self._buffer = SENTENCE_END.split(self._buffer)
+        return [sentence for part in complete for sentence in split_sentences(part)]
+
+    def flush(self) -> list[str]:
+        """End of stream: the rest of the text, even without an end mark."""
+        rest, self._buffer = self._buffer, ""
+        return split_sentences(rest)
+
+
+def wav_header(sample_rate: int, data_bytes: int = 0xFFFFFFFF - 36) -> bytes:
+    """RIFF/WAVE header of PCM 16-bit mono audio.
+
+    The default size is the conventional "unknown length" of a streamed
+    WAV: players read the data until the connection closes.
+    """
+    return (
+        b"RIFF"
+        + struct.pack("<I", data_bytes + 36)
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * SAMPLE_WIDTH, 2, 16)
+        + b"data"
+        + struct.pack("<I", data_bytes)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Phrase cache
+# ---------------------------------------------------------------------------
+
+
+def phrase_key(voice: str, sample_rate: int, text: str) -> str:
+    """Cache key (sha256 hex) of one sentence said by one voice."""
+    payload = "\x1f".join((voice, str(sample_rate), normalize_text(text)))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PhraseCache:
+    """Cache d'audio synthetise : LRU memoire devant un repertoire sur disque.
+
+    The directory is capped at ``max_disk_bytes`` (0: unbounded): past it,
+    the files least recently read or written (mtime, refreshed on disk hits)
+    are deleted down to ``PRUNE_TO`` of the cap. Each worker counts its own
+    writes from a scan, and every prune rescans the directory.
+    """
+
+    PRUNE_TO = 0.9
+
+    def __init__(
+        self, directory: Path | None, max_memory_entries: int = 256, max_disk_bytes: int = 0
+    ) -> None:
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.entries: OrderedDict[str, bytes] = OrderedDict()
+        self._disk_bytes: int | None = None
+
+    def _path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.directory / key[:2] / f"{key}.pcm"
+
+    def _remember(self, key: str, pcm: bytes) -> None:
+        self.entries[key] = pcm
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_memory_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str) -> bytes | None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            pcm = path.read_bytes()
+        except OSError:
+            return None
+        if self.max_disk_bytes:
+            # Recently used: pruned last
+            with contextlib.suppress(OSError):
+                os.utime(path)
+        self._remember(key, pcm)
+        return pcm
+
+    def put(self, key: str, pcm: bytes) -> None:
+        self._remember(key, pcm)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp: str | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Atomic: concurrent workers never read a half-written file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("TTS cache: cannot write %s", path, exc_info=True)
+            if tmp is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+            return
+        if self.max_disk_bytes:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._files())
+            else:
+                self._disk_bytes += len(pcm)
+            if self._disk_bytes > self.max_disk_bytes:
+                self.prune()
+
+    def _files(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) of every cached sentence on disk."""
+        files = []
+        for path in self.directory.glob("*/*.pcm"):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def prune(self) -> int:
+        """Delete the least recently used files down to PRUNE_TO of the cap."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * self.PRUNE_TO
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                removed += 1
+            total -= size
+        self._disk_bytes = total
+        logger.info("TTS cache: %d files pruned, %d bytes left", removed, total)
+        return removed
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class TtsStats:
+    """Compteurs du service TTS."""
+
+    sentences: int = 0
+    cache_hits: int = 0
+    audio_s: float = 0.0
+    synthesis_s: float = 0.0
+    synthesized_audio_s: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache_hits / self.sentences if self.sentences else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        """Synthesis time per second of synthesized (not cached) audio."""
+        return self.synthesis_s / self.synthesized_audio_s if self.synthesized_audio_s else 0.0
+
+
+class TtsService:
+    """Moteur TTS partage : une voix, le cache de phrases, un pool de synthese."""
+
+    def __init__(
+        self,
+        synthesizer: Synthesizer,
+        cache: PhraseCache | None = None,
+        workers: int = 1,
+    ) -> None:
+        self.synthesizer = synthesizer
+        self.cache = cache or PhraseCache(None)
+        self.stats = TtsStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+
+    @property
+    def model_name(self) -> str:
+        return self.synthesizer.name
+
+    @property
+    def sample_rate(self) -> int:
+        return self.synthesizer.sample_rate
+
+    async def synthesize(self, sentence: str) -> bytes:
+        """Audio of one sentence, from the cache or synthesized off the loop."""
+        key = phrase_key(self.model_name, self.sample_rate, sentence)
+        self.stats.sentences += 1
+        pcm = self.cache.get(key)
+        if pcm is not None:
+            self.stats.cache_hits += 1
+        else:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            with observe_inference("tts", self.model_name):
+                pcm = await loop.run_in_executor(
+                    self._executor, self.synthesizer.synthesize, normalize_text(sentence)
+                )
+            self.stats.synthesis_s += loop.time() - started
+            self.stats.synthesized_audio_s += len(pcm) / SAMPLE_WIDTH / self.sample_rate
+            self.cache.put(key, pcm)
+        self.stats.audio_s += len(pcm) / SAMPLE_WIDTH / self.sample_rate
+        return pcm
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield the audio of ``text`` sentence by sentence, one sentence ahead."""
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+        upcoming = asyncio.ensure_future(self.synthesize(sentences[0]))
+        try:
+            for sentence in sentences[1:]:
+                current = upcoming
+                # Synthesize the next sentence while this one is being sent
+                upcoming = asyncio.ensure_future(self.synthesize(sentence))
+                yield await current
+            yield await upcoming
+        finally:
+            upcoming.cancel()
+
+    async def warmup(self) -> None:
+        """Synthesize one short sentence outside the cache and the stats."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.synthesizer.synthesize, "Bonjour.")
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_tts_service() -> TtsService:
+    """Dependency FastAPI -- service TTS partage (voix chargee au premier appel)."""
+    synthesizer = build_synthesizer()
+    cache_dir = Path(settings.TTS_CACHE_DIR) if settings.TTS_CACHE_DIR else None
+    return TtsService(
+        synthesizer,
+        PhraseCache(
+            cache_dir,
+            max_memory_entries=settings.TTS_CACHE_MEMORY_ENTRIES,
+            max_disk_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024,
+        ),
+        workers=settings.TTS_WORKERS,
+    )
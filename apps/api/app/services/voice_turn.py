@@ -0,0 +1,191 @@
+"""Voice turn -- overlapped STT -> LLM -> TTS pipeline for one conversational turn.
+
+Run one after the other, the three stages make the user wait for
+STT + LLM + TTS. Here they overlap, so the wait approaches the slowest stage:
+
+- STT: speech segments are transcribed while the user is still speaking
+  (StreamingTranscription); each final segment also sends the transcript
+  so far to vLLM as a 1-token request, which fills its prefix cache: when
+  the user stops, the real request only prefills the last words;
+- LLM: the answer is streamed token by token and cut into sentences
+  (SentenceChunker) as it is generated;
+- TTS: each sentence is synthesized (or read from the phrase cache) and
+  sent while the LLM is still writing the next one.
+
+Every stage boundary is time-stamped (TurnTimeline); the perceived latency
+is ``first_audio - speech_end``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from app.services.llm import LLMClient, LLMError, PromptTemplate
+from app.services.stt import StreamingTranscription, SttService
+from app.services.tts import SentenceChunker, TtsService
+
+logger = logging.getLogger(__name__)
+
+TURN_PROMPT = PromptTemplate(
+    version="voice-turn-v1",
+    system=(
+        "Tu es Kompetens, un assistant vocal qui aide une personne de "
+        "Nouvelle-Caledonie a faire l'inventaire de ses competences. "
+        "Reponds en francais simple, en deux ou trois phrases courtes : "
+        "reformule ce que tu as compris, puis pose une ou deux questions de "
+        "relance sur son experience. Pas de liste ni de mise en forme : ta "
+        "reponse est lue a voix haute."
+    ),
+    user="{text}",
+    max_input_chars=4000,
+)
+
+TurnEvent = dict | bytes
+
+
+@dataclass
+class TurnTimeline:
+    """Horodatage des etapes d'un tour (ms depuis le debut du tour)."""
+
+    started: float = field(default_factory=time.perf_counter)
+    marks: dict[str, float] = field(default_factory=dict)
+
+    def mark(self, stage: str) -> None:
+        """Record the first time ``stage`` is reached."""
+        self.marks.setdefault(stage, round((time.perf_counter() - self.started) * 1000, 1))
+
+    @property
+    def response_ms(self) -> float | None:
+        """Silence perceived by the user: end of speech to first audio."""
+        if "speech_end" in self.marks and "first_audio" in self.marks:
+            return round(self.marks["first_audio"] - self.marks["speech_end"], 1)
+        return None
+
+
+class VoiceTurn:
+    """Un tour de conversation vocale : audio en entree, texte et audio en sortie."""
+
+    def __init__(
+        self,
+        stt: SttService,
+        llm: LLMClient,
+        tts: TtsService,
+        history: list[dict[str, str]] | None = None,
+        prompt: PromptTemplate = TURN_PROMPT,
+        max_tokens: int = 200,
+    ) -> None:
+        self.transcription = StreamingTranscription(stt)
+        self.llm = llm
+        self.tts = tts
+        self.history = history or []
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.timeline = TurnTimeline()
+        self.reply = ""
+        self._prefill: asyncio.Task | None = None
+
+    # -- audio input (same interface as StreamingTranscription) -------------
+
+    def feed(self, pcm: bytes) -> None:
+        self.timeline.mark("first_audio_in")
+        self.transcription.feed(pcm)
+
+    def finish(self) -> None:
+        self.timeline.mark("speech_end")
+        self.transcription.finish()
+
+    def cancel(self) -> None:
+        self.transcription.cancel()
+
+    # -- pipeline -----------------------------------------------------------
+
+    def messages(self, transcript: str) -> list[dict[str, str]]:
+        """System prompt, previous turns, then this turn (a stable prefix)."""
+        system, user = self.prompt.messages(transcript)
+        return [system, *self.history, user]
+
+    async def _prefill_prefix(self, transcript: str) -> None:
+        # Only the prompt processing matters: vLLM keeps the computed blocks
+        with contextlib.suppress(LLMError):
+            await self.llm.chat(self.messages(transcript), max_tokens=1)
+
+    async def _listen(self, out: asyncio.Queue[TurnEvent | None]) -> str:
+        async for result in self.transcription.results():
+            self.timeline.mark(f"first_{result['type']}")
+            out.put_nowait(result)
+            if result["type"] == "final" and (self._prefill is None or self._prefill.done()):
+                self._prefill = asyncio.create_task(self._prefill_prefix(self.transcription.text))
+        self.timeline.mark("stt_done")
+        return self.transcription.text
+
+    async def _answer(
+        self,
+        transcript: str,
+        sentences: asyncio.Queue[str | None],
+        out: asyncio.Queue[TurnEvent | None],
+    ) -> None:
+        chunker = SentenceChunker()
+        try:
+            async for delta in self.llm.chat_stream(
+                self.messages(transcript), max_tokens=self.max_tokens
+            ):
+                self.timeline.mark("llm_first_token")
+                self.reply += delta
+                out.put_nowait({"type": "reply", "text": delta})
+                for sentence in chunker.feed(delta):
+                    self.timeline.mark("first_sentence")
+                    sentences.put_nowait(sentence)
+            for sentence in chunker.flush():
+                sentences.put_nowait(sentence)
+            self.timeline.mark("llm_done")
+        finally:
+            sentences.put_nowait(None)
+
+    async def _speak(
+        self, sentences: asyncio.Queue[str | None], out: asyncio.Queue[TurnEvent | None]
+    ) -> None:
+        while (sentence := await sentences.get()) is not None:
+            pcm = await self.tts.synthesize(sentence)
+            self.timeline.mark("first_audio")
+            out.put_nowait(pcm)
+        self.timeline.mark("tts_done")
+
+    async def _run_stages(self, out: asyncio.Queue[TurnEvent | None]) -> None:
+        try:
+            transcript = await self._listen(out)
+            if not transcript:
+                return
+            sentences: asyncio.Queue[str | None] = asyncio.Queue()
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._speak(sentences, out))
+                tg.create_task(self._answer(transcript, sentences, out))
+        finally:
+            out.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[TurnEvent]:
+        """Yield transcripts (partial / final), reply text and audio (PCM bytes).
+
+        The last event is {"type": "done"} with the transcript, the reply
+        and the timeline.
+        """
+        out: asyncio.Queue[TurnEvent | None] = asyncio.Queue()
+        stages = asyncio.create_task(self._run_stages(out))
+        try:
+            while (event := await out.get()) is not None:
+                yield event
+            await stages
+        finally:
+            stages.cancel()
+            if self._prefill is not None:
+                self._prefill.cancel()
+        self.timeline.mark("done")
+        yield {
+            "type": "done",
+            "transcript": self.transcription.text,
+            "reply": self.reply,
+            "response_ms": self.timeline.response_ms,
+            "timeline": self.timeline.marks,
+        }
@@ -0,0 +1,144 @@
+from datetime import UTC, datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.models import EmergentSkill  # noqa: E402
+from app.services.clustering import (  # noqa: E402
+    build_knn_graph,
+    cluster_knn_graph,
+    exact_knn,
+)
+from app.services.referentiel import (  # noqa: E402
+    LabelGroup,
+    SkillCluster,
+    build_clusters,
+    emergent_skill_id,
+    merge_cluster,
+    merge_labels,
+)
+
+
+def unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def synthetic(n_clusters=20, per_cluster=25, dim=64, noise=0.03, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = unit(rng.normal(size=(n_clusters, dim)))
+    truth = np.repeat(np.arange(n_clusters), per_cluster)
+    vectors = unit(centers[truth] + noise * rng.normal(size=(len(truth), dim)))
+    return vectors, truth
+
+
+def test_recovers_synthetic_clusters():
+    vectors, truth = synthetic()
+    neighbors, sims = build_knn_graph(vectors, k=10, backend="exact")
+    labels = cluster_knn_graph(vectors, neighbors, sims, threshold=0.85)
+
+    assert len(set(labels.tolist())) == 20
+    for cluster in range(20):
+        assert len(set(truth[labels == cluster].tolist())) == 1
+
+
+def test_centroid_linkage_prevents_chaining():
+    # Each step is very similar to the next, but the two ends are far apart
+    angles = np.linspace(0, np.pi / 2, 12)
+    vectors = unit(np.stack([np.cos(angles), np.sin(angles)], axis=1))
+    neighbors, sims = exact_knn(vectors, k=3)
+    assert sims[:, 1].min() > 0.98
+
+    labels = cluster_knn_graph(vectors, neighbors, sims, threshold=0.9)
+    # Single linkage would return one cluster spanning orthogonal vectors
+    assert len(set(labels.tolist())) > 1
+    for cluster in set(labels.tolist()):
+        members = vectors[labels == cluster]
+        assert (members @ members.T).min() > 0.7
+
+
+def test_hnsw_agrees_with_exact_search():
+    pytest.importorskip("hnswlib")
+    vectors, _ = synthetic(n_clusters=10, per_cluster=50, dim=32, noise=0.3, seed=1)
+    exact, _ = exact_knn(vectors, k=5)
+    approx, sims = build_knn_graph(vectors, k=5, backend="hnsw")
+
+    recall = np.mean([len(set(a) & set(e)) / 5 for a, e in zip(approx, exact, strict=True)])
+    assert recall > 0.95
+    assert np.all(sims[:, 0] > 0.99)  # every vector finds itself first
+
+
+def test_build_clusters_picks_frequent_canonical_label():
+    groups = [
+        LabelGroup("soudure tig", "Soudure TIG", 3, sectors={"BTP": 3}),
+        LabelGroup("soudure", "Soudure", 12, sectors={"Mines": 10, "BTP": 2}, zones={"Nord": 4}),
+        LabelGroup("cariste", "Cariste", 5, zones={"Sud": 5}),
+    ]
+    vectors = unit([[1.0, 0.1], [1.0, 0.0], [0.0, 1.0]])
+    clusters = build_clusters(groups, vectors, np.array([0, 0, 1]))
+
+    soudure, cariste = clusters
+    assert soudure.canonical_label == "Soudure"
+    assert soudure.variant_labels == ["Soudure TIG"]
+    assert soudure.frequency == 15
+    assert soudure.sectors == ["Mines", "BTP"]
+    assert soudure.id == emergent_skill_id("soudure")
+    assert soudure.keys == ["soudure", "soudure tig"]
+    assert abs(np.linalg.norm(soudure.embedding) - 1.0) < 1e-5
+    assert cariste.zones == ["Sud"] and cariste.variant_labels == []
+
+
+def test_merge_labels_keeps_existing_ranking():
+    skill = EmergentSkill(
+        canonical_label="Soudure",
+        variant_labels=["Soudure TIG"],
+        sectors=["Mines"],
+        zones=[],
+        last_seen=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    groups = [
+        LabelGroup("soudage", "Soudage", 2, sectors={"BTP": 2}, zones={"Nord": 2}),
+        LabelGroup("soudure tig", "soudure TIG", 1, sectors={"Mines": 1}),
+        LabelGroup("soudure inox", "Soudure inox", 4, last_seen=datetime(2026, 3, 1, tzinfo=UTC)),
+    ]
+    merged = merge_labels(skill, groups)
+
+    assert merged["variant_labels"] == ["Soudure TIG", "Soudure inox", "Soudage"]
+    assert merged["sectors"] == ["Mines", "BTP"]
+    assert merged["zones"] == ["Nord"]
+    assert merged["last_seen"] == datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def test_pending_cluster_with_an_existing_id_is_merged_not_overwritten():
+    # A pending cluster whose canonical key is an existing skill's (centroid
+    # under the threshold): same uuid5 id
+    skill = EmergentSkill(
+        canonical_label="Soudure",
+        variant_labels=["Soudure TIG"],
+        sectors=["Mines"],
+        zones=["Nord"],
+        first_seen=datetime(2025, 6, 1, tzinfo=UTC),
+        last_seen=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    cluster = SkillCluster(
+        id=emergent_skill_id("soudure"),
+        canonical_label="soudure",
+        variant_labels=["Soudure a l'arc"],
+        frequency=3,
+        sectors=["BTP", "Mines"],
+        zones=[],
+        embedding=[1.0, 0.0],
+        keys=["soudure", "soudure a l'arc"],
+        first_seen=datetime(2026, 2, 1, tzinfo=UTC),
+        last_seen=datetime(2026, 3, 1, tzinfo=UTC),
+    )
+    merged = merge_cluster(skill, cluster)
+
+    assert merged["variant_labels"] == ["Soudure TIG", "Soudure a l'arc"]
+    assert merged["sectors"] == ["Mines", "BTP"]
+    assert merged["zones"] == ["Nord"]
+    assert merged["first_seen"] == datetime(2025, 6, 1, tzinfo=UTC)
+    assert merged["last_seen"] == datetime(2026, 3, 1, tzinfo=UTC)
+    # The skill keeps its own label and centroid
+    assert "canonical_label" not in merged and "embedding" not in merged
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import settings
+from app.db.session import (
+    InstrumentedPool,
+    PoolStats,
+    connect_args,
+    count_connects,
+    engine,
+    engine_status,
+)
+
+
+class FakeConnection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def test_connect_args_disable_statement_caches_for_pgbouncer():
+    assert "statement_cache_size" not in connect_args(False)
+    args = connect_args(True)
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    # Unique names: a statement never clashes with another client's
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+
+
+def test_pool_counts_waits_timeouts_and_overflow():
+    def exhaust(pool: InstrumentedPool) -> None:
+        first, second = pool.connect(), pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        first.close()
+        second.close()
+
+    pool = InstrumentedPool(FakeConnection, pool_size=1, max_overflow=1, timeout=0.05)
+    asyncio.run(greenlet_spawn(exhaust, pool))
+
+    assert pool.stats.acquisitions == 3
+    assert pool.stats.timeouts == 1
+    assert pool.stats.max_overflow_used == 1
+    assert pool.stats.max_wait_s >= 0.05
+
+
+def test_engine_status_reports_configured_limits():
+    status = engine_status(engine)
+    assert status["pool_size"] == settings.DB_POOL_SIZE
+    assert status["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert status["checked_out"] == 0
+    assert status["mean_wait_ms"] == 0.0
+
+
+def test_real_connections_are_counted():
+    def query(sync_engine) -> None:
+        with sync_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        with sync_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    # InstrumentedPool needs an asyncio driver: same listener, sync pool
+    sync_engine = create_engine("sqlite://", poolclass=QueuePool)
+    sync_engine.pool.stats = PoolStats()
+    count_connects(SimpleNamespace(sync_engine=sync_engine))
+    query(sync_engine)
+
+    # The second checkout reuses the pooled connection
+    assert sync_engine.pool.stats.connects == 1
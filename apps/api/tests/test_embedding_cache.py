@@ -0,0 +1,68 @@
+from app.services.embedding_cache import CachedEmbedder
+from app.services.embeddings import EmbeddingService, HashingEncoder
+
+
+class MemoryEmbeddingStore:
+    """In-memory EmbeddingStore."""
+
+    def __init__(self) -> None:
+        self.vectors: dict[str, list[float]] = {}
+
+    async def get_many(self, keys):
+        return {k: self.vectors[k] for k in keys if k in self.vectors}
+
+    async def put_many(self, model, vectors):
+        self.vectors.update(vectors)
+
+
+async def test_cache_layers_and_hit_rate():
+    store = MemoryEmbeddingStore()
+    service = EmbeddingService(HashingEncoder(16), max_wait_ms=1)
+    first = CachedEmbedder(service, store, max_memory_entries=2)
+
+    vectors = await first.embed(["soudure", " soudure ", "cariste", "electricite"], "query")
+    assert vectors[0] == vectors[1]
+    # Three distinct normalized texts encoded once, the spacing variant is free
+    assert service.stats.texts == 3
+    assert len(store.vectors) == 3
+
+    # LRU kept the two most recent; the evicted one comes back from the store
+    await first.embed(["soudure", "electricite"], "query")
+    assert (first.stats.memory_hits, first.stats.store_hits) == (1, 1)
+
+    # A fresh process (empty memory) shares the persistent store
+    second = CachedEmbedder(service, store)
+    await second.embed(["cariste", "cariste  "], "query")
+    assert second.stats.store_hits == 1
+    assert second.stats.misses == 0
+    assert service.stats.texts == 3
+
+    # query: and passage: vectors are cached separately
+    await second.embed(["cariste"], "passage")
+    assert second.stats.misses == 1
+    assert second.stats.hit_rate == 0.5
+    await service.aclose()
+
+
+async def test_case_reaches_the_model_and_all_paths_agree():
+    class RecordingEncoder(HashingEncoder):
+        def encode(self, texts):
+            encoded.extend(texts)
+            return super().encode(texts)
+
+    encoded: list[str] = []
+    store = MemoryEmbeddingStore()
+    service = EmbeddingService(RecordingEncoder(16), max_wait_ms=1)
+    embedder = CachedEmbedder(service, store)
+
+    miss = await embedder.embed_query("Chef de Partie")
+    await embedder.embed_query("chef de partie")
+    assert encoded == ["query: Chef de Partie", "query: chef de partie"]
+
+    # Store hit in a fresh process: the same float16-rounded vector as the miss
+    store_hit = await CachedEmbedder(service, store).embed_query("Chef de Partie")
+    memory_hit = await embedder.embed_query("Chef de Partie")
+    assert miss == store_hit == memory_hit
+    model = (await service.embed(["Chef de Partie"], "query"))[0]
+    assert max(abs(a - b) for a, b in zip(miss, model, strict=True)) < 1e-3
+    await service.aclose()
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+from app.services.embeddings import EmbeddingService, HashingEncoder
+
+
+class RecordingEncoder(HashingEncoder):
+    """HashingEncoder that records each batch and the thread running it."""
+
+    def __init__(self, dimension: int = 16, fail: bool = False) -> None:
+        super().__init__(dimension)
+        self.batches: list[list[str]] = []
+        self.threads: set[str] = set()
+        self.fail = fail
+
+    def encode(self, texts):
+        self.batches.append(texts)
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return super().encode(texts)
+
+
+async def test_concurrent_requests_are_coalesced_into_batches():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, max_batch_size=8, max_wait_ms=20)
+    try:
+        vectors = await asyncio.gather(*(service.embed_query(f"texte {i}") for i in range(30)))
+    finally:
+        await service.aclose()
+
+    assert len(vectors) == 30 and all(len(v) == 16 for v in vectors)
+    assert max(len(b) for b in encoder.batches) <= 8
+    assert len(encoder.batches) == 4
+    assert service.stats.mean_batch_size == 7.5
+    assert all(name.startswith("embed") for name in encoder.threads)
+    # Results are routed back to the right caller
+    assert vectors[3] == encoder.encode(["query: texte 3"])[0]
+
+
+async def test_e5_prefixes_and_errors():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, max_wait_ms=1)
+    await service.embed(["soudure"], "passage")
+    await service.embed_query("soudeur")
+    assert encoder.batches == [["passage: soudure"], ["query: soudeur"]]
+    await service.aclose()
+
+    failing = EmbeddingService(RecordingEncoder(fail=True), max_wait_ms=1)
+    try:
+        await failing.embed_query("soudure")
+    except RuntimeError as exc:
+        assert "crashed" in str(exc)
+    else:
+        raise AssertionError("encoder error not propagated")
+    finally:
+        await failing.aclose()
+
+
+def test_hashing_encoder_is_a_usable_stand_in():
+    encoder = HashingEncoder(256)
+    a, b, c = encoder.encode(["Conduite d'engins", "conduite d engins lourds", "Pâtisserie"])
+
+    def cosine(u, v):
+        return sum(x * y for x, y in zip(u, v, strict=True))
+
+    assert abs(cosine(a, a) - 1.0) < 1e-9
+    assert cosine(a, b) > cosine(a, c)
+
+
+def test_embeddings_endpoint(monkeypatch):
+    embedder = CachedEmbedder(EmbeddingService(HashingEncoder(32), max_wait_ms=1))
+    monkeypatch.setitem(app.dependency_overrides, get_embedder, lambda: embedder)
+    client = TestClient(app)
+    response = client.post(
+        "/api/embeddings", json={"texts": ["soudure", "cariste"], "kind": "passage"}
+    )
+    client.post("/api/embeddings", json={"texts": [" soudure"], "kind": "passage"})
+    stats = client.get("/api/embeddings/stats").json()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model"] == "hashing-32"
+    assert body["dimension"] == 32
+    assert len(body["embeddings"]) == 2
+    assert stats["cache_lookups"] == 3
+    assert stats["cache_hit_rate"] == 1 / 3
@@ -9,3 +9,38 @@ def test_health_returns_ok():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_health_db_reports_pool_usage():
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert response.json()["checked_out"] == 0
+    assert response.json()["saturation"] == 0.0
+
+
+def test_health_ready_fails_when_the_database_is_unreachable(monkeypatch):
+    async def unreachable(engine):
+        raise ConnectionRefusedError("Connect call failed")
+
+    monkeypatch.setattr("app.main.ping", unreachable)
+    monkeypatch.setattr("app.main.settings.MODEL_PRELOAD", [])
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["db_primary"].startswith("ConnectionRefusedError")
+
+
+def test_health_ready_requires_the_preloaded_models(monkeypatch):
+    async def reachable(engine):
+        pass
+
+    monkeypatch.setattr("app.main.ping", reachable)
+    monkeypatch.setattr("app.main.settings.MODEL_PRELOAD", [])
+    assert client.get("/health/ready").json() == {
+        "status": "ready",
+        "checks": {"db_primary": "ok"},
+    }
+
+    monkeypatch.setattr("app.main.settings.MODEL_PRELOAD", ["stt"])
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["model_stt"] == "pending"
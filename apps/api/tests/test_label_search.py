@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.db.session import get_read_session
+from app.main import app
+from app.routers import labels
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+from app.services.embeddings import EmbeddingService, HashingEncoder
+from app.services.label_search import (
+    LabelMatch,
+    hybrid_search_statement,
+    reciprocal_rank_fusion,
+)
+
+
+def row(leg, source, label_id, label, rank, rome_code=None):
+    return SimpleNamespace(
+        leg=leg, source=source, id=label_id, label=label, rome_code=rome_code, rank=rank
+    )
+
+
+def test_rrf_rewards_labels_found_by_several_legs():
+    rows = [
+        row("lexical", "appellation", "11111", "Menager", 1),
+        row("lexical", "competence", "100201", "Entretien menager", 2),
+        row("fulltext", "competence", "100201", "Entretien menager", 1),
+        row("vector", "competence", "100201", "Entretien menager", 3),
+        row("vector", "emergent", "e1", "Agent de nettoyage", 1),
+    ]
+    fused = reciprocal_rank_fusion(rows, k=60)
+
+    assert [m.id for m in fused] == ["100201", "e1", "11111"]
+    assert fused[0].ranks == {"lexical": 2, "fulltext": 1, "vector": 3}
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61 + 1 / 63)
+    # Same rank in one leg: ties broken by label
+    assert fused[1].label == "Agent de nettoyage" and fused[1].score == fused[2].score
+
+
+def test_statement_is_one_round_trip_with_optional_vector_leg():
+    dialect = postgresql.dialect()
+    lexical_only = str(hybrid_search_statement("le menage", None).compile(dialect=dialect))
+    hybrid = hybrid_search_statement("le menage", [0.0] * 4, sources=("emergent",))
+    compiled = hybrid.compile(dialect=dialect)
+
+    assert "<=>" not in lexical_only and "f_unaccent" in lexical_only
+    assert "websearch_to_tsquery('french_unaccent'::regconfig" in lexical_only
+    assert "emergent_skills.embedding <=>" in str(compiled)
+    assert "rome_competences" not in str(compiled)
+    # The query text and vector are bound once however many legs use them
+    assert {"query", "embedding"} <= set(compiled.params)
+
+
+def test_search_endpoint(monkeypatch):
+    async def no_session():
+        yield None
+
+    captured = {}
+
+    async def fake_search(session, query, embedding, **kwargs):
+        captured.update(kwargs, embedding=embedding)
+        return [LabelMatch("appellation", "11111", "Menager", "K1304", 0.03, {"lexical": 1})]
+
+    embedder = CachedEmbedder(EmbeddingService(HashingEncoder(settings.EMBEDDING_DIMENSION)))
+    monkeypatch.setitem(app.dependency_overrides, get_read_session, no_session)
+    monkeypatch.setitem(app.dependency_overrides, get_embedder, lambda: embedder)
+    monkeypatch.setattr(labels, "search_labels", fake_search)
+    client = TestClient(app)
+
+    response = client.get("/api/labels/search", params={"q": "le menage", "source": "appellation"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"][0]["rome_code"] == "K1304"
+    assert captured["sources"] == ["appellation"]
+    assert len(captured["embedding"]) == settings.EMBEDDING_DIMENSION
+
+    response = client.get("/api/labels/search", params={"q": "menage", "vector": "false"})
+    assert response.status_code == 200
+    assert captured["embedding"] is None
+    assert client.get("/api/labels/search", params={"q": ""}).status_code == 422
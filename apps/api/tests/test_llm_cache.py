@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.services.llm import ExtractionClient, LLMClient, PromptTemplate, make_llm_client
+from app.services.llm_cache import MemoryResponseCache, cache_key, normalize_input
+
+PROMPT = PromptTemplate(version="test-v1", system="Extrais.", user="Texte : {text}")
+
+
+def make_echo_llm() -> tuple[FastAPI, dict]:
+    """OpenAI-compatible stub answering {"text": <user message>}."""
+    fake = FastAPI()
+    state = {"requests": [], "in_flight": 0, "max_in_flight": 0}
+
+    @fake.post("/v1/chat/completions")
+    async def chat(request: Request) -> dict:
+        body = await request.json()
+        user = body["messages"][-1]["content"]
+        state["requests"].append(user)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return {"choices": [{"message": {"content": json.dumps({"text": user})}}]}
+
+    return fake, state
+
+
+async def test_cache_hits_skip_the_llm():
+    fake, state = make_echo_llm()
+    cache = MemoryResponseCache()
+    transport = httpx.ASGITransport(app=fake)
+    texts = ["beta  offre", "alpha offre", "beta offre", "gamma\n\n offre"]
+
+    async with make_llm_client(base_url="http://vllm/v1", transport=transport) as client:
+        extractor = ExtractionClient(LLMClient(client, model="m"), PROMPT, json.loads, cache=cache)
+        first = await extractor.run(texts)
+        # Whitespace-only variants share one request; misses are sent sorted
+        assert state["requests"] == [
+            "Texte : alpha offre",
+            "Texte : beta offre",
+            "Texte : gamma\noffre",
+        ]
+        # The first request warms the prefix cache alone
+        assert state["max_in_flight"] <= 2
+        assert [c.value["text"] for c in first][:3] == [
+            "Texte : beta offre",
+            "Texte : alpha offre",
+            "Texte : beta offre",
+        ]
+        assert not any(c.cached for c in first)
+
+        second = await extractor.run(texts)
+        assert len(state["requests"]) == 3
+        assert all(c.cached for c in second)
+
+        bumped = PromptTemplate(version="test-v2", system=PROMPT.system, user=PROMPT.user)
+        extractor = ExtractionClient(LLMClient(client, model="m"), bumped, json.loads, cache=cache)
+        await extractor.run(texts[:1])
+        assert len(state["requests"]) == 4
+
+
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(max_entries=2)
+    await cache.put_many("m", "v1", {"a": "1", "b": "2"})
+    assert await cache.get_many(["a"]) == {"a": "1"}
+    await cache.put_many("m", "v1", {"c": "3"})
+    assert await cache.get_many(["a", "b", "c"]) == {"a": "1", "c": "3"}
+
+
+def test_cache_key_depends_on_model_version_and_normalized_input():
+    base = cache_key("m", "v1", normalize_input("Conducteur  d'engins\n"))
+    assert base == cache_key("m", "v1", normalize_input(" Conducteur d'engins"))
+    assert base != cache_key("m", "v2", normalize_input("Conducteur d'engins"))
+    assert base != cache_key("other", "v1", normalize_input("Conducteur d'engins"))
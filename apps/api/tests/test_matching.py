@@ -0,0 +1,102 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.db.session import get_read_session
+from app.main import app
+from app.routers import matching
+from app.services.embedding_cache import CachedEmbedder, get_embedder
+from app.services.embeddings import EmbeddingService, HashingEncoder
+from app.services.matching import ProfileMatch, nearest_profiles_query
+
+
+async def _no_session():
+    yield None
+
+
+embedder = CachedEmbedder(EmbeddingService(HashingEncoder(settings.EMBEDDING_DIMENSION)))
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _overrides(monkeypatch):
+    monkeypatch.setitem(app.dependency_overrides, get_read_session, _no_session)
+    monkeypatch.setitem(app.dependency_overrides, get_embedder, lambda: embedder)
+
+
+def test_search_rejects_wrong_dimension():
+    response = client.post("/api/matching/search", json={"embedding": [0.1, 0.2]})
+    assert response.status_code == 422
+
+
+def test_search_requires_exactly_one_need():
+    assert client.post("/api/matching/search", json={}).status_code == 422
+    both = {"texte": "soudeur", "embedding": [0.0] * settings.EMBEDDING_DIMENSION}
+    assert client.post("/api/matching/search", json=both).status_code == 422
+
+
+def test_search_by_text_uses_the_cached_embedder(monkeypatch):
+    received = []
+
+    async def fake_search(session, embedding, **kwargs):
+        received.append(embedding)
+        return [], 40
+
+    monkeypatch.setattr(matching, "search_profiles", fake_search)
+    hits = embedder.stats.memory_hits
+
+    for texte in ("Conducteur d'engins", "Conducteur  d'engins "):
+        response = client.post("/api/matching/search", json={"texte": texte})
+        assert response.status_code == 200
+
+    assert len(received[0]) == settings.EMBEDDING_DIMENSION
+    assert received[0] == received[1]
+    assert embedder.stats.memory_hits == hits + 1
+
+
+def test_search_returns_anonymised_results(monkeypatch):
+    profile_id = uuid.uuid4()
+    captured = {}
+
+    async def fake_search(session, embedding, **kwargs):
+        captured.update(kwargs)
+        match = ProfileMatch(
+            profile_id=profile_id,
+            score=0.91,
+            zone_geographique="Dumbea",
+            disponibilite="immediate",
+            competences=["Conduite d'engins lourds"],
+        )
+        return [match], 64
+
+    monkeypatch.setattr(matching, "search_profiles", fake_search)
+
+    response = client.post(
+        "/api/matching/search",
+        json={
+            "embedding": [0.0] * settings.EMBEDDING_DIMENSION,
+            "zone_geographique": "Dumbea",
+            "ef_search": 64,
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ef_search"] == 64
+    assert body["results"][0]["profile_id"] == str(profile_id)
+    assert body["results"][0]["competences"] == ["Conduite d'engins lourds"]
+    assert "user_id" not in body["results"][0]
+    assert captured["zone_geographique"] == "Dumbea"
+
+
+def test_nearest_profiles_are_sorted_again_after_the_index_scan():
+    stmt = nearest_profiles_query([0.0] * settings.EMBEDDING_DIMENSION, zone_geographique="Kone")
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("WITH nearest AS MATERIALIZED (SELECT")
+    assert "profiles.zone_geographique = %(zone_geographique_1)s::VARCHAR" in sql
+    assert "ORDER BY profiles.embedding <=> %(embedding_1)s LIMIT %(param_1)s::INTEGER)" in sql
+    assert sql.endswith("FROM nearest ORDER BY nearest.distance")
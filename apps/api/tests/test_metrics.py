@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.main import app
+from app.metrics import instrument_engine, observe_inference, record_queries
+
+client = TestClient(app)
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_labeled_by_route_template():
+    before = sample("kompetens_http_requests_total", method="GET", route="/health", status="200")
+    client.get("/health")
+    after = sample("kompetens_http_requests_total", method="GET", route="/health", status="200")
+    assert after == before + 1
+    assert sample("kompetens_db_queries_per_request_count", route="/health") >= 1
+
+
+def test_unknown_paths_share_one_label():
+    client.get("/does-not-exist/42")
+    assert (
+        sample("kompetens_http_requests_total", method="GET", route="<unmatched>", status="404")
+        >= 1
+    )
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'kompetens_http_request_duration_seconds_bucket{le="0.005",method="GET"' in (
+        response.text
+    )
+    assert 'kompetens_db_pool_checked_out{pool="primary"} 0.0' in response.text
+
+
+def test_observe_inference_skips_failures():
+    labels = {"service": "tts", "model": "test-voice"}
+    with observe_inference("tts", "test-voice"):
+        pass
+    with pytest.raises(RuntimeError), observe_inference("tts", "test-voice"):
+        raise RuntimeError("synthesis failed")
+    assert sample("kompetens_model_inference_seconds_count", **labels) == 1
+
+
+def test_queries_are_counted_inside_record_queries_only():
+    # Cursor events are the same on the sync engine under an AsyncEngine
+    engine = create_engine("sqlite://")
+    instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with record_queries() as queries:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+    assert queries.count == 2
+    assert queries.seconds > 0
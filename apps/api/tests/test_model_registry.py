@@ -0,0 +1,95 @@
+from functools import lru_cache
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services.model_registry import ModelRegistry
+
+
+class FakeModel:
+    model_name = "fake-1"
+
+    def __init__(self):
+        self.warmups = 0
+        self.closed = False
+
+    async def warmup(self):
+        self.warmups += 1
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_registry():
+    loads = []
+
+    @lru_cache
+    def get_fake():
+        loads.append(1)
+        return FakeModel()
+
+    @lru_cache
+    def get_broken():
+        raise RuntimeError("faster-whisper is not installed")
+
+    registry = ModelRegistry()
+    registry.register("fake", get_fake)
+    registry.register("broken", get_broken)
+    return registry, get_fake, loads
+
+
+async def test_load_all_loads_once_warms_and_reports_failures():
+    registry, get_fake, loads = make_registry()
+
+    fake, broken = await registry.load_all(["fake", "broken"])
+    await registry.load("fake")
+
+    assert loads == [1] and get_fake().warmups == 1
+    assert fake.status == "ready" and fake.model == "fake-1" and fake.load_s >= 0
+    assert broken.status == "failed" and "not installed" in broken.error
+    # The dependency returns the preloaded instance
+    assert registry.is_loaded("fake") and not registry.is_loaded("broken")
+
+
+async def test_lazily_loaded_model_is_reported_and_closed():
+    registry, get_fake, _ = make_registry()
+    model = get_fake()
+
+    assert registry.info()[0].status == "ready"
+    await registry.aclose()
+
+    assert model.closed and not registry.is_loaded("fake")
+    assert registry.info()[0].status == "pending"
+
+
+async def test_close_clears_getters_wrapping_the_model():
+    registry = ModelRegistry()
+
+    @lru_cache
+    def get_fake():
+        return FakeModel()
+
+    @lru_cache
+    def get_wrapper():
+        return [get_fake()]
+
+    registry.register("fake", get_fake, dependents=(get_wrapper,))
+    closed = get_wrapper()[0]
+    await registry.aclose()
+
+    # A new wrapper is built around a new, open model
+    assert closed.closed and not get_wrapper()[0].closed
+
+
+def test_lifespan_preloads_models(monkeypatch):
+    registry, get_fake, _ = make_registry()
+    monkeypatch.setattr("app.main.get_model_registry", lambda: registry)
+    monkeypatch.setattr(settings, "MODEL_PRELOAD", ["fake"])
+
+    with TestClient(app) as client:
+        models = client.get("/health/models").json()["models"]
+        model = get_fake()
+
+    assert [(m["name"], m["status"]) for m in models] == [("fake", "ready"), ("broken", "pending")]
+    assert model.warmups == 1 and model.closed
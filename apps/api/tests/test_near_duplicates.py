@@ -0,0 +1,39 @@
+import uuid
+
+from app.services.near_duplicates import assign_duplicates, fingerprint, jaccard
+
+OFFER = (
+    "Conducteur d'engins H/F - Koniambo Nickel recrute un conducteur d'engins "
+    "pour son site de Voh. Permis C exige, experience de 2 ans sur chargeuse "
+    "et tombereau. Travail posté en 2x8, logement possible a Koné."
+)
+REPOST = (
+    "URGENT !! Conducteur d'engins H/F - Koniambo Nickel recrute un conducteur "
+    "d'engins pour son site de Voh. Permis C exigé, expérience de 2 ans sur "
+    "chargeuse et tombereau. Travail poste en 2x8, logement possible a Kone. "
+    "Tel 28 12 34"
+)
+OTHER = (
+    "Aide-soignant(e) au CHS Albert Bousquet a Nouméa. Diplome d'Etat exige, "
+    "travail de nuit et week-end, temps plein, poste a pourvoir immediatement."
+)
+
+
+def test_repost_is_a_near_duplicate():
+    offer, repost, other = fingerprint(OFFER), fingerprint(REPOST), fingerprint(OTHER)
+    assert jaccard(offer.shingles, repost.shingles) >= 0.7
+    assert set(offer.bands) & set(repost.bands)
+    assert not set(offer.bands) & set(other.bands)
+
+
+def test_assign_duplicates_against_stored_and_within_batch():
+    stored_id, repost_id, other_id, other_repost_id = (uuid.uuid4() for _ in range(4))
+    duplicates = assign_duplicates(
+        new=[
+            (repost_id, fingerprint(REPOST)),
+            (other_id, fingerprint(OTHER)),
+            (other_repost_id, fingerprint(OTHER + " Contact : rh@chs.nc")),
+        ],
+        candidates=[(stored_id, fingerprint(OFFER))],
+    )
+    assert duplicates == {repost_id: stored_id, other_repost_id: other_id}
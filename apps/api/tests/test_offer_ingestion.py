@@ -0,0 +1,225 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+from app.services.offer_ingestion import (
+    CollectedOffer,
+    FetchValidators,
+    OfferCollector,
+    OfferSource,
+    detect_zone,
+    extract_links,
+    html_offer_parser,
+    make_client,
+    resolve_canonicals,
+)
+
+LISTING_ETAG = '"listing-v1"'
+OFFER_COUNT = 12
+
+
+def make_fixture_server(
+    delay_s: float = 0.01, failing: set[int] | None = None
+) -> tuple[FastAPI, dict]:
+    """Local fixture site: one listing page linking to OFFER_COUNT offer pages.
+
+    Offers in ``failing`` answer 503 until ``state["failing"]`` is emptied.
+    """
+    fixture = FastAPI()
+    state = {
+        "in_flight": 0,
+        "max_in_flight": 0,
+        "offer_hits": 0,
+        "listing_hits": 0,
+        "failing": set(failing or ()),
+    }
+
+    @fixture.get("/offres")
+    async def listing(request: Request) -> Response:
+        state["listing_hits"] += 1
+        if request.headers.get("if-none-match") == LISTING_ETAG:
+            return Response(status_code=304)
+        links = "".join(f'<a href="/offre/{i}">Offre {i}</a>' for i in range(OFFER_COUNT))
+        # Duplicate link and unrelated link must be ignored
+        links += '<a href="/offre/0">Encore</a><a href="/contact">Contact</a>'
+        return Response(
+            f"<html><body>{links}</body></html>",
+            media_type="text/html",
+            headers={"ETag": LISTING_ETAG},
+        )
+
+    @fixture.get("/offre/{offer_id}")
+    async def offer(offer_id: int) -> Response:
+        state["offer_hits"] += 1
+        if offer_id in state["failing"]:
+            return Response(status_code=503)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(delay_s)
+        state["in_flight"] -= 1
+        body = (
+            f"<html><head><script>var x = 1;</script></head><body>"
+            f"<h1>Conducteur d'engins #{offer_id}</h1>"
+            f"<p>Chantier a Koné, permis C exige.</p></body></html>"
+        )
+        return Response(body, media_type="text/html")
+
+    return fixture, state
+
+
+class MemoryStore:
+    """In-memory OfferStore."""
+
+    def __init__(self, known: set[str] | None = None) -> None:
+        self.offers: dict[str, CollectedOffer] = {}
+        self.validators: dict[str, FetchValidators] = {}
+        self.batches: list[int] = []
+        self.known = known or set()
+
+    async def known_urls(self, urls):
+        return {u for u in urls if u in self.known or u in self.offers}
+
+    async def get_validators(self, url):
+        return self.validators.get(url)
+
+    async def save_validators(self, url, validators):
+        self.validators[url] = validators
+
+    async def save_offers(self, offers):
+        self.batches.append(len(offers))
+        new = [o for o in offers if o.source_url not in self.offers]
+        for o in new:
+            self.offers[o.source_url] = o
+        return len(new), 0
+
+
+def make_source(max_concurrency: int) -> OfferSource:
+    return OfferSource(
+        name="emploi_nc",
+        listing_urls=["http://fixture/offres"],
+        parse_listing=lambda url, html: extract_links(url, html, r"/offre/\d+$"),
+        parse_offer=html_offer_parser("emploi_nc"),
+        max_concurrency=max_concurrency,
+    )
+
+
+async def test_collect_respects_concurrency_and_batches():
+    fixture, state = make_fixture_server()
+    store = MemoryStore(known={"http://fixture/offre/3"})
+    transport = httpx.ASGITransport(app=fixture)
+
+    async with make_client(transport=transport) as client:
+        collector = OfferCollector(client, store, batch_size=5)
+        stats = (await collector.collect([make_source(max_concurrency=3)]))["emploi_nc"]
+
+    assert stats.offers_seen == OFFER_COUNT
+    assert stats.offers_known == 1
+    assert stats.offers_fetched == OFFER_COUNT - 1
+    assert stats.offers_inserted == OFFER_COUNT - 1
+    assert state["max_in_flight"] <= 3
+    assert max(store.batches) <= 5
+    offer = store.offers["http://fixture/offre/0"]
+    assert offer.zone == "Kone"
+    assert "var x" not in offer.text
+
+
+async def test_second_run_uses_conditional_get():
+    fixture, state = make_fixture_server()
+    store = MemoryStore()
+    transport = httpx.ASGITransport(app=fixture)
+
+    async with make_client(transport=transport) as client:
+        collector = OfferCollector(client, store)
+        await collector.collect([make_source(max_concurrency=4)])
+        second = (await collector.collect([make_source(max_concurrency=4)]))["emploi_nc"]
+
+    assert store.validators["http://fixture/offres"].etag == LISTING_ETAG
+    assert second.listings_not_modified == 1
+    assert second.offers_fetched == 0
+    assert state["offer_hits"] == OFFER_COUNT
+
+
+async def test_listing_with_a_failed_offer_is_fetched_again():
+    fixture, state = make_fixture_server(failing={5})
+    store = MemoryStore()
+    transport = httpx.ASGITransport(app=fixture)
+
+    async with make_client(transport=transport) as client:
+        collector = OfferCollector(client, store)
+        first = (await collector.collect([make_source(max_concurrency=4)]))["emploi_nc"]
+        # Validators are not saved: the next run must not get a 304
+        assert first.errors == 1
+        assert "http://fixture/offres" not in store.validators
+
+        state["failing"].clear()
+        second = (await collector.collect([make_source(max_concurrency=4)]))["emploi_nc"]
+
+    assert second.listings_fetched == 1
+    assert second.offers_inserted == 1
+    assert "http://fixture/offre/5" in store.offers
+    assert store.validators["http://fixture/offres"].etag == LISTING_ETAG
+
+
+def test_detect_zone_ignores_accents():
+    assert detect_zone("Poste basé à Nouméa") == "Noumea"
+    assert detect_zone("Aucune commune") is None
+
+
+async def test_unparsable_offer_is_skipped_and_its_listing_fetched_again():
+    fixture, _ = make_fixture_server()
+    store = MemoryStore()
+    source = make_source(max_concurrency=4)
+    parse = source.parse_offer
+
+    def fragile_parse(url, html, content_type):
+        if url.endswith("/offre/5"):
+            raise KeyError("titre")
+        return parse(url, html, content_type)
+
+    source.parse_offer = fragile_parse
+    async with make_client(transport=httpx.ASGITransport(app=fixture)) as client:
+        stats = (await OfferCollector(client, store).collect([source]))["emploi_nc"]
+
+    assert stats.errors == 1 and stats.failure is None
+    assert stats.offers_inserted == OFFER_COUNT - 1
+    assert "http://fixture/offres" not in store.validators
+
+
+async def test_failing_source_does_not_stop_the_others():
+    class BrokenStore(MemoryStore):
+        async def save_offers(self, offers):
+            if any(o.source == "broken" for o in offers):
+                raise ConnectionError("database is gone")
+            return await super().save_offers(offers)
+
+    fixture, _ = make_fixture_server()
+    store = BrokenStore()
+    broken = make_source(max_concurrency=2)
+    broken.name, broken.parse_offer = "broken", html_offer_parser("broken")
+    async with make_client(transport=httpx.ASGITransport(app=fixture)) as client:
+        # Same pages, the healthy source must not know them yet
+        results = await OfferCollector(client, store, batch_size=1).collect(
+            [broken, make_source(max_concurrency=2)]
+        )
+
+    assert "database is gone" in results["broken"].failure
+    assert results["emploi_nc"].failure is None
+    assert results["emploi_nc"].offers_inserted == OFFER_COUNT
+
+
+def test_copies_point_at_the_canonical_actually_stored():
+    stored_id, kept, dropped, lost = (uuid.uuid4() for _ in range(4))
+    copies = [uuid.uuid4() for _ in range(4)]
+    # Canonicals of the batch; the insert of http://a/2 was skipped on a
+    # source_url conflict, http://a/3 is not stored at all
+    batch_urls = {kept: "http://a/1", dropped: "http://a/2", lost: "http://a/3"}
+    stored = {"http://a/1": kept, "http://a/2": stored_id}
+    duplicates = dict(zip(copies, [stored_id, kept, dropped, lost], strict=True))
+
+    assert resolve_canonicals(duplicates, batch_urls, stored) == {
+        copies[0]: stored_id,
+        copies[1]: kept,
+        copies[2]: stored_id,
+    }
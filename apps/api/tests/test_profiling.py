@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.metrics import instrument_engine
+
+pytest.importorskip("pyinstrument")
+
+from app.profiling import ProfilingMiddleware, prune_profiles  # noqa: E402
+
+engine = create_engine("sqlite://")
+instrument_engine(SimpleNamespace(sync_engine=engine))
+
+
+def make_client(directory, **options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/matching/search")
+    async def search() -> dict:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    app.add_middleware(ProfilingMiddleware, directory=directory, **options)
+    return TestClient(app)
+
+
+def test_header_profiles_the_request_with_its_sql_timeline(tmp_path):
+    client = make_client(tmp_path, token="s3cret")
+    response = client.get("/api/matching/search", headers={"x-profile": "s3cret"})
+    profile_id = response.headers["x-profile-id"]
+
+    flamegraph = json.loads((tmp_path / f"{profile_id}.speedscope.json").read_text())
+    assert "speedscope" in flamegraph["$schema"]
+    request = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert request["route"] == "/api/matching/search"
+    assert request["status"] == 200
+    assert request["sql"]["count"] == 2
+    assert [q["statement"] for q in request["sql"]["timeline"]] == ["SELECT 1", "SELECT 2"]
+
+
+def test_requests_are_not_profiled_unless_asked_or_drawn(tmp_path):
+    client = make_client(tmp_path, token="s3cret")
+    assert "x-profile-id" not in client.get("/api/matching/search").headers
+    # A header without the token is ignored
+    response = client.get("/api/matching/search", headers={"x-profile": "1"})
+    assert "x-profile-id" not in response.headers
+    # And so is any header while no token is configured
+    response = make_client(tmp_path).get("/api/matching/search", headers={"x-profile": "1"})
+    assert "x-profile-id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sampling_only_draws_the_configured_paths(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, paths=("/api/matching",))
+    assert "x-profile-id" in client.get("/api/matching/search").headers
+    assert "x-profile-id" not in client.get("/health").headers
+
+
+def test_only_the_most_recent_profiles_are_kept(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, paths=("/api/matching",), max_profiles=2)
+    ids = [client.get("/api/matching/search").headers["x-profile-id"] for _ in range(3)]
+
+    kept = sorted(path.name for path in tmp_path.iterdir())
+    assert kept == sorted(
+        f"{i}{suffix}" for i in ids[1:] for suffix in (".json", ".speedscope.json")
+    )
+
+
+def test_prune_leaves_other_files(tmp_path):
+    for name in ("20260101-000000-a", "20260102-000000-b"):
+        (tmp_path / f"{name}.speedscope.json").write_text("{}")
+        (tmp_path / f"{name}.json").write_text("{}")
+    (tmp_path / ".gitkeep").write_text("")
+
+    assert prune_profiles(tmp_path, keep=1) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        ".gitkeep",
+        "20260102-000000-b.json",
+        "20260102-000000-b.speedscope.json",
+    ]
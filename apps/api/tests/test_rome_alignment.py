@@ -0,0 +1,107 @@
+import asyncio
+import uuid
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.clustering import top_k  # noqa: E402
+from app.services.rome_alignment import (  # noqa: E402
+    Alignment,
+    RomeMatrix,
+    align,
+    rome_fingerprint,
+    write_alignments,
+)
+
+
+def unit(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_top_k_matches_brute_force(monkeypatch):
+    rng = np.random.default_rng(0)
+    queries = unit(rng.normal(size=(57, 16)))
+    corpus = unit(rng.normal(size=(300, 16)))
+    # Force many small blocks
+    monkeypatch.setattr("app.services.clustering.EXACT_BLOCK_BUDGET", 1000)
+    indexes, sims = top_k(queries, corpus, 4)
+
+    expected = np.argsort(-(queries @ corpus.T), axis=1)[:, :4]
+    assert np.array_equal(indexes, expected)
+    assert np.all(np.diff(sims, axis=1) <= 0)
+
+
+def test_align_prefers_competences_above_threshold():
+    rome = RomeMatrix(
+        kinds=["appellation", "competence", "competence"],
+        keys=["10357", "100007", "300381"],
+        codes=["F1702", "100007", "300381"],
+        labels=["Electricien du batiment", "Realiser un cablage", "Conduire un engin"],
+        vectors=unit([[1.0, 0.0, 0.0], [0.9, 0.3, 0.0], [0.0, 0.0, 1.0]]),
+        fingerprint="test",
+    )
+    ids = [uuid.uuid4() for _ in range(3)]
+    skills = unit([[1.0, 0.05, 0.0], [1.0, -0.6, 0.0], [0.0, 1.0, 0.1]])
+    electricite, appellation_only, unrelated = align(ids, skills, rome, threshold=0.8)
+
+    # The appellation is closer, but a competence above the threshold wins
+    assert (electricite.rome_code, electricite.kind) == ("100007", "competence")
+    assert appellation_only.rome_code == "F1702"
+    assert appellation_only.rome_label == "Electricien du batiment"
+    assert unrelated.rome_code is None and unrelated.similarity < 0.8
+
+
+def test_rome_matrix_cache_roundtrip(tmp_path):
+    rows = [("competence", "100007", "100007", "Realiser un cablage")]
+    matrix = RomeMatrix(
+        kinds=["competence"],
+        keys=["100007"],
+        codes=["100007"],
+        labels=["Realiser un cablage"],
+        vectors=unit([[0.6, 0.8]]),
+        fingerprint=rome_fingerprint("e5", rows),
+    )
+    path = tmp_path / "rome" / "rome_embeddings.npz"
+    matrix.save(path)
+    loaded = RomeMatrix.load(path)
+
+    assert loaded.labels == matrix.labels and loaded.keys == matrix.keys
+    assert loaded.from_cache and not matrix.from_cache
+    assert np.allclose(loaded.vectors, matrix.vectors)
+    assert loaded.fingerprint == rome_fingerprint("e5", rows)
+    assert loaded.fingerprint != rome_fingerprint("e5", [*rows, ("competence", "1", "1", "x")])
+    assert RomeMatrix.load(tmp_path / "missing.npz") is None
+
+
+def test_write_alignments_records_the_kind_of_code():
+    class FakeSession:
+        def __init__(self):
+            self.rows = []
+
+        async def execute(self, stmt, rows):
+            self.rows.extend(rows)
+
+        async def commit(self):
+            pass
+
+    unchanged, moved = uuid.uuid4(), uuid.uuid4()
+    alignments = [
+        Alignment(unchanged, "100007", "Realiser un cablage", 0.9, "competence"),
+        Alignment(moved, "F1702", "Electricien du batiment", 0.85, "appellation"),
+    ]
+    current = {
+        unchanged: ("100007", "Realiser un cablage", "competence"),
+        moved: ("100007", "Realiser un cablage", "competence"),
+    }
+    session = FakeSession()
+    assert asyncio.run(write_alignments(session, alignments, current)) == 1
+    assert session.rows == [
+        {
+            "id": moved,
+            "rome_code": "F1702",
+            "rome_label": "Electricien du batiment",
+            "rome_kind": "appellation",
+        }
+    ]
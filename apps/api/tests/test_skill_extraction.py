@@ -0,0 +1,118 @@
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.services.llm import LLMClient, make_llm_client
+from app.services.skill_extraction import (
+    ExtractionWorker,
+    PendingOffer,
+    SkillData,
+    make_offer_extractor,
+    parse_skills,
+)
+
+
+def make_fake_vllm(delay_s: float = 0.01) -> tuple[FastAPI, dict]:
+    """OpenAI-compatible stub: one skill per offer, invalid JSON for "CASSE"."""
+    fake = FastAPI()
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+
+    @fake.post("/v1/chat/completions")
+    async def chat(request: Request) -> dict:
+        body = await request.json()
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(delay_s)
+        state["in_flight"] -= 1
+        offer = body["messages"][-1]["content"]
+        if "CASSE" in offer:
+            content = "Desole, je ne peux pas."
+        else:
+            skills = [{"label": "Conduite d'engins", "niveau": "Confirmé", "contexte": "mine"}]
+            content = json.dumps({"competences": skills})
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20},
+        }
+
+    return fake, state
+
+
+class MemoryExtractionStore:
+    """In-memory ExtractionStore; claimed offers are skipped like SKIP LOCKED."""
+
+    def __init__(self, texts: list[str]) -> None:
+        self.offers = [PendingOffer(id=uuid.uuid4(), text=t) for t in texts]
+        self.processed: set[uuid.UUID] = set()
+        self.locked: set[uuid.UUID] = set()
+        self.skills: list[tuple[uuid.UUID, SkillData]] = []
+
+    @asynccontextmanager
+    async def claim(self, limit, exclude):
+        batch_offers = [
+            o for o in self.offers if o.id not in self.processed | self.locked | exclude
+        ][:limit]
+        self.locked.update(o.id for o in batch_offers)
+        store = self
+
+        class Batch:
+            offers = batch_offers
+
+            async def complete(self, results):
+                for offer_id, skills in results.items():
+                    store.skills.extend((offer_id, s) for s in skills)
+                store.processed.update(results)
+                return sum(len(s) for s in results.values())
+
+        try:
+            yield Batch()
+        finally:
+            self.locked.difference_update(o.id for o in batch_offers)
+
+
+async def test_worker_drains_queue_with_bounded_concurrency():
+    fake, state = make_fake_vllm()
+    store = MemoryExtractionStore([f"Offre {i}" for i in range(40)] + ["Offre CASSE"])
+    transport = httpx.ASGITransport(app=fake)
+
+    async with make_llm_client(base_url="http://vllm/v1", transport=transport) as client:
+        extractor = make_offer_extractor(LLMClient(client), concurrency=16)
+        stats = await ExtractionWorker(store, extractor, batch_size=8).run()
+
+    assert stats.offers_processed == 40
+    assert stats.offers_failed == 1
+    assert stats.skills_inserted == 40
+    assert stats.completion_tokens == 40 * 20
+    # The failed offer stays unprocessed and is not retried in the same run
+    assert len(store.processed) == 40
+    assert state["requests"] == 41
+    assert 8 < state["max_in_flight"] <= 16
+    assert store.skills[0][1].level == "confirme"
+
+
+async def test_worker_limit():
+    fake, _ = make_fake_vllm(delay_s=0)
+    store = MemoryExtractionStore([f"Offre {i}" for i in range(20)])
+    transport = httpx.ASGITransport(app=fake)
+
+    async with make_llm_client(base_url="http://vllm/v1", transport=transport) as client:
+        extractor = make_offer_extractor(LLMClient(client))
+        stats = await ExtractionWorker(store, extractor, batch_size=4).run(limit=10)
+
+    assert stats.offers_processed == 10
+
+
+def test_parse_skills_is_tolerant():
+    content = (
+        "Voici les competences :\n```json\n"
+        '[{"label": "Soudure", "niveau": "Expert"}, {"label": "soudure"}, '
+        '{"label": "  "}, {"label": "Travail en hauteur", "niveau": "?"}]\n```'
+    )
+    skills = parse_skills(content)
+    assert [s.label for s in skills] == ["Soudure", "Travail en hauteur"]
+    assert [s.level for s in skills] == ["expert", None]
@@ -0,0 +1,179 @@
+import asyncio
+import math
+import struct
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.stt import (
+    SpeechSegmenter,
+    StreamingTranscription,
+    SttService,
+    StubTranscriber,
+    WhisperTranscriber,
+    build_transcriber,
+    get_stt_service,
+)
+
+RATE = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> bytes:
+    n = int(RATE * seconds)
+    return struct.pack(
+        f"<{n}h",
+        *(int(amplitude * 32767 * math.sin(2 * math.pi * 220 * i / RATE)) for i in range(n)),
+    )
+
+
+def silence(seconds: float) -> bytes:
+    return b"\x00\x00" * int(RATE * seconds)
+
+
+class FakeTranscriber:
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+
+    def transcribe_batch(self, pcms, *, beam_size, prompts):
+        self.batches.append([pcm[:1].decode() or "?" for pcm in pcms])
+        for pcm, prompt in zip(pcms, prompts, strict=True):
+            self.calls.append((len(pcm), beam_size, prompt))
+        return [f"{len(pcm) // 2 / RATE:.1f}s" for pcm in pcms]
+
+
+def segmenter(**kwargs):
+    return SpeechSegmenter(RATE, threshold=0.05, silence_ms=300, partial_interval_ms=600, **kwargs)
+
+
+def test_segmenter_emits_partials_then_final_per_utterance():
+    seg = segmenter()
+    audio = silence(1.0) + tone(1.5) + silence(0.5) + tone(0.4) + silence(0.5)
+    # Chunk sizes unrelated to the 30 ms frame
+    events = [e for i in range(0, len(audio), 4001) for e in seg.feed(audio[i : i + 4001])]
+
+    assert [(e.kind, e.index) for e in events] == [
+        ("partial", 0),
+        ("partial", 0),
+        ("final", 0),
+        ("final", 1),
+    ]
+    first = events[2]
+    # Pre-roll keeps 300 ms before the onset; the final ends after 300 ms of silence
+    assert first.start_s == pytest.approx(0.7, abs=0.04)
+    assert first.end_s == pytest.approx(2.8, abs=0.04)
+    assert len(events[0].pcm) < len(events[1].pcm) < len(first.pcm)
+
+
+def test_segmenter_cuts_long_speech_and_flushes():
+    seg = segmenter(max_segment_s=2.0)
+    finals = [e for e in seg.feed(tone(5.0)) if e.kind == "final"]
+    finals += list(seg.flush())
+
+    assert len(finals) == 3
+    assert all(len(e.pcm) <= 2 * RATE * 2 for e in finals)
+    assert list(seg.flush()) == []
+
+
+async def test_stream_skips_stale_partials_and_prompts_with_previous_text():
+    transcriber = FakeTranscriber()
+    service = SttService(transcriber, beam_size=5, sample_rate=RATE)
+    stream = StreamingTranscription(service, segmenter())
+    stream.feed(tone(1.5) + silence(0.5) + tone(1.0))
+    stream.finish()
+
+    results = [r async for r in stream.results()]
+    await service.aclose()
+
+    # Everything was queued before decoding started: only finals are decoded
+    assert [r["type"] for r in results] == ["final", "final"]
+    assert service.stats.skipped_partials > 0
+    assert [beam for _, beam, _ in transcriber.calls] == [5, 5]
+    assert transcriber.calls[1][2] == results[0]["text"]
+    assert stream.text == f"{results[0]['text']} {results[1]['text']}"
+
+
+def test_websocket_stream(monkeypatch):
+    transcriber = FakeTranscriber()
+    service = SttService(transcriber, sample_rate=RATE)
+    monkeypatch.setitem(app.dependency_overrides, get_stt_service, lambda: service)
+
+    client = TestClient(app)
+    with client.websocket_connect("/api/stt/stream") as ws:
+        for chunk in (silence(0.3), tone(1.2), silence(0.8)):
+            ws.send_bytes(chunk)
+        # Stray text frames (not JSON, not an object) are ignored
+        for text in ("hello", "[]", "1"):
+            ws.send_text(text)
+        ws.send_json({"type": "end"})
+        messages = []
+        while not messages or messages[-1]["type"] != "done":
+            messages.append(ws.receive_json())
+
+    finals = [m for m in messages if m["type"] == "final"]
+    assert len(finals) == 1 and finals[0]["segment"] == 0
+    assert messages[-1]["text"] == finals[0]["text"]
+    stats = client.get("/api/stt/stats").json()
+    assert stats["finals"] == 1 and stats["queue_depth"] == 0
+
+
+async def test_scheduler_batches_sessions_round_robin():
+    transcriber = FakeTranscriber()
+    service = SttService(transcriber, max_batch_size=2, max_wait_ms=5, sample_rate=RATE)
+    # Session "a" queues three segments at once, "b" and "c" one each
+    jobs = [
+        service.transcribe(session.encode() * 3200, final=True, session=session)
+        for session in ("a", "a", "a", "b", "c")
+    ]
+
+    texts = await asyncio.gather(*jobs)
+    await service.aclose()
+
+    assert texts == ["0.1s"] * 5
+    # One segment per session per batch, sessions served in turn
+    assert transcriber.batches == [["a", "b"], ["c", "a"], ["a"]]
+    assert service.stats.batches == 3 and service.stats.mean_batch_size == 5 / 3
+    assert service.queue_depth == 0
+
+
+async def test_full_queue_sheds_partials_and_holds_finals():
+    transcriber = FakeTranscriber()
+    service = SttService(transcriber, max_queue=2, max_wait_ms=5, sample_rate=RATE)
+    finals = [
+        asyncio.create_task(service.transcribe(b"x" * 3200, final=True, session=i))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    assert service.queue_depth == 2
+    assert await service.transcribe(b"p" * 3200, final=False, session=9) is None
+    assert await asyncio.gather(*finals) == ["0.1s"] * 3
+    assert service.stats.skipped_partials == 1
+    await service.aclose()
+
+
+def test_stub_transcriber_latency_follows_the_longest_segment():
+    transcriber = StubTranscriber(rtf=0.1)
+
+    started = time.perf_counter()
+    texts = transcriber.transcribe_batch([tone(0.5), tone(1.0)], beam_size=1, prompts=[None, None])
+
+    assert texts == [StubTranscriber.TEXT] * 2
+    assert 0.1 <= time.perf_counter() - started < 0.15
+    assert isinstance(build_transcriber("stub"), StubTranscriber)
+    with pytest.raises(ValueError):
+        build_transcriber("nope")
+
+
+def test_whisper_tiny_cpu_int8():
+    pytest.importorskip("faster_whisper")
+    transcriber = WhisperTranscriber("tiny", device="cpu", compute_type="int8")
+
+    texts = transcriber.transcribe_batch(
+        [silence(1.0), tone(2.0)], beam_size=1, prompts=[None, "Bonjour."]
+    )
+    assert len(texts) == 2 and all(isinstance(text, str) for text in texts)
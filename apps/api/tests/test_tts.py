@@ -0,0 +1,121 @@
+import io
+import os
+import wave
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.tts import (
+    PhraseCache,
+    SentenceChunker,
+    StubSynthesizer,
+    TtsService,
+    get_tts_service,
+    phrase_key,
+    split_sentences,
+    wav_header,
+)
+
+
+class FakeSynthesizer:
+    name = "fake-voice"
+    sample_rate = 1000
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize(self, text):
+        self.calls.append(text)
+        # 1 ms of audio per character
+        return b"\x01\x00" * len(text)
+
+
+def test_split_sentences():
+    text = "Bonjour,  bienvenue. Vos competences ont ete enregistrees !\nA bientot"
+
+    assert split_sentences(text) == [
+        "Bonjour, bienvenue.",
+        "Vos competences ont ete enregistrees !",
+        "A bientot",
+    ]
+    long = "Premiere partie ; " + "x" * 200 + " : fin."
+    assert split_sentences(long) == ["Premiere partie ;", "x" * 200 + " :", "fin."]
+
+
+def test_sentence_chunker_emits_sentences_as_tokens_arrive():
+    chunker = SentenceChunker()
+    tokens = ["Vous ", "conduisez des engins", ". Depuis", " combien de temps ?", " Et"]
+
+    assert [chunker.feed(t) for t in tokens] == [
+        [],
+        [],
+        ["Vous conduisez des engins."],
+        [],
+        ["Depuis combien de temps ?"],
+    ]
+    assert chunker.flush() == ["Et"] and chunker.flush() == []
+
+
+def test_stub_synthesizer_returns_silence_of_the_reading_time():
+    pcm = StubSynthesizer(rtf=0.0, sample_rate=1000).synthesize("Bonjour.")
+
+    # 8 characters at 60 ms each, 16-bit samples
+    assert pcm == bytes(480 * 2)
+
+
+def test_phrase_cache_persists_across_instances(tmp_path):
+    key = phrase_key("fake-voice", 1000, "Bonjour,  bienvenue.")
+    PhraseCache(tmp_path).put(key, b"pcm")
+
+    assert key == phrase_key("fake-voice", 1000, "Bonjour, bienvenue.")
+    assert key != phrase_key("fake-voice", 22050, "Bonjour, bienvenue.")
+    assert PhraseCache(tmp_path).get(key) == b"pcm"
+    assert PhraseCache(None).get(key) is None
+
+
+def test_phrase_cache_prunes_least_recently_used_files(tmp_path):
+    cache = PhraseCache(tmp_path, max_memory_entries=0, max_disk_bytes=250)
+    keys = [phrase_key("fake-voice", 1000, f"Phrase {i}.") for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, bytes(100))
+        os.utime(cache._path(key), (i, i))
+    # Read from disk: the first sentence becomes the most recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], bytes(100))
+
+    assert sorted(p.stem for p in tmp_path.glob("*/*.pcm")) == sorted([keys[0], keys[2]])
+
+
+async def test_stream_yields_sentences_and_repeated_prompts_hit_the_cache(tmp_path):
+    synthesizer = FakeSynthesizer()
+    service = TtsService(synthesizer, PhraseCache(tmp_path))
+
+    chunks = [pcm async for pcm in service.stream("Bonjour. Merci beaucoup.")]
+    again = [pcm async for pcm in service.stream("Merci beaucoup.")]
+    await service.aclose()
+
+    assert [len(c) for c in chunks] == [16, 30] and again == chunks[1:]
+    assert synthesizer.calls == ["Bonjour.", "Merci beaucoup."]
+    assert service.stats.cache_hits == 1 and service.stats.sentences == 3
+    assert service.stats.audio_s == (8 + 15 + 15) / 1000
+
+
+def test_tts_endpoint_streams_wav(monkeypatch):
+    service = TtsService(FakeSynthesizer())
+    monkeypatch.setitem(app.dependency_overrides, get_tts_service, lambda: service)
+    client = TestClient(app)
+
+    response = client.post("/api/tts", json={"text": "Bonjour. Au revoir."})
+    raw = client.post("/api/tts", json={"text": "Bonjour.", "format": "pcm"})
+
+    assert response.status_code == 200 and response.headers["content-type"] == "audio/wav"
+    body = response.content
+    assert body[:44] == wav_header(1000)
+    # Fix the streamed sizes to read it back as a regular WAV file
+    fixed = wav_header(1000, len(body) - 44) + body[44:]
+    with wave.open(io.BytesIO(fixed)) as wav:
+        assert wav.getframerate() == 1000 and wav.getnframes() == len("Bonjour.Au revoir.")
+    assert raw.content == b"\x01\x00" * 8
+    assert raw.headers["content-type"] == "application/octet-stream"
+    assert raw.headers["x-audio-format"] == "s16le"
+    assert client.get("/api/tts/stats").json()["cache_hit_rate"] == 1 / 3
@@ -0,0 +1,199 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.services.llm import LLMClient, LLMError, get_llm, make_llm_client
+from app.services.stt import SttService, get_stt_service
+from app.services.tts import TtsService, get_tts_service
+from app.services.voice_turn import VoiceTurn
+from tests.test_stt import RATE, silence, tone
+from tests.test_tts import FakeSynthesizer
+
+REPLY = ["Vous ", "conduisez ", "des engins. ", "Depuis ", "combien ", "de temps ?"]
+
+
+class FixedTranscriber:
+    name = "fixed"
+
+    def transcribe_batch(self, pcms, *, beam_size, prompts):
+        return ["j'ai conduit des engins sur mine"] * len(pcms)
+
+
+class SlowLLM:
+    """LLMClient stand-in generating one token every 20 ms."""
+
+    def __init__(self):
+        self.prefills = []
+
+    async def chat(self, messages, *, max_tokens, **kwargs):
+        self.prefills.append((messages[-1]["content"], max_tokens))
+
+    async def chat_stream(self, messages, *, max_tokens, **kwargs):
+        for token in REPLY:
+            await asyncio.sleep(0.02)
+            yield token
+
+
+def services():
+    stt = SttService(FixedTranscriber(), sample_rate=RATE, max_wait_ms=0)
+    return stt, SlowLLM(), TtsService(FakeSynthesizer())
+
+
+async def test_turn_overlaps_generation_and_synthesis():
+    stt, llm, tts = services()
+    voice_turn = VoiceTurn(stt, llm, tts)
+    voice_turn.feed(tone(1.0) + silence(1.0))
+    voice_turn.finish()
+
+    events = [event async for event in voice_turn.events()]
+    await stt.aclose()
+    await tts.aclose()
+
+    kinds = ["audio" if isinstance(e, bytes) else e["type"] for e in events]
+    assert kinds[0] == "final" and kinds[-1] == "done"
+    # The first sentence is spoken while the LLM is still writing the second
+    assert kinds.index("audio") < len(kinds) - 1 - kinds[::-1].index("reply")
+    assert kinds.count("audio") == 2
+    done = events[-1]
+    assert done["reply"] == "".join(REPLY)
+    marks = done["timeline"]
+    assert marks["speech_end"] <= marks["stt_done"] <= marks["llm_first_token"]
+    assert marks["first_audio"] < marks["llm_done"] <= marks["tts_done"]
+    assert done["response_ms"] == pytest.approx(marks["first_audio"] - marks["speech_end"])
+    # The final transcript warmed the LLM prefix cache with a 1-token request
+    assert llm.prefills == [("j'ai conduit des engins sur mine", 1)]
+
+
+async def test_silent_turn_does_not_call_the_llm():
+    stt, llm, tts = services()
+    voice_turn = VoiceTurn(stt, llm, tts)
+    voice_turn.feed(silence(1.0))
+    voice_turn.finish()
+
+    events = [event async for event in voice_turn.events()]
+    await stt.aclose()
+
+    assert events == [
+        {
+            "type": "done",
+            "transcript": "",
+            "reply": "",
+            "response_ms": None,
+            "timeline": voice_turn.timeline.marks,
+        }
+    ]
+    assert llm.prefills == []
+
+
+def inference_seconds(model: str) -> float:
+    labels = {"service": "llm", "model": model}
+    return REGISTRY.get_sample_value("kompetens_model_inference_seconds_sum", labels) or 0.0
+
+
+async def test_chat_stream_parses_server_sent_events():
+    fake = FastAPI()
+
+    @fake.post("/v1/chat/completions")
+    async def chat() -> StreamingResponse:
+        async def sse():
+            yield 'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+            for token in REPLY[:3]:
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    transport = httpx.ASGITransport(app=fake)
+    async with make_llm_client(base_url="http://vllm/v1", transport=transport) as client:
+        llm = LLMClient(client, model="m")
+        before = inference_seconds("m")
+        tokens = []
+        async for token in llm.chat_stream([{"role": "user", "content": "?"}]):
+            tokens.append(token)
+            # A slow consumer (TTS) is not part of the inference time
+            await asyncio.sleep(0.1)
+
+    assert tokens == REPLY[:3]
+    assert 0 < inference_seconds("m") - before < 0.1
+
+
+def test_voice_turn_websocket(monkeypatch):
+    stt, llm, tts = services()
+    monkeypatch.setitem(app.dependency_overrides, get_stt_service, lambda: stt)
+    monkeypatch.setitem(app.dependency_overrides, get_llm, lambda: llm)
+    monkeypatch.setitem(app.dependency_overrides, get_tts_service, lambda: tts)
+
+    with TestClient(app).websocket_connect("/api/voice/turn") as ws:
+        assert ws.receive_json() == {"type": "start", "sample_rate": FakeSynthesizer.sample_rate}
+        ws.send_bytes(tone(1.0) + silence(1.0))
+        ws.send_json({"type": "end"})
+        audio, messages = [], []
+        while not messages or messages[-1]["type"] != "done":
+            message = ws.receive()
+            if message.get("bytes"):
+                audio.append(message["bytes"])
+            else:
+                messages.append(json.loads(message["text"]))
+
+    assert len(audio) == 2
+    assert messages[-1]["reply"] == "".join(REPLY)
+    assert messages[-1]["transcript"] == "j'ai conduit des engins sur mine"
+
+
+class FailingLLM(SlowLLM):
+    async def chat_stream(self, messages, *, max_tokens, **kwargs):
+        yield REPLY[0]
+        raise LLMError("chat completion stream failed: 503")
+
+
+def test_voice_turn_websocket_reports_llm_failure(monkeypatch):
+    stt, _, tts = services()
+    monkeypatch.setitem(app.dependency_overrides, get_stt_service, lambda: stt)
+    monkeypatch.setitem(app.dependency_overrides, get_llm, lambda: FailingLLM())
+    monkeypatch.setitem(app.dependency_overrides, get_tts_service, lambda: tts)
+
+    with TestClient(app).websocket_connect("/api/voice/turn") as ws:
+        ws.receive_json()
+        ws.send_bytes(tone(1.0) + silence(1.0))
+        ws.send_json({"type": "end"})
+        messages = []
+        while not messages or messages[-1]["type"] != "error":
+            message = ws.receive()
+            if message.get("text"):
+                messages.append(json.loads(message["text"]))
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert messages[-1] == {"type": "error", "detail": "reply generation failed"}
+    assert closed.value.code == 1011
+
+
+class BrokenTranscriber(FixedTranscriber):
+    def transcribe_batch(self, pcms, *, beam_size, prompts):
+        raise RuntimeError("CUDA out of memory")
+
+
+def test_voice_turn_websocket_reports_stt_failure(monkeypatch):
+    stt = SttService(BrokenTranscriber(), sample_rate=RATE, max_wait_ms=0)
+    _, llm, tts = services()
+    monkeypatch.setitem(app.dependency_overrides, get_stt_service, lambda: stt)
+    monkeypatch.setitem(app.dependency_overrides, get_llm, lambda: llm)
+    monkeypatch.setitem(app.dependency_overrides, get_tts_service, lambda: tts)
+
+    with TestClient(app).websocket_connect("/api/voice/turn") as ws:
+        ws.receive_json()
+        ws.send_bytes(tone(1.0) + silence(1.0))
+        ws.send_json({"type": "end"})
+        message = ws.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert message == {"type": "error", "detail": "voice turn failed"}
+    assert closed.value.code == 1011
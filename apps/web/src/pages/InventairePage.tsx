@@ -1,5 +1,6 @@
-import { useCallback } from "react";
+import { useCallback, useRef, useState } from "react";
 import VocalButton from "../components/VocalButton";
+import { SttStream, type SttMessage } from "../services/stt";
 import { useAppStore } from "../stores/appStore";
 
 /** Total number of steps in the vocal inventory flow. */
@@ -14,16 +15,59 @@ const TOTAL_STEPS = 5;
  */
 function InventairePage() {
   const setListening = useAppStore((s) => s.setListening);
+  const setProcessing = useAppStore((s) => s.setProcessing);
+  const stream = useRef<SttStream | null>(null);
+  /** Final text of the finished segments, and the segment being spoken. */
+  const [finals, setFinals] = useState<string[]>([]);
+  const [partial, setPartial] = useState("");
 
   const currentStep = 1; // Placeholder — will come from backend state
 
+  const handleMessage = useCallback(
+    (message: SttMessage) => {
+      if (message.type === "partial") {
+        setPartial(message.text);
+      } else if (message.type === "final") {
+        setPartial("");
+        setFinals((texts) => [...texts, message.text]);
+      } else {
+        setProcessing(false);
+      }
+    },
+    [setProcessing],
+  );
+
+  /** Socket closed (after "done", or on a failure): the button is usable again. */
+  const handleClose = useCallback(() => {
+    setListening(false);
+    setProcessing(false);
+    setPartial("");
+  }, [setListening, setProcessing]);
+
   const handleStart = useCallback(() => {
     setListening(true);
-  }, [setListening]);
+    setFinals([]);
+    setPartial("");
+    stream.current = new SttStream(handleMessage, handleClose);
+    stream.current.start().catch(() => {
+      stream.current?.stop();
+      stream.current = null;
+      setListening(false);
+    });
+  }, [setListening, handleMessage, handleClose]);
 
   const handleStop = useCallback(() => {
+    const current = stream.current;
+    stream.current = null;
     setListening(false);
-  }, [setListening]);
+    // A closed (failed) socket will send no "done": do not wait for it
+    if (current?.active) {
+      setProcessing(true);
+    }
+    current?.stop();
+  }, [setListening, setProcessing]);
+
+  const transcript = finals.filter(Boolean).join(" ");
 
   /** Progress as a percentage (0-100). */
   const progress = Math.round((currentStep / TOTAL_STEPS) * 100);
@@ -64,9 +108,15 @@ function InventairePage() {
         aria-label="Transcription vocale"
         aria-live="polite"
       >
-        <p className="text-center text-sm italic text-slate-400">
-          Votre réponse apparaîtra ici...
-        </p>
+        {transcript || partial ? (
+          <p>
+            {transcript} <span className="text-slate-400">{partial}</span>
+          </p>
+        ) : (
+          <p className="text-center text-sm italic text-slate-400">
+            Votre réponse apparaîtra ici...
+          </p>
+        )}
       </section>
     </div>
   );
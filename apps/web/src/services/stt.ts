@@ -0,0 +1,130 @@
+/**
+ * Streaming dictation client for the /api/stt/stream WebSocket.
+ *
+ * The microphone is captured at 16 kHz mono, converted to PCM 16-bit
+ * and sent in small chunks while the VocalButton is held.  The backend
+ * answers with partial transcripts while the user speaks and a final
+ * transcript per speech segment, so words appear without waiting for
+ * the end of the answer.
+ */
+
+const API_URL: string = import.meta.env.VITE_API_URL ?? "";
+
+/** Sample rate expected by the backend (STT_SAMPLE_RATE). */
+const SAMPLE_RATE = 16000;
+/** Samples per chunk sent over the socket (256 ms at 16 kHz). */
+const CHUNK_SAMPLES = 4096;
+
+export interface SttMessage {
+  type: "partial" | "final" | "done";
+  text: string;
+  segment?: number;
+  start?: number;
+  end?: number;
+}
+
+function streamUrl(): string {
+  const base = API_URL || window.location.origin;
+  return `${base.replace(/^http/, "ws")}/api/stt/stream`;
+}
+
+function toPcm16(samples: Float32Array): ArrayBuffer {
+  const pcm = new Int16Array(samples.length);
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]));
+    pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return pcm.buffer;
+}
+
+/**
+ * One dictation: open the socket and the microphone on `start`,
+ * send "end" on `stop`; the socket closes after the "done" message.
+ *
+ * Chunks captured before the socket is open are kept and sent on open,
+ * so the first words are not lost; a `stop` before the open sends "end"
+ * right after them.  `onClose` is called once the socket is closed, with
+ * `completed` false when it closed (or failed) before the "done" message.
+ */
+export class SttStream {
+  private socket: WebSocket | null = null;
+  private context: AudioContext | null = null;
+  private media: MediaStream | null = null;
+  private pending: ArrayBuffer[] = [];
+  private ending = false;
+  private completed = false;
+
+  constructor(
+    private onMessage: (message: SttMessage) => void,
+    private onClose: (completed: boolean) => void = () => {},
+  ) {}
+
+  async start(): Promise<void> {
+    this.media = await navigator.mediaDevices.getUserMedia({
+      audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true },
+    });
+    if (this.ending) {
+      // Stopped while the microphone permission was pending
+      this.release();
+      return;
+    }
+    const socket = new WebSocket(streamUrl());
+    socket.binaryType = "arraybuffer";
+    socket.onopen = () => {
+      this.pending.forEach((chunk) => socket.send(chunk));
+      this.pending = [];
+      if (this.ending) {
+        socket.send(JSON.stringify({ type: "end" }));
+      }
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data) as SttMessage;
+      if (message.type === "done") {
+        this.completed = true;
+      }
+      this.onMessage(message);
+    };
+    // A failed socket always ends with a close event
+    socket.onclose = () => {
+      this.release();
+      this.onClose(this.completed);
+    };
+    this.socket = socket;
+
+    // The browser resamples the microphone to the context rate
+    this.context = new AudioContext({ sampleRate: SAMPLE_RATE });
+    const source = this.context.createMediaStreamSource(this.media);
+    const processor = this.context.createScriptProcessor(CHUNK_SAMPLES, 1, 1);
+    processor.onaudioprocess = (event) => {
+      const chunk = toPcm16(event.inputBuffer.getChannelData(0));
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(chunk);
+      } else if (socket.readyState === WebSocket.CONNECTING) {
+        this.pending.push(chunk);
+      }
+    };
+    source.connect(processor);
+    processor.connect(this.context.destination);
+  }
+
+  /** Whether the socket is connecting or open (transcripts may still come). */
+  get active(): boolean {
+    return this.socket !== null && this.socket.readyState <= WebSocket.OPEN;
+  }
+
+  stop(): void {
+    this.release();
+    this.ending = true;
+    if (this.socket?.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify({ type: "end" }));
+    }
+  }
+
+  /** Stop the microphone (the socket stays open for the last transcripts). */
+  private release(): void {
+    this.media?.getTracks().forEach((track) => track.stop());
+    void this.context?.close();
+    this.media = null;
+    this.context = null;
+  }
+}
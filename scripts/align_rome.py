@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Align emergent skills on the ROME v4 taxonomy (rome_code / rome_label).
+
+Embeds the ROME competence and appellation labels once (cached as a NumPy
+matrix in data/rome/, and copied into rome_*.embedding for the label
+search), then aligns every emergent skill with blocked matrix products and
+writes the changed rows in one bulk UPDATE. Run it after `make import-rome`
+and after `make build-referentiel` or `make update-referentiel`.
+
+Usage:
+    python scripts/align_rome.py
+    python scripts/align_rome.py --threshold 0.85
+    python scripts/align_rome.py --dry-run
+
+Reads DATABASE_URL and EMBEDDING_* settings from environment or .env file.
+Requires numpy (ML extras): pip install -e "apps/api[ml]".
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The alignment services live in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+
+from app.db.session import async_session_factory  # noqa: E402
+from app.services.embedding_cache import get_embedder  # noqa: E402
+from app.services.rome_alignment import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    align,
+    load_skill_vectors,
+    rome_matrix,
+    store_rome_embeddings,
+    write_alignments,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+
+DEFAULT_CACHE = ROOT_DIR / "data" / "rome" / "rome_embeddings.npz"
+
+
+async def run(args: argparse.Namespace) -> None:
+    embedder = get_embedder()
+    started = time.perf_counter()
+    try:
+        async with async_session_factory() as session:
+            rome = await rome_matrix(session, embedder, args.cache)
+            if not rome.labels:
+                print("No ROME labels. Run `make import-rome` first.")
+                return
+            stored = 0 if args.dry_run else await store_rome_embeddings(session, rome)
+            skill_ids, vectors, current = await load_skill_vectors(session)
+            loaded_at = time.perf_counter()
+            alignments = align(skill_ids, vectors, rome, args.threshold)
+            aligned_at = time.perf_counter()
+            updated = 0
+            if not args.dry_run:
+                updated = await write_alignments(session, alignments, current)
+    finally:
+        await embedder.service.aclose()
+
+    matched = [a for a in alignments if a.rome_code is not None]
+    kinds = Counter(a.kind for a in matched)
+    print("\n--- ROME Alignment ---")
+    print(
+        f"ROME labels:      {len(rome.labels)} "
+        f"({'cached matrix' if rome.from_cache else 'embedded'}, {stored} vectors stored)"
+    )
+    print(f"Emergent skills:  {len(alignments)}")
+    print(
+        f"Aligned:          {len(matched)} (> {args.threshold}; "
+        f"{kinds['competence']} competences, {kinds['appellation']} appellations)"
+    )
+    print(f"Matrix products:  {aligned_at - loaded_at:.2f}s")
+    if args.dry_run:
+        print("Dry run: nothing written.")
+    else:
+        print(f"Rows updated:     {updated}")
+    print(f"Elapsed:          {time.perf_counter() - started:.1f}s")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Align emergent skills on the ROME v4")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Minimum cosine similarity to set a ROME code (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE,
+        help="NumPy cache of the ROME label embeddings (rebuilt when the ROME changes)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Align and print the summary without writing to the database",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
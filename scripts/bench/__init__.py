@@ -0,0 +1 @@
+"""Performance benchmarks -- shared harness for the STT, LLM, TTS and embedding suites."""
@@ -0,0 +1,361 @@
+"""Benchmark suites -- STT, LLM, TTS and embeddings, on real models or CPU stand-ins.
+
+Each suite measures the application's own code path (WhisperTranscriber,
+LLMClient, TtsService, EmbeddingService), so a regression in the services
+shows up as well as a slower model. The configured backends (settings) are
+the default; stand-ins run anywhere, without a GPU or model files:
+
+- STT: Whisper tiny on CPU (int8) instead of large-v3 on CUDA;
+- LLM: the mock OpenAI server (mock_openai.py) started in-process;
+- TTS: a tone synthesizer instead of a Piper voice;
+- embeddings: the hashing encoder.
+
+The backend is recorded with every result: the baseline comparison only
+compares cases measured on the same backend.
+"""
+
+import array
+import asyncio
+import itertools
+import math
+import random
+import tempfile
+import time
+import wave
+from collections.abc import Iterator
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from app.config import settings
+from app.services.embeddings import EmbeddingService, build_encoder
+from app.services.llm import LLMClient, PromptTemplate, make_llm_client
+from app.services.stt import WhisperTranscriber
+from app.services.tts import PhraseCache, PiperSynthesizer, TtsService
+from app.services.voice_turn import TURN_PROMPT
+from bench.core import Case
+from bench.mock_openai import create_app, serve
+
+# ---------------------------------------------------------------------------
+# Test data
+# ---------------------------------------------------------------------------
+
+# Simulated voice transcriptions (one per persona)
+TEST_TRANSCRIPTIONS = [
+    "Moi je conduis les gros camions sur les chantiers depuis cinq ans, "
+    "les dumpers tout ca, et aussi les pelleteuses.",
+    "J'ai travaille trois ans dans la mine a Thio, je faisais le forage "
+    "et l'extraction du minerai.",
+    "Je fais le menage dans les bureaux et les maisons, ca fait dix ans que je fais ca a Noumea.",
+    "Je suis serveur au restaurant depuis deux ans, je m'occupe de la salle et de l'encaissement.",
+    "J'ai ma propre exploitation agricole a Bourail, je fais du maraichage "
+    "et de l'elevage de betail.",
+]
+
+TEST_TEXTS = {
+    "short": "Bonjour, bienvenue.",
+    "sentence": "Vos competences en conduite d'engins ont bien ete enregistrees.",
+    "paragraph": (
+        "Merci pour votre inventaire vocal. Nous avons identifie cinq "
+        "competences principales liees au secteur du batiment et des "
+        "travaux publics. Vous pouvez maintenant consulter votre profil "
+        "ou ajouter des experiences supplementaires."
+    ),
+}
+
+EXTRACTION_PROMPT = PromptTemplate(
+    version="bench-extraction-v1",
+    system=(
+        "Tu es un assistant specialise dans l'extraction de competences "
+        "professionnelles. A partir de la transcription vocale d'un candidat, "
+        'reponds en JSON : {"competences": [{"label": "...", '
+        '"niveau": "debutant|intermediaire|confirme|expert" ou null, '
+        '"contexte": "..." ou null}]}.'
+    ),
+    user="Transcription vocale :\n\n{text}\n\nExtrais les competences au format JSON.",
+    max_input_chars=4000,
+)
+
+
+def cycle(items: list[str]) -> Iterator[str]:
+    """Endless rotation over the test inputs (one input per repeat)."""
+    return itertools.cycle(items)
+
+
+# ---------------------------------------------------------------------------
+# STT
+# ---------------------------------------------------------------------------
+
+
+def synthetic_speech(duration_s: float, sample_rate: int = 16000, seed: int = 42) -> bytes:
+    """PCM 16-bit mono: a 440 Hz tone plus noise (the spike's test signal)."""
+    rng = random.Random(seed)
+    samples = array.array(
+        "h",
+        (
+            max(
+                -32768,
+                min(
+                    32767,
+                    int(16000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+                    + rng.randint(-2000, 2000),
+                ),
+            )
+            for i in range(int(duration_s * sample_rate))
+        ),
+    )
+    return samples.tobytes()
+
+
+def read_wav(path: Path, max_s: float = 30.0) -> bytes:
+    """PCM of a 16 kHz mono 16-bit WAV file, cut to one Whisper window."""
+    with wave.open(str(path), "rb") as wf:
+        if (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) != (16000, 1, 2):
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return wf.readframes(int(max_s * 16000))
+
+
+class SttSuite:
+    """Decodage Whisper par lots (chemin de SttService, sans l'ordonnanceur)."""
+
+    name = "stt"
+
+    def __init__(
+        self,
+        model_size: str,
+        device: str,
+        compute_type: str,
+        audio_dir: Path | None = None,
+    ) -> None:
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.audio_dir = audio_dir
+        self.backend = f"whisper-{model_size}/{device}/{compute_type}"
+        self.transcriber: WhisperTranscriber | None = None
+        self.segments: list[bytes] = []
+
+    async def setup(self) -> None:
+        self.transcriber = WhisperTranscriber(
+            self.model_size,
+            device=self.device,
+            compute_type=self.compute_type,
+            language=settings.WHISPER_LANGUAGE,
+        )
+        if self.audio_dir is not None:
+            self.segments = [read_wav(path) for path in sorted(self.audio_dir.glob("*.wav"))]
+            if not self.segments:
+                raise ValueError(f"no .wav file in {self.audio_dir}")
+        else:
+            self.segments = [synthetic_speech(5.0, seed=seed) for seed in range(8)]
+
+    def _case(self, name: str, beam_size: int, batch_size: int) -> Case:
+        segments = itertools.cycle(self.segments)
+
+        async def run() -> dict[str, float]:
+            batch = [next(segments) for _ in range(batch_size)]
+            await asyncio.to_thread(
+                self.transcriber.transcribe_batch,
+                batch,
+                beam_size=beam_size,
+                prompts=[None] * batch_size,
+            )
+            return {"audio_s": sum(len(pcm) for pcm in batch) / 2 / 16000}
+
+        return Case(name, run)
+
+    def cases(self) -> list[Case]:
+        return [
+            self._case("segment_beam1", beam_size=1, batch_size=1),
+            self._case("segment_beam5", beam_size=5, batch_size=1),
+            self._case("batch8_beam1", beam_size=1, batch_size=8),
+        ]
+
+    async def teardown(self) -> None:
+        self.transcriber = None
+
+
+# ---------------------------------------------------------------------------
+# LLM
+# ---------------------------------------------------------------------------
+
+
+class LlmSuite:
+    """Completions vLLM : tour vocal en streaming (TTFT) et extraction JSON."""
+
+    name = "llm"
+
+    def __init__(
+        self,
+        base_url: str | None,
+        model: str | None = None,
+        ttft_ms: float = 100.0,
+        token_ms: float = 20.0,
+    ) -> None:
+        # No URL: the mock server stands in for vLLM
+        self.base_url = base_url
+        self.model = model or settings.VLLM_MODEL
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.backend = f"vllm:{self.model}" if base_url else f"mock:{ttft_ms:g}+{token_ms:g}ms"
+        self.client: LLMClient | None = None
+        self._stack = AsyncExitStack()
+
+    async def setup(self) -> None:
+        base_url = self.base_url
+        if base_url is None:
+            base_url = await self._stack.enter_async_context(
+                serve(create_app(self.ttft_ms, self.token_ms, self.model))
+            )
+        http = await self._stack.enter_async_context(make_llm_client(base_url))
+        self.client = LLMClient(http, model=self.model)
+
+    def cases(self) -> list[Case]:
+        turns = cycle(TEST_TRANSCRIPTIONS)
+        extractions = cycle(TEST_TRANSCRIPTIONS)
+
+        async def voice_turn() -> dict[str, float]:
+            started = time.perf_counter()
+            ttft: float | None = None
+            tokens = 0
+            async for _ in self.client.chat_stream(
+                TURN_PROMPT.messages(next(turns)),
+                max_tokens=settings.VOICE_TURN_MAX_TOKENS,
+            ):
+                if ttft is None:
+                    ttft = (time.perf_counter() - started) * 1000
+                tokens += 1
+            return {"ttft_ms": ttft or 0.0, "tokens": tokens}
+
+        async def extraction() -> dict[str, float]:
+            result = await self.client.chat(
+                EXTRACTION_PROMPT.messages(next(extractions)),
+                max_tokens=settings.EXTRACTION_MAX_TOKENS,
+                json_mode=True,
+            )
+            return {"tokens": result.completion_tokens}
+
+        return [Case("voice_turn_stream", voice_turn), Case("extraction_json", extraction)]
+
+    async def teardown(self) -> None:
+        await self._stack.aclose()
+        self.client = None
+
+
+# ---------------------------------------------------------------------------
+# TTS
+# ---------------------------------------------------------------------------
+
+
+class ToneSynthesizer:
+    """Stand-in CPU de Piper : un son par caractere, calcule echantillon par echantillon."""
+
+    name = "tone"
+    sample_rate = 16000
+
+    def __init__(self, ms_per_char: float = 60.0) -> None:
+        self.ms_per_char = ms_per_char
+
+    def synthesize(self, text: str) -> bytes:
+        n = int(len(text) * self.ms_per_char / 1000 * self.sample_rate)
+        return array.array(
+            "h",
+            (int(8000 * math.sin(2 * math.pi * 220 * i / self.sample_rate)) for i in range(n)),
+        ).tobytes()
+
+
+class TtsSuite:
+    """Synthese phrase par phrase (TtsService) : premier audio et texte complet."""
+
+    name = "tts"
+
+    def __init__(self, model_path: str | None) -> None:
+        # No model: the tone synthesizer stands in for Piper
+        self.model_path = model_path
+        self.backend = f"piper:{Path(model_path).stem}" if model_path else "tone"
+        self.service: TtsService | None = None
+        self.cached: TtsService | None = None
+        self._cache_dir: tempfile.TemporaryDirectory | None = None
+
+    async def setup(self) -> None:
+        synthesizer = (
+            PiperSynthesizer(self.model_path, settings.PIPER_SAMPLE_RATE)
+            if self.model_path
+            else ToneSynthesizer()
+        )
+        # No cache: every run synthesizes
+        self.service = TtsService(synthesizer, PhraseCache(None, max_memory_entries=0))
+        self._cache_dir = tempfile.TemporaryDirectory(prefix="bench-tts-")
+        self.cached = TtsService(synthesizer, PhraseCache(Path(self._cache_dir.name)))
+
+    def _case(self, name: str, text: str, service_attr: str) -> Case:
+        async def run() -> dict[str, float]:
+            service: TtsService = getattr(self, service_attr)
+            started = time.perf_counter()
+            first_audio: float | None = None
+            pcm_bytes = 0
+            async for pcm in service.stream(text):
+                if first_audio is None:
+                    first_audio = (time.perf_counter() - started) * 1000
+                pcm_bytes += len(pcm)
+            return {
+                "first_audio_ms": first_audio or 0.0,
+                "audio_s": pcm_bytes / 2 / service.sample_rate,
+            }
+
+        return Case(name, run)
+
+    def cases(self) -> list[Case]:
+        return [
+            *(self._case(name, text, "service") for name, text in TEST_TEXTS.items()),
+            # Fixed prompt, read from the phrase cache after the first run
+            self._case("paragraph_cached", TEST_TEXTS["paragraph"], "cached"),
+        ]
+
+    async def teardown(self) -> None:
+        for service in (self.service, self.cached):
+            if service is not None:
+                await service.aclose()
+        if self._cache_dir is not None:
+            self._cache_dir.cleanup()
+
+
+# ---------------------------------------------------------------------------
+# Embeddings
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingSuite:
+    """Encodage via EmbeddingService : une requete, et un lot de passages."""
+
+    name = "embeddings"
+
+    def __init__(self, backend: str | None = None) -> None:
+        self.encoder_backend = backend or settings.EMBEDDING_BACKEND
+        self.backend = self.encoder_backend
+        self.service: EmbeddingService | None = None
+
+    async def setup(self) -> None:
+        encoder = build_encoder(self.encoder_backend)
+        self.backend = encoder.name
+        self.service = EmbeddingService(
+            encoder,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+        )
+
+    def cases(self) -> list[Case]:
+        queries = cycle(TEST_TRANSCRIPTIONS)
+        passages = TEST_TRANSCRIPTIONS * 7  # 35 texts: two micro-batches
+
+        async def query() -> None:
+            await self.service.embed_query(next(queries))
+
+        async def batch() -> dict[str, float]:
+            await self.service.embed(passages, "passage")
+            return {"texts": len(passages)}
+
+        return [Case("query", query), Case("passages_35", batch)]
+
+    async def teardown(self) -> None:
+        if self.service is not None:
+            await self.service.aclose()
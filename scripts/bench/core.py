@@ -0,0 +1,300 @@
+"""Benchmark core -- timing loop, percentiles, JSON reports and baseline comparison.
+
+A suite (STT, LLM, TTS, embeddings) is a backend plus a list of cases; a
+case is a coroutine timed ``warmup + repeat`` times. Only the ``repeat``
+runs are kept: the result of a case is its latency distribution (mean,
+p50, p95, p99) plus the median of the metrics the case reports itself
+(audio duration, time to first token, ...).
+
+Reports are JSON. A report can be saved as the baseline, and a later run
+compared against it: a case regresses when one of its compared metrics
+grows by more than ``threshold`` (relative), and fails when it errors or
+is not measured at all. Cases measured with another backend (e.g.
+whisper-tiny/cpu vs large-v3/cuda) are not compared, and latency changes
+under a millisecond are ignored.
+"""
+
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable, Collection
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+# Compared against the baseline (lower is better)
+COMPARED_METRICS = ("p50_ms", "p95_ms", "ttft_ms", "first_audio_ms", "rtf")
+# Latency changes smaller than this are timer noise, whatever the ratio
+MIN_DELTA_MS = 1.0
+LATENCY_KEYS = {"backend", "n", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "min_ms", "max_ms"}
+
+
+@dataclass
+class Case:
+    """Cas mesure : coroutine appelee warmup + repeat fois.
+
+    ``run`` may return metrics of its own (``{"audio_s": 5.0}``); their
+    median over the repeats is reported next to the latency.
+    """
+
+    name: str
+    run: Callable[[], Awaitable[dict[str, float] | None]]
+
+
+class Suite(Protocol):
+    """Famille de cas sur un backend (modele, serveur, stand-in CPU)."""
+
+    name: str
+    backend: str
+
+    async def setup(self) -> None: ...
+
+    def cases(self) -> list[Case]: ...
+
+    async def teardown(self) -> None: ...
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """q-th percentile (0..100), linear interpolation between closest ranks."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+@dataclass
+class CaseResult:
+    """Distribution des latences d'un cas."""
+
+    suite: str
+    case: str
+    backend: str
+    samples_ms: list[float]
+    metrics: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.suite}/{self.case}"
+
+    def summary(self) -> dict:
+        if self.error is not None:
+            return {"backend": self.backend, "error": self.error}
+        summary = {
+            "backend": self.backend,
+            "n": len(self.samples_ms),
+            "mean_ms": statistics.fmean(self.samples_ms),
+            "p50_ms": percentile(self.samples_ms, 50),
+            "p95_ms": percentile(self.samples_ms, 95),
+            "p99_ms": percentile(self.samples_ms, 99),
+            "min_ms": min(self.samples_ms),
+            "max_ms": max(self.samples_ms),
+        }
+        summary.update(self.metrics)
+        if self.metrics.get("audio_s"):
+            # Real-time factor of the median run
+            summary["rtf"] = summary["p50_ms"] / 1000 / self.metrics["audio_s"]
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in summary.items()}
+
+
+async def measure(case: Case, suite: Suite, warmup: int, repeat: int) -> CaseResult:
+    """Time one case; exceptions are reported in the result, not raised."""
+    samples: list[float] = []
+    reported: dict[str, list[float]] = {}
+    try:
+        for i in range(warmup + repeat):
+            started = time.perf_counter()
+            metrics = await case.run()
+            elapsed = (time.perf_counter() - started) * 1000
+            if i < warmup:
+                continue
+            samples.append(elapsed)
+            for name, value in (metrics or {}).items():
+                reported.setdefault(name, []).append(value)
+    except Exception as exc:
+        logger.warning("%s/%s failed: %s", suite.name, case.name, exc)
+        return CaseResult(suite.name, case.name, suite.backend, samples, error=str(exc))
+    return CaseResult(
+        suite.name,
+        case.name,
+        suite.backend,
+        samples,
+        {name: statistics.median(values) for name, values in reported.items()},
+    )
+
+
+async def run_suite(suite: Suite, warmup: int, repeat: int) -> list[CaseResult]:
+    """Set the backend up, measure every case, tear it down."""
+    logger.info("Suite %s (%s)", suite.name, suite.backend)
+    started = time.perf_counter()
+    await suite.setup()
+    logger.info("  setup: %.2fs", time.perf_counter() - started)
+    results: list[CaseResult] = []
+    try:
+        for case in suite.cases():
+            result = await measure(case, suite, warmup, repeat)
+            if result.error is None:
+                summary = result.summary()
+                logger.info(
+                    "  %-28s p50=%8.1fms p95=%8.1fms",
+                    case.name,
+                    summary["p50_ms"],
+                    summary["p95_ms"],
+                )
+            results.append(result)
+    finally:
+        await suite.teardown()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: list[CaseResult], warmup: int, repeat: int) -> dict:
+    """Machine-readable report of one run."""
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "results": {result.key: result.summary() for result in results},
+    }
+
+
+def save_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def load_report(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@dataclass
+class Regression:
+    """Metrique degradee par rapport a la reference."""
+
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+
+@dataclass
+class Comparison:
+    """Resultat de la comparaison d'un rapport a la reference."""
+
+    regressions: list[Regression] = field(default_factory=list)
+    # Baseline cases that errored in this run, or were not measured at all
+    failed: list[str] = field(default_factory=list)
+    # New cases, other backend, or failed in the baseline
+    skipped: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions and not self.failed
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float,
+    suites: Collection[str] | None = None,
+) -> Comparison:
+    """Compare ``current`` against ``baseline``.
+
+    A baseline case of one of ``suites`` (all suites when None) that
+    errored or is absent from ``current`` (its suite failed in setup) is a
+    failure: a crashing backend must not pass as "no regression".
+    """
+    comparison = Comparison()
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None or "error" in reference or reference["backend"] != result["backend"]:
+            comparison.skipped.append(key)
+            continue
+        if "error" in result:
+            comparison.failed.append(key)
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in result or metric not in reference:
+                continue
+            allowed = reference[metric] * threshold
+            if metric.endswith("_ms"):
+                allowed = max(allowed, MIN_DELTA_MS)
+            if result[metric] > reference[metric] + allowed:
+                comparison.regressions.append(
+                    Regression(key, metric, reference[metric], result[metric])
+                )
+    for key, reference in baseline["results"].items():
+        if key in current["results"] or "error" in reference:
+            continue
+        if suites is None or key.split("/", 1)[0] in suites:
+            comparison.failed.append(key)
+        else:
+            # Suite not selected for this run
+            comparison.skipped.append(key)
+    return comparison
+
+
+def format_table(report: dict) -> str:
+    """Plain-text table of a report (one line per case)."""
+    headers = ("case", "backend", "n", "p50 ms", "p95 ms", "p99 ms", "extra")
+    rows = []
+    for key, result in report["results"].items():
+        if "error" in result:
+            rows.append((key, result["backend"], "-", "-", "-", "-", f"error: {result['error']}"))
+            continue
+        extra = ", ".join(
+            f"{name}={result[name]:g}" for name in sorted(result) if name not in LATENCY_KEYS
+        )
+        rows.append(
+            (
+                key,
+                result["backend"],
+                str(result["n"]),
+                f"{result['p50_ms']:.1f}",
+                f"{result['p95_ms']:.1f}",
+                f"{result['p99_ms']:.1f}",
+                extra,
+            )
+        )
+    widths = [max(len(str(row[i])) for row in (headers, *rows)) for i in range(len(headers))]
+    lines = [
+        "  ".join(str(cell).ljust(width) for cell, width in zip(row, widths, strict=True))
+        for row in (headers, *rows)
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(line.rstrip() for line in lines)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Mock OpenAI-compatible server -- a CPU stand-in for vLLM with configurable latency.
+
+Answers /v1/chat/completions (streamed or not) and /v1/models like vLLM:
+the first token comes after ``ttft_ms``, then one token every
+``token_ms``. The answer is a fixed French reply (or a JSON skill list
+when ``response_format`` asks for JSON), so the API and the benchmarks can
+run end to end without a GPU.
+
+Used in-process by the benchmark harness (scripts/bench/run.py); can also
+run standalone in place of vLLM:
+
+Usage:
+    python scripts/bench/mock_openai.py --port 8001
+    python scripts/bench/mock_openai.py --port 8001 --ttft-ms 150 --token-ms 25
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = (
+    "Vous conduisez des engins sur les chantiers depuis plusieurs annees. "
+    "Quels engins avez-vous deja conduits ? "
+    "Avez-vous un permis ou un CACES pour ces engins ?"
+)
+JSON_REPLY = json.dumps(
+    {
+        "competences": [
+            {"label": "conduite d'engins", "niveau": "confirme", "contexte": "chantier"},
+            {"label": "conduite de pelleteuse", "niveau": None, "contexte": "chantier"},
+        ]
+    },
+    ensure_ascii=False,
+)
+
+
+def tokens_of(text: str) -> list[str]:
+    """Split a reply into word-sized tokens (spaces kept, as LLM deltas)."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + [words[-1]]
+
+
+def create_app(ttft_ms: float = 100.0, token_ms: float = 20.0, model: str = "mock") -> FastAPI:
+    """OpenAI-compatible app answering after the configured latencies."""
+    app = FastAPI(title="mock-openai")
+    app.state.requests = 0
+
+    @app.get("/v1/models")
+    async def models() -> dict:
+        return {"object": "list", "data": [{"id": model, "object": "model"}]}
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat(request: Request) -> dict | StreamingResponse:
+        body = await request.json()
+        app.state.requests += 1
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        tokens = tokens_of(JSON_REPLY if json_mode else REPLY)[: body.get("max_tokens") or None]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+
+            async def events() -> AsyncIterator[str]:
+                await asyncio.sleep(ttft_ms / 1000)
+                for i, token in enumerate(tokens):
+                    if i:
+                        await asyncio.sleep(token_ms / 1000)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body.get("model", model),
+                        "choices": [{"index": 0, "delta": {"content": token}}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep((ttft_ms + token_ms * max(len(tokens) - 1, 0)) / 1000)
+        messages = body.get("messages") or []
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", model),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": sum(len(m.get("content", "").split()) for m in messages),
+                "completion_tokens": len(tokens),
+            },
+        }
+
+    return app
+
+
+@contextlib.asynccontextmanager
+async def serve(app: FastAPI, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+    """Run ``app`` with uvicorn in the current loop; yield its base URL (/v1)."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    bound = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound}/v1"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible server (vLLM stand-in)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=float, default=100.0, help="Time to first token")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="Time between tokens")
+    parser.add_argument("--model", default="mock")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.ttft_ms, args.token_ms, args.model),
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Performance benchmarks -- STT, LLM, TTS and embeddings latency, with regression check.
+
+Runs the selected suites (all by default): each case is run ``--warmup``
+times untimed, then ``--repeat`` times timed, and reported as p50 / p95 /
+p99 latencies plus its own metrics (time to first token, time to first
+audio, real-time factor). The JSON report is written to data/bench/ and
+compared with the baseline: the command exits with status 1 when a case
+is slower than the baseline by more than ``--threshold``, or when a
+baseline case of a selected suite errors or is not run (e.g. its backend
+fails to load).
+
+Usage:
+    python scripts/bench/run.py
+    python scripts/bench/run.py --stand-ins
+    python scripts/bench/run.py --suite stt --suite tts --repeat 20
+    python scripts/bench/run.py --stand-ins --save-baseline
+    python scripts/bench/run.py --llm-url http://gpu-server:8001/v1
+
+Reads VLLM_*, WHISPER_*, PIPER_* and EMBEDDING_* settings from environment
+or .env file. --stand-ins replaces the models by CPU stand-ins (Whisper
+tiny, mock OpenAI server, tone synthesizer, hashing encoder).
+Requires the voice extras for STT and Piper: pip install -e "apps/api[voice]".
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The benchmarked services live in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+from app.config import settings  # noqa: E402
+from bench.backends import EmbeddingSuite, LlmSuite, SttSuite, TtsSuite  # noqa: E402
+from bench.core import (  # noqa: E402
+    CaseResult,
+    Suite,
+    build_report,
+    compare,
+    format_table,
+    load_report,
+    run_suite,
+    save_report,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+# One line per LLM request would drown the results
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+SUITES = ("stt", "llm", "tts", "embeddings")
+BENCH_DIR = ROOT_DIR / "data" / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def build_suites(args: argparse.Namespace) -> list[Suite]:
+    suites: dict[str, Suite] = {
+        "stt": (
+            SttSuite("tiny", "cpu", "int8", args.audio_dir)
+            if args.stand_ins
+            else SttSuite(
+                settings.WHISPER_MODEL_SIZE,
+                settings.WHISPER_DEVICE,
+                settings.WHISPER_COMPUTE_TYPE,
+                args.audio_dir,
+            )
+        ),
+        "llm": LlmSuite(
+            args.llm_url or (None if args.stand_ins else settings.VLLM_BASE_URL),
+            ttft_ms=args.mock_ttft_ms,
+            token_ms=args.mock_token_ms,
+        ),
+        "tts": TtsSuite(None if args.stand_ins else settings.PIPER_MODEL_PATH),
+        "embeddings": EmbeddingSuite("hashing" if args.stand_ins else None),
+    }
+    return [suites[name] for name in args.suite or SUITES]
+
+
+async def run(args: argparse.Namespace) -> int:
+    results: list[CaseResult] = []
+    for suite in build_suites(args):
+        try:
+            results.extend(await run_suite(suite, args.warmup, args.repeat))
+        except Exception as exc:
+            # A missing model or server skips the suite, not the run
+            logger.error("suite %s (%s) not run: %s", suite.name, suite.backend, exc)
+
+    report = build_report(results, args.warmup, args.repeat)
+    output = args.output or BENCH_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    save_report(report, output)
+
+    print("\n--- Benchmark ---")
+    print(format_table(report))
+    print(f"\nReport:    {output}")
+
+    status = 0
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline:  {args.baseline} (saved)")
+    elif args.baseline.exists():
+        comparison = compare(
+            report, load_report(args.baseline), args.threshold, args.suite or SUITES
+        )
+        print(f"Baseline:  {args.baseline} (threshold +{args.threshold:.0%})")
+        if comparison.skipped:
+            print(
+                f"Not compared (new, other backend or not selected): {', '.join(comparison.skipped)}"
+            )
+        for key in comparison.failed:
+            print(f"FAILED     {key} (in the baseline, errored or not run)")
+        for regression in comparison.regressions:
+            print(
+                f"REGRESSION {regression.key} {regression.metric}: "
+                f"{regression.baseline:g} -> {regression.current:g} "
+                f"({regression.change:+.0%})"
+            )
+        if comparison.ok:
+            print("No regression.")
+        else:
+            status = 1
+    else:
+        print(f"Baseline:  none ({args.baseline}); use --save-baseline to create it")
+    print("Done.")
+    return status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="STT / LLM / TTS / embeddings benchmarks")
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=SUITES,
+        help="Suite to run (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--stand-ins",
+        action="store_true",
+        help="Use CPU stand-ins instead of the configured models",
+    )
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per case")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per case")
+    parser.add_argument("--output", type=Path, help="JSON report (default: data/bench/)")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline report to compare with",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown counted as a regression (default: 0.2)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--audio-dir",
+        type=Path,
+        help="16 kHz mono WAV files for the STT suite (default: synthetic audio)",
+    )
+    parser.add_argument("--llm-url", help="OpenAI-compatible base URL (default: VLLM_BASE_URL)")
+    parser.add_argument("--mock-ttft-ms", type=float, default=100.0)
+    parser.add_argument("--mock-token-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
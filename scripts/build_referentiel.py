@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Build the emergent skills referential from extracted_skills (E-02).
+
+1. Aggregate extracted_skills per normalized label (SQL GROUP BY).
+2. Embed each distinct label (e5 "query", shared embedding cache).
+3. Build a k-NN graph (hnswlib HNSW, exact blocked search as fallback) and
+   cluster it: pairs above --threshold are merged, under a centroid check.
+4. Upsert emergent_skills and link every extracted skill, in one transaction.
+
+--incremental (daily runs) only embeds the labels not linked yet, attaches
+them to their nearest existing emergent skill (pgvector HNSW lookup) and
+clusters the rest (the pending pool); pending clusters cited by at least
+REFERENTIEL_PENDING_MIN_FREQUENCY offers become new emergent skills.
+
+Usage:
+    python scripts/build_referentiel.py                # full rebuild
+    python scripts/build_referentiel.py --incremental  # new labels only
+    python scripts/build_referentiel.py --threshold 0.88 --k 15
+    python scripts/build_referentiel.py --dry-run      # print clusters only
+
+Reads DATABASE_URL and EMBEDDING_* settings from environment or .env file.
+Requires the ML extras (numpy, hnswlib): pip install -e "apps/api[ml]".
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The clustering services live in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+
+import numpy as np  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db.session import async_session_factory  # noqa: E402
+from app.services.clustering import DEFAULT_K, build_knn_graph, cluster_knn_graph  # noqa: E402
+from app.services.embedding_cache import CachedEmbedder, get_embedder  # noqa: E402
+from app.services.referentiel import (  # noqa: E402
+    LabelGroup,
+    SkillCluster,
+    assign_labels,
+    build_clusters,
+    load_label_groups,
+    write_referentiel,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+logger = logging.getLogger("build_referentiel")
+
+EMBED_CHUNK = 1024
+
+
+async def embed_labels(embedder: CachedEmbedder, keys: list[str]) -> np.ndarray:
+    """Embed labels into one preallocated float32 matrix, chunk by chunk."""
+    vectors = np.empty((len(keys), embedder.dimension), dtype=np.float32)
+    for start in range(0, len(keys), EMBED_CHUNK):
+        chunk = keys[start : start + EMBED_CHUNK]
+        vectors[start : start + len(chunk)] = await embedder.embed(chunk, "query")
+        logger.info("embedded %d/%d labels", start + len(chunk), len(keys))
+    return vectors
+
+
+def cluster_groups(
+    groups: list[LabelGroup], vectors: np.ndarray, threshold: float, k: int, backend: str
+) -> list[SkillCluster]:
+    """Cluster label groups on their k-NN graph, frequencies weighting the centroids."""
+    neighbors, sims = build_knn_graph(vectors, k=k, backend=backend)
+    weights = np.array([g.frequency for g in groups], dtype=np.float32)
+    labels = cluster_knn_graph(vectors, neighbors, sims, threshold, weights)
+    return build_clusters(groups, vectors, labels)
+
+
+async def run(args: argparse.Namespace) -> None:
+    embedder = get_embedder()
+    started = time.perf_counter()
+    attached = linked = 0
+    try:
+        async with async_session_factory() as session:
+            groups = await load_label_groups(session, only_unassigned=args.incremental)
+            if not groups:
+                print(
+                    "No new extracted skills."
+                    if args.incremental
+                    else "No extracted skills. Run `make extract-skills` first."
+                )
+                return
+            vectors = await embed_labels(embedder, [g.key for g in groups])
+            embedded_at = time.perf_counter()
+
+            pool, pool_vectors = groups, vectors
+            if args.incremental and not args.dry_run:
+                attached, pending = await assign_labels(
+                    session, groups, vectors, args.threshold, settings.REFERENTIEL_EF_SEARCH
+                )
+                pool, pool_vectors = [groups[i] for i in pending], vectors[pending]
+
+            clusters = (
+                cluster_groups(pool, pool_vectors, args.threshold, args.k, args.backend)
+                if pool
+                else []
+            )
+            if args.incremental:
+                # Small pending clusters wait for more offers
+                clusters = [
+                    c
+                    for c in clusters
+                    if c.frequency >= settings.REFERENTIEL_PENDING_MIN_FREQUENCY
+                ]
+            clustered_at = time.perf_counter()
+
+            if not args.dry_run:
+                linked = await write_referentiel(session, clusters, replace=not args.incremental)
+    finally:
+        await embedder.service.aclose()
+
+    stats = embedder.stats
+    print("\n--- Emergent Referential ---")
+    print(f"{'Skill':<45} {'Freq':>6} {'Variants':>8}")
+    print("-" * 61)
+    for cluster in clusters[:20]:
+        print(
+            f"{cluster.canonical_label[:45]:<45} {cluster.frequency:>6} "
+            f"{len(cluster.variant_labels):>8}"
+        )
+    print("-" * 61)
+    print(f"Distinct labels:  {len(groups)}")
+    if args.incremental:
+        print(f"Attached:         {attached} extracted skills to existing emergent skills")
+        print(f"Pending pool:     {len(pool)} labels")
+        print(
+            f"New skills:       {len(clusters)} (>= {settings.REFERENTIEL_PENDING_MIN_FREQUENCY} offers)"
+        )
+    else:
+        print(f"Emergent skills:  {len(clusters)} (threshold {args.threshold}, k={args.k})")
+    print(
+        f"Embeddings:       {stats.memory_hits + stats.store_hits}/{stats.lookups} cached, "
+        f"{stats.misses} encoded ({embedded_at - started:.1f}s)"
+    )
+    print(f"Clustering:       {clustered_at - embedded_at:.1f}s")
+    if args.dry_run:
+        print("Dry run: nothing written.")
+    else:
+        print(f"Skills linked:    {attached + linked}")
+    print(f"Elapsed:          {time.perf_counter() - started:.1f}s")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the emergent skills referential")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.REFERENTIEL_THRESHOLD,
+        help="Cosine similarity to merge two labels (default: REFERENTIEL_THRESHOLD)",
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=DEFAULT_K,
+        help=f"Neighbours per label in the k-NN graph (default: {DEFAULT_K})",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "hnsw", "exact"],
+        default="auto",
+        help="k-NN search: hnswlib HNSW or exact blocked search (default: auto)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only assign labels not linked yet, cluster the pending pool",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Cluster and print the result without writing to the database",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Collect NC job offers into the raw_offers table (E-10b, S1-4).
+
+Fetches every configured source concurrently with one pooled HTTP client,
+using per-source concurrency limits and conditional GETs on listing pages.
+Offers already in raw_offers (same source_url) are skipped, new ones are
+inserted in batches. Near-duplicates of stored offers (same offer reposted
+on another source) are flagged with duplicate_of; offers stored without
+LSH bands (before near-duplicate detection) are backfilled first.
+
+Idempotent: re-running only fetches what is new.
+
+Sources are described in a JSON file (default: data/offers/sources.json):
+
+    [
+      {
+        "name": "emploi_nc",
+        "listing_urls": ["https://<site>/offres?page=1", "..."],
+        "link_pattern": "/offre/\\d+",
+        "max_concurrency": 4
+      }
+    ]
+
+Usage:
+    python scripts/collect_offers.py
+    python scripts/collect_offers.py --sources data/offers/sources.json --batch-size 200
+
+Reads DATABASE_URL from environment or .env file.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCES = ROOT_DIR / "data" / "offers" / "sources.json"
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The ingestion engine lives in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+
+from app.db.session import async_session_factory  # noqa: E402
+from app.services.offer_ingestion import (  # noqa: E402
+    OfferCollector,
+    OfferSource,
+    PostgresOfferStore,
+    extract_links,
+    html_offer_parser,
+    make_client,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+
+
+def load_sources(path: Path) -> list[OfferSource]:
+    """Build OfferSource objects from the JSON sources file."""
+    sources: list[OfferSource] = []
+    for entry in json.loads(path.read_text(encoding="utf-8")):
+        sources.append(
+            OfferSource(
+                name=entry["name"],
+                listing_urls=entry["listing_urls"],
+                parse_listing=partial(_listing_parser, entry["link_pattern"]),
+                parse_offer=html_offer_parser(entry["name"]),
+                max_concurrency=entry.get("max_concurrency", 4),
+            )
+        )
+    return sources
+
+
+def _listing_parser(pattern: str, url: str, html: str) -> list[str]:
+    return extract_links(url, html, pattern)
+
+
+async def run(sources: list[OfferSource], batch_size: int, max_connections: int) -> int:
+    """Collect every source; return 1 if one of them failed, 0 otherwise."""
+    store = PostgresOfferStore(async_session_factory)
+    backfilled = await store.backfill_bands()
+    if backfilled:
+        print(f"Near-duplicate bands backfilled for {backfilled} stored offers")
+    async with make_client(max_connections=max_connections) as client:
+        collector = OfferCollector(client, store, batch_size=batch_size)
+        results = await collector.collect(sources)
+
+    print("\n--- Collection Summary ---")
+    print(
+        f"{'Source':<16} {'Seen':>6} {'Known':>6} {'Fetched':>8} {'Inserted':>9} "
+        f"{'Dups':>5} {'Errors':>7} {'304':>5} {'Offers/s':>9}"
+    )
+    for name, s in results.items():
+        print(
+            f"{name:<16} {s.offers_seen:>6} {s.offers_known:>6} {s.offers_fetched:>8} "
+            f"{s.offers_inserted:>9} {s.offers_duplicates:>5} {s.errors:>7} {s.listings_not_modified:>5} "
+            f"{s.offers_per_s:>9.1f}"
+        )
+    failed = {name: s.failure for name, s in results.items() if s.failure is not None}
+    for name, failure in failed.items():
+        print(f"FAILED {name}: {failure}")
+    print("Done.")
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collect NC job offers into raw_offers")
+    parser.add_argument(
+        "--sources",
+        type=Path,
+        default=DEFAULT_SOURCES,
+        help=f"JSON file describing the sources (default: {DEFAULT_SOURCES})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Offers per INSERT batch (default: 100)",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=32,
+        help="Size of the shared HTTP connection pool (default: 32)",
+    )
+    args = parser.parse_args()
+
+    if not args.sources.exists():
+        print(
+            f"No sources file found at {args.sources}.\n"
+            "See the module docstring of scripts/collect_offers.py for the format.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    sys.exit(asyncio.run(run(load_sources(args.sources), args.batch_size, args.max_connections)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
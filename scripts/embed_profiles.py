@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compute profiles.embedding for semantic matching (E-03).
+
+Encodes each profile (competence labels + LLM resume) as an e5 passage with
+the shared embedding cache: profiles whose text did not change are served
+from embedding_cache without running the model.
+
+Usage:
+    python scripts/embed_profiles.py          # profiles without a vector
+    python scripts/embed_profiles.py --all    # recompute every profile
+
+Reads DATABASE_URL and EMBEDDING_* settings from environment or .env file.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The embedding services live in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+
+from app.db.session import async_session_factory  # noqa: E402
+from app.services.embedding_cache import get_embedder  # noqa: E402
+from app.services.profile_embeddings import refresh_profile_embeddings  # noqa: E402
+
+
+async def run(only_missing: bool) -> None:
+    embedder = get_embedder()
+    started = time.perf_counter()
+    try:
+        async with async_session_factory() as session:
+            updated = await refresh_profile_embeddings(
+                session, embedder, only_missing=only_missing
+            )
+    finally:
+        await embedder.service.aclose()
+
+    stats = embedder.stats
+    print("\n--- Profile Embeddings ---")
+    print(f"Profiles updated: {updated}")
+    print(f"Model:            {embedder.model_name}")
+    print(
+        f"Cache:            {stats.memory_hits + stats.store_hits}/{stats.lookups} hits "
+        f"({stats.hit_rate:.0%}), {stats.misses} encoded"
+    )
+    print(f"Elapsed:          {time.perf_counter() - started:.1f}s")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute profiles.embedding")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute every profile, not only those without a vector",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(only_missing=not args.all))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Extract skills from unprocessed raw_offers with the local LLM (E-10b, S1-5).
+
+Claims batches of offers with SELECT ... FOR UPDATE SKIP LOCKED, sends them
+to vLLM with many requests in flight, bulk-inserts extracted_skills and
+marks the offers processed in the same transaction. Resumable and safe to
+run in parallel: start several workers on the same node to scale until the
+GPU saturates.
+
+Answers are cached in llm_response_cache, keyed by (model, prompt version,
+normalized offer text): re-extracting offers whose text and prompt did not
+change costs no GPU time. Use --no-cache to force fresh answers.
+
+Usage:
+    python scripts/extract_skills.py
+    python scripts/extract_skills.py --concurrency 128 --batch-size 64
+    python scripts/extract_skills.py --limit 10      # quick check on 10 offers
+    python scripts/extract_skills.py --no-cache
+
+Reads DATABASE_URL, VLLM_BASE_URL and VLLM_MODEL from environment or .env file.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+# The extraction worker lives in the API package (app.services)
+sys.path.insert(0, str(ROOT_DIR / "apps" / "api"))
+
+from app.config import settings  # noqa: E402
+from app.db.session import async_session_factory  # noqa: E402
+from app.services.llm import LLMClient, make_llm_client  # noqa: E402
+from app.services.llm_cache import PostgresResponseCache  # noqa: E402
+from app.services.skill_extraction import (  # noqa: E402
+    ExtractionWorker,
+    PostgresExtractionStore,
+    make_offer_extractor,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+
+
+async def run(args: argparse.Namespace) -> None:
+    store = PostgresExtractionStore(async_session_factory)
+    cache = None
+    if not args.no_cache:
+        cache = PostgresResponseCache(async_session_factory, settings.LLM_CACHE_MAX_ENTRIES)
+    async with make_llm_client(max_connections=args.concurrency) as client:
+        extractor = make_offer_extractor(
+            LLMClient(client, model=args.model),
+            cache=cache,
+            concurrency=args.concurrency,
+            max_tokens=settings.EXTRACTION_MAX_TOKENS,
+        )
+        worker = ExtractionWorker(store, extractor, batch_size=args.batch_size)
+        stats = await worker.run(limit=args.limit)
+    if cache is not None:
+        await cache.evict()
+
+    print("\n--- Extraction Summary ---")
+    print(f"Offers processed: {stats.offers_processed} ({stats.cache_hits} from cache)")
+    print(f"Offers failed:    {stats.offers_failed} (left unprocessed, retried next run)")
+    print(f"Skills inserted:  {stats.skills_inserted}")
+    print(f"Elapsed:          {stats.elapsed_s:.1f}s")
+    print(f"Throughput:       {stats.offers_per_s:.1f} offers/s, {stats.tokens_per_s:.0f} tok/s")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract skills from raw_offers with the LLM")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.EXTRACTION_BATCH_SIZE,
+        help=f"Offers claimed per transaction (default: {settings.EXTRACTION_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.EXTRACTION_CONCURRENCY,
+        help=f"Max LLM requests in flight (default: {settings.EXTRACTION_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Stop after this many offers (default: drain the queue)",
+    )
+    parser.add_argument(
+        "--model",
+        default=settings.VLLM_MODEL,
+        help=f"Model name as served by vLLM (default: {settings.VLLM_MODEL})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the LLM response cache (answers are not read nor written)",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except OSError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
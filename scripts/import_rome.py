@@ -2,8 +2,16 @@
 """Import ROME v4 taxonomy from France Travail open data into PostgreSQL.
 
 Downloads the ROME bulk files (JSON) from the France Travail open data portal,
-parses them, and upserts into the rome_metiers, rome_competences, and
-rome_appellations tables.
+parses them incrementally (one fiche at a time, never the whole export), and
+streams them into the rome_metiers, rome_competences, and
+rome_appellations tables (one COPY into a temp staging table). Peak memory
+stays flat regardless of export size.
+
+The refresh is incremental: each row carries a content hash, and only rows
+that were added or changed since the last import are written. Rows absent
+from the export are deleted only with --delete-missing, and never when
+that would remove more than MAX_DELETE_SHARE of a table (a truncated or
+partial export): the import is then rolled back.
 
 Falls back to local files in data/rome/ if the API is unavailable.
 
@@ -11,17 +19,25 @@ Usage:
     python scripts/import_rome.py
     python scripts/import_rome.py --local data/rome/rome_export.zip
     python scripts/import_rome.py --dry-run
+    python scripts/import_rome.py --report data/rome/changes.json
+    python scripts/import_rome.py --delete-missing
 
 Reads DATABASE_URL_SYNC from environment or .env file.
 """
 
 import argparse
-import io
+import codecs
+import itertools
 import json
 import os
 import sys
+import tempfile
+import time
 import zipfile
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
 from pathlib import Path
+from typing import IO
 
 import httpx
 import psycopg
@@ -62,207 +78,219 @@ DATABASE_URL = os.environ.get(
 )
 CONNINFO = DATABASE_URL.replace("postgresql+psycopg://", "postgresql://")
 
+# With --delete-missing, an export that would delete more than this share
+# of a table is treated as truncated and the import is rolled back
+MAX_DELETE_SHARE = 0.1
+
+# Read size for zip members and HTTP bodies -- bounds the parser's buffer
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 # ---------------------------------------------------------------------------
-# Data fetching
+# Streaming JSON parsing
 # ---------------------------------------------------------------------------
 
 
-def download_rome_json(url: str, label: str) -> list[dict] | None:
-    """Download a JSON array from the given URL, with error handling."""
-    print(f"  Downloading {label} from {url} ...")
-    try:
-        with httpx.Client(timeout=60.0, follow_redirects=True) as client:
-            resp = client.get(url)
-            resp.raise_for_status()
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array from a stream of bytes.
 
-            content_type = resp.headers.get("content-type", "")
+    Only the element being decoded is held in memory, so peak RSS depends on
+    the size of the largest fiche, not on the size of the export.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        for chunk in chunks:
+            text = utf8.decode(chunk)
+            if text:
+                buf = buf[pos:] + text
+                pos = 0
+                return True
+        buf = buf[pos:] + utf8.decode(b"", final=True)
+        pos = 0
+        eof = True
+        return False
+
+    def peek() -> str:
+        """Next non-whitespace character ('' at end of stream), refilling as needed."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof or not fill():
+                return ""
+
+    if peek() != "[":
+        raise ValueError("ROME export is not a JSON array")
+    pos += 1
+    if peek() == "]":
+        return
 
-            # Handle ZIP archives
-            if "zip" in content_type or url.endswith(".zip"):
-                return extract_json_from_zip(resp.content)
+    while True:
+        if peek() == "":
+            raise ValueError("Unexpected end of JSON stream")
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # A value not yet followed by a delimiter may go on in the next
+            # chunk (a number split as "1" + "23" or "12." + "5"): decode it
+            # again with more input
+            if eof or (end < len(buf) and (buf[end].isspace() or buf[end] in ",]")):
+                break
+            fill()
+        pos = end
+        yield item
+
+        separator = peek()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(
+                f"Expected ',' or ']' in JSON array, got {separator or 'end of stream'!r}"
+            )
+        pos += 1
 
-            # Handle direct JSON
-            return resp.json()
-    except httpx.HTTPStatusError as exc:
-        print(f"  HTTP error {exc.response.status_code} fetching {label}")
-        return None
-    except httpx.ConnectError:
-        print(f"  Connection error fetching {label} — API may be down")
-        return None
-    except Exception as exc:
-        print(f"  Error fetching {label}: {exc}")
-        return None
 
+def iter_file_chunks(f: IO[bytes]) -> Iterator[bytes]:
+    """Read a binary file object in STREAM_CHUNK_SIZE chunks."""
+    while chunk := f.read(STREAM_CHUNK_SIZE):
+        yield chunk
 
-def extract_json_from_zip(content: bytes) -> list[dict] | None:
-    """Extract the first JSON file from a ZIP archive."""
-    try:
-        with zipfile.ZipFile(io.BytesIO(content)) as zf:
-            json_files = [n for n in zf.namelist() if n.endswith(".json")]
-            if not json_files:
-                print("  No JSON files found in ZIP archive")
-                return None
-            with zf.open(json_files[0]) as f:
-                return json.load(f)
-    except (zipfile.BadZipFile, json.JSONDecodeError) as exc:
-        print(f"  Error extracting ZIP: {exc}")
-        return None
 
+def iter_zip_json(f: IO[bytes]) -> Iterator[dict]:
+    """Stream the elements of the first JSON file of a ZIP archive."""
+    with zipfile.ZipFile(f) as zf:
+        json_files = [n for n in zf.namelist() if n.endswith(".json")]
+        if not json_files:
+            print("  No JSON files found in ZIP archive")
+            return
+        with zf.open(json_files[0]) as member:
+            yield from iter_json_array(iter_file_chunks(member))
 
-def load_local_file(filename: str) -> list[dict] | None:
-    """Load a JSON file from the local data/rome/ directory."""
-    filepath = LOCAL_DATA_DIR / filename
-    if not filepath.exists():
-        return None
-    print(f"  Loading local file: {filepath}")
-    with open(filepath, encoding="utf-8") as f:
-        return json.load(f)
 
+# ---------------------------------------------------------------------------
+# Data fetching
+# ---------------------------------------------------------------------------
 
-def fetch_rome_data(local_path: str | None = None) -> dict[str, list[dict]]:
-    """Fetch ROME data from API or local files.
 
-    Returns dict with keys: metiers, competences, appellations.
-    Each value is a list of dicts ready for DB insertion.
-    """
-    result: dict[str, list[dict]] = {
-        "metiers": [],
-        "competences": [],
-        "appellations": [],
-    }
+def download_rome_json(url: str, label: str) -> Iterator[dict]:
+    """Stream the fiches of a ROME JSON (or zipped JSON) export over HTTP.
 
-    # If user specified a local ZIP/JSON
-    if local_path:
-        path = Path(local_path)
+    ZIP archives are spooled to a temporary file (the central directory sits
+    at the end of the archive); plain JSON is parsed straight off the socket.
+    """
+    print(f"  Downloading {label} from {url} ...")
+    with (
+        httpx.Client(timeout=60.0, follow_redirects=True) as client,
+        client.stream("GET", url) as resp,
+    ):
+        resp.raise_for_status()
+        content_type = resp.headers.get("content-type", "")
+
+        # Handle ZIP archives
+        if "zip" in content_type or url.endswith(".zip"):
+            with tempfile.TemporaryFile() as tmp:
+                for chunk in resp.iter_bytes(STREAM_CHUNK_SIZE):
+                    tmp.write(chunk)
+                tmp.seek(0)
+                yield from iter_zip_json(tmp)
+            return
+
+        # Handle direct JSON
+        yield from iter_json_array(resp.iter_bytes(STREAM_CHUNK_SIZE))
+
+
+def load_local_file(path: Path) -> Iterator[dict]:
+    """Stream the fiches of a local ROME ZIP or JSON export."""
+    print(f"  Loading local file: {path}")
+    with open(path, "rb") as f:
         if path.suffix == ".zip":
-            with open(path, "rb") as f:
-                data = extract_json_from_zip(f.read())
-            if data:
-                result = parse_rome_bulk(data)
-                return result
-        elif path.suffix == ".json":
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                result = parse_rome_bulk(data)
-                return result
-
-    # Try API download
-    print("Fetching ROME data from France Travail API...")
-    metiers_raw = download_rome_json(ROME_BASE_URL, "fiches métier")
+            yield from iter_zip_json(f)
+        else:
+            yield from iter_json_array(iter_file_chunks(f))
 
-    if metiers_raw:
-        for fiche in metiers_raw:
-            code = fiche.get("code", fiche.get("codeRome", ""))
-            libelle = fiche.get("libelle", fiche.get("intitule", ""))
-            definition = fiche.get("definition", "")
-
-            if code and libelle:
-                result["metiers"].append(
-                    {
-                        "code_rome": code,
-                        "libelle": libelle,
-                        "definition": definition,
-                    }
-                )
-
-            # Extract competences from fiche
-            for comp_block in fiche.get("competencesDeBase", []):
-                comp_code = comp_block.get("code", "")
-                comp_libelle = comp_block.get("libelle", "")
-                if comp_code and comp_libelle:
-                    result["competences"].append(
-                        {
-                            "code": comp_code,
-                            "libelle": comp_libelle,
-                            "type_competence": "savoir-faire",
-                        }
-                    )
 
-            for comp_block in fiche.get("competencesSpecifiques", []):
-                comp_code = comp_block.get("code", "")
-                comp_libelle = comp_block.get("libelle", "")
-                if comp_code and comp_libelle:
-                    result["competences"].append(
-                        {
-                            "code": comp_code,
-                            "libelle": comp_libelle,
-                            "type_competence": "savoir-faire",
-                        }
-                    )
+def peek(items: Iterator[dict]) -> Iterator[dict] | None:
+    """Return ``items`` unconsumed, or None if it is empty."""
+    first = next(items, None)
+    if first is None:
+        return None
+    return itertools.chain([first], items)
 
-            for savoir in fiche.get("savoirs", []):
-                s_code = savoir.get("code", "")
-                s_libelle = savoir.get("libelle", "")
-                if s_code and s_libelle:
-                    result["competences"].append(
-                        {
-                            "code": s_code,
-                            "libelle": s_libelle,
-                            "type_competence": "savoir",
-                        }
-                    )
 
-            for savoir_etre in fiche.get("savoirEtre", []):
-                se_code = savoir_etre.get("code", "")
-                se_libelle = savoir_etre.get("libelle", "")
-                if se_code and se_libelle:
-                    result["competences"].append(
-                        {
-                            "code": se_code,
-                            "libelle": se_libelle,
-                            "type_competence": "savoir-être",
-                        }
-                    )
+def fetch_rome_data(local_path: str | None = None) -> Iterator[dict] | None:
+    """Open a stream of ROME fiches from a local file, the API or data/rome/.
 
-            # Extract appellations from fiche
-            for appellation in fiche.get("appellations", []):
-                app_code = appellation.get("code", "")
-                app_libelle = appellation.get("libelle", "")
-                if app_code and app_libelle and code:
-                    result["appellations"].append(
-                        {
-                            "code": app_code,
-                            "libelle": app_libelle,
-                            "code_rome": code,
-                        }
-                    )
+    Returns None when no source is available. Only the first fiche is read
+    here (to pick the source); the rest is pulled lazily by the loader.
+    """
+    # If user specified a local ZIP/JSON
+    if local_path:
+        path = Path(local_path)
+        if path.suffix in (".zip", ".json") and path.exists():
+            return peek(load_local_file(path))
 
-        return result
+    # Try API download
+    print("Fetching ROME data from France Travail API...")
+    label = "fiches métier"
+    try:
+        fiches = peek(download_rome_json(ROME_BASE_URL, label))
+    except httpx.HTTPStatusError as exc:
+        print(f"  HTTP error {exc.response.status_code} fetching {label}")
+        fiches = None
+    except httpx.ConnectError:
+        print(f"  Connection error fetching {label} — API may be down")
+        fiches = None
+    except Exception as exc:
+        print(f"  Error fetching {label}: {exc}")
+        fiches = None
+    if fiches is not None:
+        return fiches
 
     # Fallback: try local files
     print("API unavailable, trying local files...")
     for filename in ["rome_metiers.json", "rome_fiches.json", "rome_export.json"]:
-        data = load_local_file(filename)
-        if data:
-            result = parse_rome_bulk(data)
-            if result["metiers"]:
-                return result
+        filepath = LOCAL_DATA_DIR / filename
+        if filepath.exists():
+            fiches = peek(load_local_file(filepath))
+            if fiches is not None:
+                return fiches
 
-    return result
+    return None
 
 
-def parse_rome_bulk(data: list[dict]) -> dict[str, list[dict]]:
-    """Parse a bulk ROME JSON export into metiers, competences, appellations."""
-    result: dict[str, list[dict]] = {
-        "metiers": [],
-        "competences": [],
-        "appellations": [],
-    }
+def parse_rome_bulk(fiches: Iterable[dict]) -> Iterator[tuple[str, dict]]:
+    """Turn ROME fiches into (kind, row) records.
 
-    for item in data:
+    ``kind`` is one of metiers, competences, appellations; rows are yielded
+    as soon as each fiche is decoded.
+    """
+    for item in fiches:
         code = item.get("code", item.get("codeRome", ""))
         libelle = item.get("libelle", item.get("intitule", ""))
         definition = item.get("definition", "")
 
         if code and libelle:
-            result["metiers"].append(
+            yield (
+                "metiers",
                 {
                     "code_rome": code,
                     "libelle": libelle,
                     "definition": definition,
-                }
+                },
             )
 
         # Nested competences
@@ -276,12 +304,13 @@ def parse_rome_bulk(data: list[dict]) -> dict[str, list[dict]]:
                 c_code = comp.get("code", "")
                 c_libelle = comp.get("libelle", "")
                 if c_code and c_libelle:
-                    result["competences"].append(
+                    yield (
+                        "competences",
                         {
                             "code": c_code,
                             "libelle": c_libelle,
                             "type_competence": comp_type,
-                        }
+                        },
                     )
 
         # Nested appellations
@@ -289,116 +318,311 @@ def parse_rome_bulk(data: list[dict]) -> dict[str, list[dict]]:
             app_code = appellation.get("code", "")
             app_libelle = appellation.get("libelle", "")
             if app_code and app_libelle and code:
-                result["appellations"].append(
+                yield (
+                    "appellations",
                     {
                         "code": app_code,
                         "libelle": app_libelle,
                         "code_rome": code,
-                    }
+                    },
                 )
 
-    return result
-
 
 # ---------------------------------------------------------------------------
-# Database upsert
+# Database refresh (bulk COPY + content-hash change set)
 # ---------------------------------------------------------------------------
 
+# (table, record kind, columns, primary key) -- in FK order (metiers first)
+ROME_TABLES: list[tuple[str, str, tuple[str, ...], str]] = [
+    ("rome_metiers", "metiers", ("code_rome", "libelle", "definition"), "code_rome"),
+    ("rome_competences", "competences", ("code", "libelle", "type_competence"), "code"),
+    ("rome_appellations", "appellations", ("code", "libelle", "code_rome"), "code"),
+]
+
+# Single staging table for the three record kinds, so the whole export goes
+# through one COPY stream (a connection can only run one COPY at a time).
+STAGING_TABLE = "_stage_rome"
+STAGING_COLUMNS = ("kind", "code", "libelle", "definition", "type_competence", "code_rome")
+
+
+def staging_row(kind: str, row: dict) -> tuple:
+    """Flatten a (kind, row) record into the STAGING_COLUMNS layout."""
+    code = row["code_rome"] if kind == "metiers" else row["code"]
+    return (
+        kind,
+        code,
+        row["libelle"],
+        row.get("definition"),
+        row.get("type_competence"),
+        row.get("code_rome"),
+    )
+
+
+def stage_rows(cur: psycopg.Cursor, records: Iterable[tuple[str, dict]]) -> None:
+    """COPY the record stream into a temp staging table."""
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE {STAGING_TABLE} (
+            seq bigserial,
+            kind text NOT NULL,
+            code text NOT NULL,
+            libelle text NOT NULL,
+            definition text,
+            type_competence text,
+            code_rome text
+        ) ON COMMIT DROP
+        """
+    )
+    with cur.copy(f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN") as copy:
+        for kind, row in records:
+            copy.write_row(staging_row(kind, row))
 
-def upsert_rome_data(data: dict[str, list[dict]], dry_run: bool = False) -> None:
-    """Upsert ROME data into PostgreSQL tables."""
-    metiers = data["metiers"]
-    competences = data["competences"]
-    appellations = data["appellations"]
 
-    # Deduplicate by primary key
-    metiers_map = {m["code_rome"]: m for m in metiers}
-    competences_map = {c["code"]: c for c in competences}
-    appellations_map = {a["code"]: a for a in appellations}
+def content_hash_sql(columns: tuple[str, ...], key: str) -> str:
+    """SQL expression hashing the non-key columns of staging row ``s``.
 
-    metiers = list(metiers_map.values())
-    competences = list(competences_map.values())
-    appellations = list(appellations_map.values())
+    A row whose key is unchanged but whose content changed gets a new hash;
+    the key itself is left out so the hash only tracks content.
+    """
+    hashed = ", ".join(f"s.{c}" for c in columns if c != key)
+    return f"md5(ROW({hashed})::text)"
+
+
+def check_delete_share(table: str, missing: int, total: int) -> None:
+    """Refuse an export that would delete more than MAX_DELETE_SHARE of ``table``."""
+    if total and missing / total > MAX_DELETE_SHARE:
+        raise ValueError(
+            f"export would delete {missing} of {total} rows of {table} "
+            f"(> {MAX_DELETE_SHARE:.0%}): truncated export? Nothing written."
+        )
 
-    print("\nData to upsert:")
-    print(f"  Métiers:       {len(metiers)}")
-    print(f"  Compétences:   {len(competences)}")
-    print(f"  Appellations:  {len(appellations)}")
+
+def build_source(
+    cur: psycopg.Cursor,
+    table: str,
+    kind: str,
+    columns: tuple[str, ...],
+    key: str,
+) -> str:
+    """Materialise the deduplicated, hashed rows of one record kind.
+
+    Duplicates are resolved in SQL (last occurrence in the export wins) and
+    ``content_hash`` is the md5 of the non-key columns. Appellations are
+    joined on rome_metiers so rows whose code_rome FK is unknown are skipped
+    instead of aborting the whole transaction.
+    """
+    source = f"_src_{table}"
+    # The staging key column is "code" for every kind
+    select_cols = ", ".join(f"s.code AS {c}" if c == key else f"s.{c}" for c in columns)
+    join = ""
+    if table == "rome_appellations":
+        join = "JOIN rome_metiers m ON m.code_rome = s.code_rome"
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE {source} ON COMMIT DROP AS
+        SELECT {select_cols}, {content_hash_sql(columns, key)} AS content_hash
+        FROM (
+            SELECT DISTINCT ON (code) *
+            FROM {STAGING_TABLE}
+            WHERE kind = %(kind)s
+            ORDER BY code, seq DESC
+        ) s {join}
+        """,
+        {"kind": kind},
+    )
+    cur.execute(f"CREATE UNIQUE INDEX ON {source} ({key})")
+    cur.execute(f"ANALYZE {source}")
+    return source
+
+
+def apply_changes(
+    cur: psycopg.Cursor,
+    table: str,
+    source: str,
+    columns: tuple[str, ...],
+    key: str,
+) -> dict[str, list[str]]:
+    """Insert new rows and update rows whose content hash changed.
+
+    Unchanged rows are not touched at all, so a refresh only writes (and
+    WAL-logs) what actually changed between two ROME releases. Rows stored
+    before hashing existed (NULL hash) are rewritten once to backfill it.
+    """
+    cols = ", ".join(columns)
+    select_cols = ", ".join(f"s.{c}" for c in columns)
+    updates = ", ".join(f"{c} = s.{c}" for c in columns if c != key)
+
+    cur.execute(
+        f"""
+        INSERT INTO {table} ({cols}, content_hash)
+        SELECT {select_cols}, s.content_hash
+        FROM {source} s
+        WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = s.{key})
+        RETURNING {key}
+        """
+    )
+    inserted = [row[0] for row in cur.fetchall()]
+
+    cur.execute(
+        f"""
+        UPDATE {table} t
+        SET {updates}, content_hash = s.content_hash
+        FROM {source} s
+        WHERE t.{key} = s.{key}
+          AND t.content_hash IS DISTINCT FROM s.content_hash
+        RETURNING t.{key}
+        """
+    )
+    updated = [row[0] for row in cur.fetchall()]
+
+    return {"inserted": inserted, "updated": updated}
+
+
+def count_missing(cur: psycopg.Cursor, table: str, source: str, key: str) -> tuple[int, int]:
+    """Rows of ``table`` absent from the export, and the current row count."""
+    cur.execute(
+        f"""
+        SELECT count(*) FILTER (
+                   WHERE NOT EXISTS (SELECT 1 FROM {source} s WHERE s.{key} = t.{key})
+               ),
+               count(*)
+        FROM {table} t
+        """
+    )
+    missing, total = cur.fetchone()
+    return missing, total
+
+
+def apply_deletes(cur: psycopg.Cursor, table: str, source: str, key: str) -> list[str]:
+    """Delete rows that are no longer present in the export."""
+    cur.execute(
+        f"""
+        DELETE FROM {table} t
+        WHERE NOT EXISTS (SELECT 1 FROM {source} s WHERE s.{key} = t.{key})
+        RETURNING t.{key}
+        """
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def count_records(
+    records: Iterable[tuple[str, dict]],
+    counts: dict[str, int],
+    samples: dict[str, dict],
+) -> Iterator[tuple[str, dict]]:
+    """Pass records through while counting them and keeping one sample per kind."""
+    for kind, row in records:
+        counts[kind] = counts.get(kind, 0) + 1
+        samples.setdefault(kind, row)
+        yield kind, row
+
+
+def upsert_rome_data(
+    fiches: Iterable[dict],
+    dry_run: bool = False,
+    delete_missing: bool = False,
+    report_path: Path | None = None,
+) -> dict[str, int]:
+    """Stream ROME fiches into PostgreSQL; return the record count per kind.
+
+    Records flow from the parser into a single COPY (nothing is
+    materialised in Python). Each table is then diffed against the export
+    by content hash and only the change set is applied: inserts, updates
+    of changed rows and, with ``delete_missing``, deletes of rows that
+    disappeared. Everything runs in one transaction, which is rolled back
+    if the export contained no métier, or if it would delete more than
+    MAX_DELETE_SHARE of a table (ValueError).
+    """
+    counts: dict[str, int] = {}
+    samples: dict[str, dict] = {}
+    records = count_records(parse_rome_bulk(fiches), counts, samples)
 
     if dry_run:
+        for _ in records:
+            pass
+        print("\nData parsed (before deduplication):")
+        print(f"  Métiers:       {counts.get('metiers', 0)}")
+        print(f"  Compétences:   {counts.get('competences', 0)}")
+        print(f"  Appellations:  {counts.get('appellations', 0)}")
         print("\n[DRY RUN] No data written to database.")
-        if metiers:
-            print(f"\nSample métier: {metiers[0]}")
-        if competences:
-            print(f"Sample compétence: {competences[0]}")
-        if appellations:
-            print(f"Sample appellation: {appellations[0]}")
-        return
+        if "metiers" in samples:
+            print(f"\nSample métier: {samples['metiers']}")
+        if "competences" in samples:
+            print(f"Sample compétence: {samples['competences']}")
+        if "appellations" in samples:
+            print(f"Sample appellation: {samples['appellations']}")
+        return counts
 
     print(f"\nConnecting to: {CONNINFO.split('@')[1] if '@' in CONNINFO else CONNINFO}")
 
+    # table -> {"inserted": [...], "updated": [...], "deleted": [...]}
+    changes: dict[str, dict[str, list[str]]] = {}
+    # table -> merge seconds
+    timings: dict[str, float] = {}
+
     with psycopg.connect(CONNINFO) as conn:
         with conn.cursor() as cur:
-            # Upsert métiers
-            metiers_count = 0
-            for m in metiers:
-                cur.execute(
-                    """
-                    INSERT INTO rome_metiers (code_rome, libelle, definition)
-                    VALUES (%(code_rome)s, %(libelle)s, %(definition)s)
-                    ON CONFLICT (code_rome) DO UPDATE SET
-                        libelle = EXCLUDED.libelle,
-                        definition = EXCLUDED.definition
-                    """,
-                    m,
-                )
-                metiers_count += 1
-
-            # Upsert compétences
-            competences_count = 0
-            for c in competences:
-                cur.execute(
-                    """
-                    INSERT INTO rome_competences (code, libelle, type_competence)
-                    VALUES (%(code)s, %(libelle)s, %(type_competence)s)
-                    ON CONFLICT (code) DO UPDATE SET
-                        libelle = EXCLUDED.libelle,
-                        type_competence = EXCLUDED.type_competence
-                    """,
-                    c,
-                )
-                competences_count += 1
-
-            # Upsert appellations (only those with valid code_rome FK)
-            appellations_count = 0
-            appellations_skipped = 0
-            valid_codes = {m["code_rome"] for m in metiers}
-
-            for a in appellations:
-                if a["code_rome"] not in valid_codes:
-                    appellations_skipped += 1
-                    continue
-                cur.execute(
-                    """
-                    INSERT INTO rome_appellations (code, libelle, code_rome)
-                    VALUES (%(code)s, %(libelle)s, %(code_rome)s)
-                    ON CONFLICT (code) DO UPDATE SET
-                        libelle = EXCLUDED.libelle,
-                        code_rome = EXCLUDED.code_rome
-                    """,
-                    a,
-                )
-                appellations_count += 1
+            t0 = time.perf_counter()
+            stage_rows(cur, records)
+            copy_s = time.perf_counter() - t0
+
+            if not counts.get("metiers"):
+                conn.rollback()
+                return counts
+
+            sources: dict[str, str] = {}
+            for table, kind, columns, key in ROME_TABLES:
+                t0 = time.perf_counter()
+                sources[table] = build_source(cur, table, kind, columns, key)
+                changes[table] = apply_changes(cur, table, sources[table], columns, key)
+                timings[table] = time.perf_counter() - t0
+
+            if delete_missing:
+                # Checked on every table before any delete (they cascade)
+                for table, _kind, _columns, key in ROME_TABLES:
+                    missing, total = count_missing(cur, table, sources[table], key)
+                    try:
+                        check_delete_share(table, missing, total)
+                    except ValueError:
+                        conn.rollback()
+                        raise
+
+            # Deletes in reverse FK order (appellations before their métier)
+            for table, _kind, _columns, key in reversed(ROME_TABLES):
+                t0 = time.perf_counter()
+                deleted = apply_deletes(cur, table, sources[table], key) if delete_missing else []
+                changes[table]["deleted"] = deleted
+                timings[table] += time.perf_counter() - t0
 
         conn.commit()
 
-    print("\n--- Import Summary ---")
-    print(f"Métiers upserted:       {metiers_count}")
-    print(f"Compétences upserted:   {competences_count}")
-    print(f"Appellations upserted:  {appellations_count}")
-    if appellations_skipped:
-        print(f"Appellations skipped:   {appellations_skipped} (missing code_rome FK)")
+    print("\n--- Import Summary (change set) ---")
+    print(f"COPY (streamed, all kinds): {sum(counts.values())} rows in {copy_s:.3f}s")
+    print(
+        f"{'Table':<20} {'Parsed':>8} {'Inserted':>9} {'Updated':>8} {'Deleted':>8} "
+        f"{'Merge (s)':>10}"
+    )
+    for table, kind, _columns, _key in ROME_TABLES:
+        c = changes[table]
+        print(
+            f"{table:<20} {counts.get(kind, 0):>8} {len(c['inserted']):>9} "
+            f"{len(c['updated']):>8} {len(c['deleted']):>8} {timings[table]:>10.3f}"
+        )
+    total = copy_s + sum(timings.values())
+    print(f"Total database time:    {total:.3f}s")
+
+    if report_path is not None:
+        report = {
+            "generated_at": datetime.now(UTC).isoformat(),
+            "parsed": counts,
+            "changes": changes,
+        }
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Change-set report written to {report_path}")
+
     print("Done.")
+    return counts
 
 
 # ---------------------------------------------------------------------------
@@ -421,11 +645,31 @@ def main() -> None:
         action="store_true",
         help="Parse data but do not write to database",
     )
+    parser.add_argument(
+        "--delete-missing",
+        action="store_true",
+        help=(
+            "Delete rows that are absent from the export "
+            f"(refused above {MAX_DELETE_SHARE:.0%} of a table)"
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Write the change set (inserted/updated/deleted codes) to this JSON file",
+    )
     args = parser.parse_args()
 
-    data = fetch_rome_data(local_path=args.local)
+    fiches = fetch_rome_data(local_path=args.local)
+    counts = upsert_rome_data(
+        fiches or [],
+        dry_run=args.dry_run,
+        delete_missing=args.delete_missing,
+        report_path=args.report,
+    )
 
-    if not data["metiers"]:
+    if not counts.get("metiers"):
         print(
             "\nNo ROME data found. Either:\n"
             "  1. The France Travail API is unavailable\n"
@@ -436,8 +680,6 @@ def main() -> None:
         )
         sys.exit(1)
 
-    upsert_rome_data(data, dry_run=args.dry_run)
-
 
 if __name__ == "__main__":
     try:
@@ -449,6 +691,9 @@ if __name__ == "__main__":
             file=sys.stderr,
         )
         sys.exit(1)
+    except ValueError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\nInterrupted.")
         sys.exit(130)
@@ -0,0 +1 @@
+"""Load tests -- virtual candidates, recruiters and aidants against the API."""
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Load test -- saturation curve of the API under a candidate / recruiter / aidant mix.
+
+Virtual users run sessions in a closed loop (see scenarios.py). The load
+grows by stages (--users 1,2,4,8,...): for each stage the run reports
+throughput, latency percentiles per request, the saturation of the API's
+database pool and the mean wait for a connection (sampled from
+/health/db). The stage where throughput stops growing (less than +10%) or
+errors appear is the capacity of the stack. The JSON report can be
+compared with the one of a previous release (--compare).
+
+--spawn starts the stack itself, with the models replaced by stubs of
+configurable latency: the mock OpenAI server for vLLM
+(scripts/bench/mock_openai.py), STT_BACKEND=stub, TTS_BACKEND=stub and
+the hashing embeddings. PostgreSQL is the real one: load a dataset first
+(make db-seed-synthetic).
+
+Usage:
+    python scripts/loadtest/run.py --spawn
+    python scripts/loadtest/run.py --spawn --users 1,4,16,64 --stage-s 60
+    python scripts/loadtest/run.py --api-url http://staging:8000 --mix recruiter=1
+    python scripts/loadtest/run.py --spawn --compare data/loadtest/loadtest-previous.json
+
+Reads DATABASE_URL from environment or .env file (spawned API).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+# .env loading (same logic as seed.py)
+for env_path in [
+    ROOT_DIR / "apps" / "api" / ".env",
+    ROOT_DIR / ".env",
+]:
+    if env_path.exists():
+        for line in env_path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, value = line.partition("=")
+                os.environ.setdefault(key.strip(), value.strip())
+        break
+
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+from bench.core import percentile  # noqa: E402
+
+from loadtest.scenarios import SESSIONS, Recorder, Target  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+LOADTEST_DIR = ROOT_DIR / "data" / "loadtest"
+# Throughput gain under which the stack is considered saturated
+SATURATION_GAIN = 0.10
+MAX_ERROR_RATE = 0.01
+POOL_SAMPLE_S = 0.5
+
+
+# ---------------------------------------------------------------------------
+# Stack (API + stubs)
+# ---------------------------------------------------------------------------
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(
+    name: str, url: str, process: subprocess.Popen, timeout_s: float = 60.0
+) -> None:
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{name} exited with status {process.returncode}")
+            with contextlib.suppress(httpx.HTTPError):
+                if (await client.get(url)).status_code == 200:
+                    return
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout_s:.0f}s")
+
+
+@contextlib.asynccontextmanager
+async def spawn_stack(args: argparse.Namespace) -> AsyncIterator[str]:
+    """Start the mock vLLM and the API with stub models; yield the API URL."""
+    llm_port, api_port = free_port(), free_port()
+    llm = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT_DIR / "scripts" / "bench" / "mock_openai.py"),
+            "--port",
+            str(llm_port),
+            "--ttft-ms",
+            str(args.llm_ttft_ms),
+            "--token-ms",
+            str(args.llm_token_ms),
+            "--log-level",
+            "warning",
+        ]
+    )
+    env = {
+        **os.environ,
+        "VLLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "STT_BACKEND": "stub",
+        "STT_STUB_RTF": str(args.stt_rtf),
+        "TTS_BACKEND": "stub",
+        "TTS_STUB_RTF": str(args.tts_rtf),
+        "TTS_CACHE_DIR": "",
+        "EMBEDDING_BACKEND": "hashing",
+    }
+    api = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(api_port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT_DIR / "apps" / "api",
+        env=env,
+    )
+    try:
+        await wait_ready("mock vLLM", f"http://127.0.0.1:{llm_port}/v1/models", llm)
+        await wait_ready("API", f"http://127.0.0.1:{api_port}/health", api)
+        logger.info(
+            "Stack up: API :%d, mock vLLM :%d (TTFT %gms, %gms/token), STT rtf %g, TTS rtf %g",
+            api_port,
+            llm_port,
+            args.llm_ttft_ms,
+            args.llm_token_ms,
+            args.stt_rtf,
+            args.tts_rtf,
+        )
+        yield f"http://127.0.0.1:{api_port}"
+    finally:
+        for process in (api, llm):
+            process.terminate()
+        for process in (api, llm):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse session weights, e.g. "candidate=5,recruiter=3,aidant=2"."""
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SESSIONS:
+            raise argparse.ArgumentTypeError(f"unknown session {name!r} (one of {list(SESSIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def virtual_user(
+    target: Target,
+    recorder: Recorder,
+    mix: dict[str, float],
+    rng: random.Random,
+    deadline: float,
+) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        recorder.sessions[name] = recorder.sessions.get(name, 0) + 1
+        try:
+            await SESSIONS[name](target, recorder, rng)
+        except Exception as exc:
+            recorder.failed_sessions[name] = recorder.failed_sessions.get(name, 0) + 1
+            logger.debug("%s session failed: %s", name, exc)
+            # Do not hammer a failing endpoint in a tight loop
+            await asyncio.sleep(target.think_s)
+
+
+async def sample_pool(client: httpx.AsyncClient, samples: list[dict]) -> None:
+    """Poll /health/db until cancelled."""
+    while True:
+        with contextlib.suppress(httpx.HTTPError, ValueError):
+            response = await client.get("/health/db")
+            if response.status_code == 200:
+                samples.append(response.json())
+        await asyncio.sleep(POOL_SAMPLE_S)
+
+
+def latency(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "p99_ms": round(percentile(values, 99), 1),
+    }
+
+
+def pool_waits(pool: list[dict]) -> dict:
+    """Waits for a connection during the stage (the API's counters are cumulative)."""
+    if len(pool) < 2 or "acquisitions" not in pool[0]:
+        return {"mean_wait_ms": None, "timeouts": None}
+    first, last = pool[0], pool[-1]
+    acquisitions = last["acquisitions"] - first["acquisitions"]
+    return {
+        "mean_wait_ms": round((last["wait_s"] - first["wait_s"]) / acquisitions * 1000, 2)
+        if acquisitions
+        else 0.0,
+        "timeouts": last["timeouts"] - first["timeouts"],
+    }
+
+
+def stage_summary(
+    users: int, duration_s: float, recorder: Recorder, pool: list[dict], deadline: float
+) -> dict:
+    """Stage figures over the requests completed by ``deadline``.
+
+    Requests finishing later (sessions are awaited up to --timeout-s past
+    the deadline) and milestones inside a request (``voice.first_audio``)
+    count in neither the throughput nor the error rate.
+    """
+    samples = [s for s in recorder.samples if s.at <= deadline]
+    ok = [s for s in samples if s.ok]
+    names = sorted({s.name for s in samples})
+    requests = {
+        name: {
+            **latency([s.ms for s in ok if s.name == name]),
+            "errors": sum(1 for s in samples if s.name == name and not s.ok),
+        }
+        for name in names
+    }
+    counted = [s for s in samples if s.request]
+    counted_ok = [s for s in counted if s.ok]
+    sessions = sum(recorder.sessions.values())
+    failed = sum(recorder.failed_sessions.values())
+    return {
+        "users": users,
+        "duration_s": round(duration_s, 1),
+        "throughput_rps": round(len(counted_ok) / duration_s, 2),
+        "sessions": sessions,
+        "failed_sessions": failed,
+        "error_rate": round((len(counted) - len(counted_ok)) / len(counted), 4)
+        if counted
+        else 0.0,
+        "latency": latency([s.ms for s in counted_ok]),
+        "requests": requests,
+        "pool": {
+            "samples": len(pool),
+            "mean_saturation": round(statistics.fmean(p["saturation"] for p in pool), 3)
+            if pool
+            else None,
+            "max_saturation": max((p["saturation"] for p in pool), default=None),
+            "max_checked_out": max((p["checked_out"] for p in pool), default=None),
+            **pool_waits(pool),
+        },
+    }
+
+
+async def run_stage(
+    api_url: str, users: int, args: argparse.Namespace, rng: random.Random
+) -> dict:
+    recorder = Recorder()
+    pool: list[dict] = []
+    ws_url = "ws" + api_url.removeprefix("http")
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(
+        base_url=api_url, timeout=args.timeout_s, limits=limits
+    ) as client:
+        target = Target(client, ws_url, think_s=args.think_ms / 1000, realtime=not args.fast_audio)
+        sampler = asyncio.create_task(sample_pool(client, pool))
+        started = time.perf_counter()
+        deadline = started + args.stage_s
+        tasks = [
+            asyncio.create_task(
+                virtual_user(target, recorder, args.mix, random.Random(rng.random()), deadline)
+            )
+            for _ in range(users)
+        ]
+        # Sessions running at the deadline may finish (up to --timeout-s more):
+        # their requests completed after the deadline are not counted
+        await asyncio.wait(tasks, timeout=args.stage_s + args.timeout_s)
+        duration_s = time.perf_counter() - started
+        for task in (*tasks, sampler):
+            task.cancel()
+        await asyncio.gather(*tasks, sampler, return_exceptions=True)
+    return stage_summary(users, min(duration_s, args.stage_s), recorder, pool, deadline)
+
+
+def capacity(stages: list[dict]) -> dict | None:
+    """Last stage before throughput stops growing or errors appear."""
+    best = None
+    for stage in stages:
+        if stage["error_rate"] > MAX_ERROR_RATE:
+            break
+        if best is not None and stage["throughput_rps"] < best["throughput_rps"] * (
+            1 + SATURATION_GAIN
+        ):
+            break
+        best = stage
+    return {"users": best["users"], "throughput_rps": best["throughput_rps"]} if best else None
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+def curve_lines(report: dict) -> Iterator[str]:
+    yield (
+        f"{'users':>5} {'req/s':>8} {'sessions':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'pool max':>8} {'wait ms':>8}"
+    )
+    for stage in report["stages"]:
+        lat = stage["latency"]
+        pool = stage["pool"]["max_saturation"]
+        wait = stage["pool"].get("mean_wait_ms")
+        yield (
+            f"{stage['users']:>5} {stage['throughput_rps']:>8.1f} {stage['sessions']:>8} "
+            f"{lat.get('p50_ms', 0):>8.0f} {lat.get('p95_ms', 0):>8.0f} "
+            f"{lat.get('p99_ms', 0):>8.0f} {stage['error_rate']:>7.1%} "
+            f"{'-' if pool is None else f'{pool:.0%}':>8} "
+            f"{'-' if wait is None else f'{wait:.1f}':>8}"
+        )
+
+
+def compare_lines(current: dict, previous: dict) -> Iterator[str]:
+    before = {stage["users"]: stage for stage in previous["stages"]}
+    yield f"{'users':>5} {'req/s before':>13} {'req/s now':>10} {'p95 before':>11} {'p95 now':>8}"
+    for stage in current["stages"]:
+        old = before.get(stage["users"])
+        if old is None:
+            continue
+        yield (
+            f"{stage['users']:>5} {old['throughput_rps']:>13.1f} {stage['throughput_rps']:>10.1f} "
+            f"{old['latency'].get('p95_ms', 0):>11.0f} {stage['latency'].get('p95_ms', 0):>8.0f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    stages: list[dict] = []
+    async with contextlib.AsyncExitStack() as stack:
+        api_url = (
+            await stack.enter_async_context(spawn_stack(args)) if args.spawn else args.api_url
+        )
+        for users in args.users:
+            logger.info("Stage: %d users for %gs", users, args.stage_s)
+            stage = await run_stage(api_url, users, args, rng)
+            logger.info(
+                "  %.1f req/s, p95 %s ms, errors %.1f%%",
+                stage["throughput_rps"],
+                stage["latency"].get("p95_ms", "-"),
+                stage["error_rate"] * 100,
+            )
+            stages.append(stage)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "target": "spawned stack (stub models)" if args.spawn else args.api_url,
+        "mix": args.mix,
+        "stage_s": args.stage_s,
+        "think_ms": args.think_ms,
+        "stubs": {
+            "llm_ttft_ms": args.llm_ttft_ms,
+            "llm_token_ms": args.llm_token_ms,
+            "stt_rtf": args.stt_rtf,
+            "tts_rtf": args.tts_rtf,
+        }
+        if args.spawn
+        else None,
+        "stages": stages,
+        "capacity": capacity(stages),
+    }
+    output = args.output or LOADTEST_DIR / f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    print("\n--- Saturation curve ---")
+    for line in curve_lines(report):
+        print(line)
+    print("\nPer request (last stage):")
+    for name, stats in stages[-1]["requests"].items() if stages else ():
+        print(
+            f"  {name:<18} n={stats['n']:<6} p50={stats.get('p50_ms', '-')} "
+            f"p95={stats.get('p95_ms', '-')} errors={stats['errors']}"
+        )
+    if report["capacity"]:
+        print(
+            f"\nCapacity:  {report['capacity']['throughput_rps']} req/s "
+            f"at {report['capacity']['users']} users"
+        )
+    else:
+        print("\nCapacity:  not reached a stable stage (errors from the first stage)")
+    if args.compare:
+        print(f"\nCompared with {args.compare}:")
+        for line in compare_lines(report, json.loads(args.compare.read_text(encoding="utf-8"))):
+            print(line)
+    print(f"\nReport:    {output}")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API load test (saturation curve)")
+    parser.add_argument("--api-url", default="http://localhost:8000", help="API under test")
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Start the API and the mock vLLM with stub models (ignores --api-url)",
+    )
+    parser.add_argument(
+        "--users",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 2, 4, 8, 16, 32],
+        help="Concurrent virtual users of each stage (default: 1,2,4,8,16,32)",
+    )
+    parser.add_argument("--stage-s", type=float, default=30.0, help="Duration of each stage")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("candidate=5,recruiter=3,aidant=2"),
+        help="Session weights (default: candidate=5,recruiter=3,aidant=2)",
+    )
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Mean pause between actions")
+    parser.add_argument(
+        "--fast-audio",
+        action="store_true",
+        help="Send audio as fast as possible instead of at speaking pace",
+    )
+    parser.add_argument("--timeout-s", type=float, default=30.0, help="Request timeout")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON report (default: data/loadtest/)")
+    parser.add_argument("--compare", type=Path, help="Previous report to compare with")
+    stubs = parser.add_argument_group("stub latencies (--spawn)")
+    stubs.add_argument("--llm-ttft-ms", type=float, default=150.0)
+    stubs.add_argument("--llm-token-ms", type=float, default=20.0)
+    stubs.add_argument("--stt-rtf", type=float, default=0.05)
+    stubs.add_argument("--tts-rtf", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
@@ -0,0 +1,222 @@
+"""Load-test scenarios -- one user session per call, every request timed.
+
+A virtual user runs sessions one after the other. Each session follows one
+role:
+
+- candidate: a voice turn (/api/voice/turn), audio sent at speaking pace,
+  timed from the end of speech to the first audio of the reply and to the
+  end of the turn;
+- recruiter: two matching searches (/api/matching/search), the second one
+  narrowed to a zone;
+- aidant: skill label autocompletion (/api/labels/search, one request per
+  typed prefix), a spoken confirmation (/api/tts) and a dictation
+  (/api/stt/stream).
+
+Requests are recorded by name; a failed request ends its session.
+"""
+
+import array
+import asyncio
+import contextlib
+import json
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+from websockets.asyncio.client import connect
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+
+NEEDS = [
+    "conducteur d'engins de chantier, permis C",
+    "agent d'entretien pour bureaux",
+    "serveur en restauration, service en salle",
+    "ouvrier agricole maraichage",
+    "charpentier bois, lecture de plan",
+    "vendeur en alimentation, encaissement",
+    "mineur operateur de forage",
+]
+ZONES = ["Nouméa", "Dumbéa", "Koné", "Bourail", "Lifou", "Mont-Dore"]
+LABELS = [
+    "conduite d'engins",
+    "nettoyage et entretien",
+    "service en salle",
+    "culture maraichere",
+    "peche cotiere",
+    "soudure",
+    "encaissement",
+]
+CONFIRMATIONS = [
+    "Vos competences ont bien ete enregistrees.",
+    "Merci, nous passons a l'experience suivante.",
+    "Pouvez-vous preciser depuis combien de temps vous faites ce travail ?",
+]
+
+
+def speech(seconds: float, silence_s: float = 0.0) -> bytes:
+    """PCM 16-bit mono: a modulated tone (detected as speech), then silence."""
+    voiced = int(seconds * SAMPLE_RATE)
+    samples = array.array(
+        "h",
+        (
+            int(
+                9000
+                * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)
+                * (0.6 + 0.4 * math.sin(i / 800))
+            )
+            for i in range(voiced)
+        ),
+    )
+    samples.extend([0] * int(silence_s * SAMPLE_RATE))
+    return samples.tobytes()
+
+
+# Two utterances and the pause that ends the turn
+UTTERANCE = speech(1.5, 0.8) + speech(1.5, 0.7)
+DICTATION = speech(2.0, 0.7)
+
+
+@dataclass
+class Sample:
+    """Requete chronometree."""
+
+    name: str
+    ms: float
+    ok: bool
+    # False for a milestone inside a request (first audio of a voice turn)
+    request: bool = True
+    # perf_counter() when the request completed
+    at: float = field(default_factory=time.perf_counter)
+
+
+class Recorder:
+    """Collecte les mesures d'une etape de charge."""
+
+    def __init__(self) -> None:
+        self.samples: list[Sample] = []
+        self.sessions: dict[str, int] = {}
+        self.failed_sessions: dict[str, int] = {}
+
+    def add(self, name: str, ms: float, ok: bool = True, request: bool = True) -> None:
+        self.samples.append(Sample(name, ms, ok, request))
+
+    @contextlib.asynccontextmanager
+    async def measure(self, name: str) -> AsyncIterator[None]:
+        """Time the block as request ``name``; an exception marks it failed."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as exc:
+            if not isinstance(exc, asyncio.CancelledError):
+                self.add(name, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        self.add(name, (time.perf_counter() - started) * 1000)
+
+
+@dataclass
+class Target:
+    """API testee et parametres communs aux sessions."""
+
+    client: httpx.AsyncClient
+    ws_url: str
+    think_s: float = 0.5
+    realtime: bool = True
+
+
+async def think(target: Target, rng: random.Random) -> None:
+    """Pause of a real user between two actions (exponential, mean think_s)."""
+    if target.think_s > 0:
+        await asyncio.sleep(rng.expovariate(1 / target.think_s))
+
+
+async def send_audio(ws, pcm: bytes, realtime: bool) -> None:
+    """Send PCM in 100 ms chunks, at speaking pace unless ``realtime`` is off."""
+    step = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    for offset in range(0, len(pcm), step):
+        await ws.send(pcm[offset : offset + step])
+        if realtime:
+            await asyncio.sleep(CHUNK_MS / 1000)
+    await ws.send(json.dumps({"type": "end"}))
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+
+async def candidate(target: Target, recorder: Recorder, rng: random.Random) -> None:
+    async with connect(f"{target.ws_url}/api/voice/turn", max_size=None) as ws:
+        start = json.loads(await ws.recv())
+        if start.get("type") != "start":
+            raise RuntimeError(f"unexpected first message: {start}")
+        await send_audio(ws, UTTERANCE, target.realtime)
+        speech_end = time.perf_counter()
+        async with recorder.measure("voice.turn"):
+            first_audio: float | None = None
+            while True:
+                message = await ws.recv()
+                if isinstance(message, bytes):
+                    if first_audio is None:
+                        first_audio = (time.perf_counter() - speech_end) * 1000
+                        recorder.add("voice.first_audio", first_audio, request=False)
+                    continue
+                if json.loads(message).get("type") == "done":
+                    break
+
+
+async def recruiter(target: Target, recorder: Recorder, rng: random.Random) -> None:
+    need = rng.choice(NEEDS)
+    async with recorder.measure("matching.search"):
+        response = await target.client.post(
+            "/api/matching/search", json={"texte": need, "limit": 20}
+        )
+        response.raise_for_status()
+    await think(target, rng)
+    async with recorder.measure("matching.search"):
+        response = await target.client.post(
+            "/api/matching/search",
+            json={"texte": need, "zone_geographique": rng.choice(ZONES), "limit": 20},
+        )
+        response.raise_for_status()
+
+
+async def aidant(target: Target, recorder: Recorder, rng: random.Random) -> None:
+    label = rng.choice(LABELS)
+    # Autocompletion while the label is typed
+    for length in (3, 6, len(label)):
+        async with recorder.measure("labels.search"):
+            response = await target.client.get(
+                "/api/labels/search", params={"q": label[:length], "limit": 10}
+            )
+            response.raise_for_status()
+        await asyncio.sleep(0.15)
+    await think(target, rng)
+    async with (
+        recorder.measure("tts.synthesize"),
+        target.client.stream(
+            "POST", "/api/tts", json={"text": rng.choice(CONFIRMATIONS), "format": "pcm"}
+        ) as response,
+    ):
+        response.raise_for_status()
+        async for _ in response.aiter_bytes():
+            pass
+    await think(target, rng)
+    async with connect(f"{target.ws_url}/api/stt/stream", max_size=None) as ws:
+        await send_audio(ws, DICTATION, target.realtime)
+        async with recorder.measure("stt.dictation"):
+            while True:
+                message = await ws.recv()
+                if isinstance(message, str) and json.loads(message).get("type") == "done":
+                    break
+
+
+Session = Callable[[Target, Recorder, random.Random], Awaitable[None]]
+SESSIONS: dict[str, Session] = {
+    "candidate": candidate,
+    "recruiter": recruiter,
+    "aidant": aidant,
+}
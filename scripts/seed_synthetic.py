@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""Synthetic seed -- generate a large, deterministic dataset for load testing.
+
+Generates candidate profiles (users, profiles, competences, experiences)
+and job offers (raw_offers, extracted_skills) from the persona data of
+seed.py: each synthetic profile follows one persona's trade (skills, ROME
+codes, experiences) with a random zone, availability, levels and
+durations. Optional synthetic embeddings are clustered by trade, so
+semantic matching returns meaningful neighbours.
+
+Rows are bulk-loaded with COPY, in parallel batches (one process and one
+connection per batch, synchronous_commit off), table after table in
+foreign-key order. With --embeddings, the profiles HNSW index is dropped
+during the load and rebuilt once at the end: inserting vectors one by one
+into the graph is much slower than one bulk build.
+
+Deterministic: ids come from stable_uuid (same names, same UUIDs as
+seed.py's scheme) and every row is drawn from a generator seeded by
+(--seed, row index), so the same arguments give the same dataset whatever
+the batch size or the number of workers. Re-running first deletes the
+previous synthetic dataset (users @synthetic.kompetens.nc, offers with
+source "synthetic"); the hand-written seed data is left alone.
+
+Usage:
+    python scripts/seed_synthetic.py
+    python scripts/seed_synthetic.py --profiles 100000 --offers 20000
+    python scripts/seed_synthetic.py --profiles 100000 --embeddings --workers 8
+    python scripts/seed_synthetic.py --profiles 100000 --dry-run
+
+--profiles 100000 --offers 20000 is about 1M rows. Reads DATABASE_URL_SYNC
+from environment or .env file. --embeddings requires numpy (ML extras):
+pip install -e "apps/api[ml]".
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby
+
+import psycopg
+from seed import COMPETENCES, CONNINFO, EXPERIENCES, USERS, stable_uuid
+
+# ---------------------------------------------------------------------------
+# Vocabulary (from the seed.py personas)
+# ---------------------------------------------------------------------------
+
+EMAIL_DOMAIN = "synthetic.kompetens.nc"
+OFFER_SOURCE = "synthetic"
+
+ZONES = [
+    "Nouméa",
+    "Dumbéa",
+    "Mont-Dore",
+    "Païta",
+    "Koné",
+    "Pouembout",
+    "Bourail",
+    "Thio",
+    "Lifou",
+    "Maré",
+    "Poindimié",
+    "Houaïlou",
+]
+DISPONIBILITES = ["immédiate", "1 mois", "3 mois", None]
+NIVEAUX = ["débutant", "intermédiaire", "confirmé", "expert"]
+SOURCES = ["voice", "voice", "voice", "manual", "inferred"]
+OFFER_SOURCE_CONTEXTS = ["chantier", "mine", "service", "exploitation", "atelier", "magasin"]
+
+# ROME family letter -> sector label of the offers
+SECTORS = {
+    "A": "Agriculture et pêche",
+    "D": "Commerce",
+    "F": "BTP",
+    "G": "Hôtellerie-restauration",
+    "H": "Industrie",
+    "I": "Maintenance",
+    "K": "Services à la personne",
+}
+
+
+@dataclass(frozen=True)
+class Trade:
+    """Metier type d'un persona : competences, experiences, resume."""
+
+    name: str
+    resume: str
+    competences: list[tuple[str, str]]  # (label, code_rome)
+    experiences: list[tuple[str, str]]  # (intitule, contexte)
+
+
+def build_trades() -> list[Trade]:
+    """One trade per seed persona that has competences."""
+    resumes = {u["email"].split("@")[0]: u["resume"] for u in USERS}
+    experiences = {
+        owner: [(intitule, contexte) for _, intitule, contexte, _ in rows]
+        for owner, rows in groupby(EXPERIENCES, key=lambda row: row[0])
+    }
+    return [
+        Trade(
+            name=owner,
+            resume=resumes.get(owner) or "",
+            competences=[(label, code_rome) for _, label, code_rome, _, _ in rows],
+            experiences=experiences.get(owner, []),
+        )
+        for owner, rows in groupby(COMPETENCES, key=lambda row: row[0])
+    ]
+
+
+TRADES = build_trades()
+
+
+# ---------------------------------------------------------------------------
+# Row generators (one "unit" = one profile or one offer)
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Parametres de generation, transmis a chaque processus."""
+
+    profiles: int
+    offers: int
+    competences: int
+    experiences: int
+    skills: int
+    seed: int
+    embeddings: bool
+    dimension: int
+    dry_run: bool
+
+
+def unit_rng(plan: Plan, kind: str, i: int) -> random.Random:
+    """Generator of one unit: depends on (seed, kind, index) only."""
+    return random.Random(f"{plan.seed}-{kind}-{i}")
+
+
+def trade_index(plan: Plan, kind: str, i: int) -> int:
+    return unit_rng(plan, f"{kind}-trade", i).randrange(len(TRADES))
+
+
+def trade_of(plan: Plan, kind: str, i: int) -> Trade:
+    return TRADES[trade_index(plan, kind, i)]
+
+
+def user_id(i: int) -> str:
+    return stable_uuid(f"synthetic-user-{i}")
+
+
+def profile_id(i: int) -> str:
+    return stable_uuid(f"synthetic-profile-{i}")
+
+
+def offer_id(i: int) -> str:
+    return stable_uuid(f"synthetic-offer-{i}")
+
+
+def user_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        yield (user_id(i), f"user{i}@{EMAIL_DOMAIN}", "candidat", True)
+
+
+def profile_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    vectors = embedding_batch(plan, start, stop) if plan.embeddings else None
+    for i in range(start, stop):
+        rng = unit_rng(plan, "profile", i)
+        row = (
+            profile_id(i),
+            user_id(i),
+            rng.choice(ZONES),
+            rng.choice(DISPONIBILITES),
+            trade_of(plan, "profile", i).resume,
+        )
+        yield (*row, vectors[i - start]) if vectors is not None else row
+
+
+def competence_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        rng = unit_rng(plan, "competences", i)
+        own = trade_of(plan, "profile", i).competences
+        parent = profile_id(i)
+        count = min(rng.randint(1, plan.competences * 2 - 1), len(own) + 2)
+        # Mostly the trade's skills, sometimes a skill from another trade
+        picks = rng.sample(own, min(count, len(own)))
+        while len(picks) < count:
+            picks.append(rng.choice(rng.choice(TRADES).competences))
+        for n, (label, code_rome) in enumerate(picks):
+            yield (
+                stable_uuid(f"synthetic-comp-{i}-{n}"),
+                parent,
+                label,
+                code_rome,
+                rng.choice(NIVEAUX),
+                rng.choice(SOURCES),
+            )
+
+
+def experience_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        rng = unit_rng(plan, "experiences", i)
+        own = trade_of(plan, "profile", i).experiences
+        if not own:
+            continue
+        parent = profile_id(i)
+        for n in range(rng.randint(0, plan.experiences * 2)):
+            intitule, contexte = rng.choice(own)
+            years = rng.randint(1, 15)
+            yield (
+                stable_uuid(f"synthetic-exp-{i}-{n}"),
+                parent,
+                intitule,
+                contexte,
+                f"{years} an{'s' if years > 1 else ''}",
+            )
+
+
+def offer_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        rng = unit_rng(plan, "offer", i)
+        trade = trade_of(plan, "offer", i)
+        zone = rng.choice(ZONES)
+        labels = [
+            label for label, _ in rng.sample(trade.competences, min(3, len(trade.competences)))
+        ]
+        title = rng.choice(trade.experiences)[0] if trade.experiences else labels[0]
+        text = (
+            f"Recherche {title} H/F sur {zone}. "
+            f"Compétences attendues : {', '.join(labels).lower()}. "
+            f"Expérience de {rng.randint(1, 5)} ans souhaitée, "
+            f"poste à pourvoir {rng.choice(['immédiatement', 'sous un mois', 'en CDD', 'en CDI'])}."
+        )
+        yield (
+            offer_id(i),
+            OFFER_SOURCE,
+            f"https://{EMAIL_DOMAIN}/offres/{i}",
+            text,
+            zone,
+            SECTORS.get(trade.competences[0][1][0]),
+            True,
+        )
+
+
+def extracted_skill_rows(plan: Plan, start: int, stop: int) -> Iterator[tuple]:
+    for i in range(start, stop):
+        rng = unit_rng(plan, "skills", i)
+        own = trade_of(plan, "offer", i).competences
+        parent = offer_id(i)
+        for n in range(min(rng.randint(1, plan.skills * 2 - 1), len(own))):
+            yield (
+                stable_uuid(f"synthetic-skill-{i}-{n}"),
+                parent,
+                own[n][0].lower(),
+                rng.choice([*NIVEAUX, None]),
+                rng.choice(OFFER_SOURCE_CONTEXTS),
+            )
+
+
+def embedding_batch(plan: Plan, start: int, stop: int) -> list[str]:
+    """pgvector literals: trade centroid plus per-profile noise, L2-normalized."""
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise RuntimeError(
+            'numpy is not installed. Install the ML extras: pip install -e "apps/api[ml]"'
+        ) from exc
+    centroids = np.random.default_rng(plan.seed).standard_normal((len(TRADES), plan.dimension))
+    vectors = np.empty((stop - start, plan.dimension))
+    for row, i in enumerate(range(start, stop)):
+        trade = trade_index(plan, "profile", i)
+        noise = np.random.default_rng([plan.seed, i]).standard_normal(plan.dimension)
+        vectors[row] = centroids[trade] + 0.8 * noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return ["[" + ",".join(map(repr, v)) + "]" for v in vectors.round(5).tolist()]
+
+
+@dataclass(frozen=True)
+class Table:
+    """Table chargee : colonnes COPY, generateur, unite (profil ou offre)."""
+
+    name: str
+    columns: tuple[str, ...]
+    rows: Callable[[Plan, int, int], Iterator[tuple]]
+    unit: str  # "profiles" | "offers"
+    # Plan field holding the mean rows per unit (None: one row per unit)
+    per_unit: str | None = None
+
+    def rows_per_unit(self, plan: Plan) -> int:
+        return getattr(plan, self.per_unit) if self.per_unit else 1
+
+    def copy_columns(self, plan: Plan) -> tuple[str, ...]:
+        if self.name == "profiles" and plan.embeddings:
+            return (*self.columns, "embedding")
+        return self.columns
+
+
+# Load phases in foreign-key order; the tables of one phase load in parallel
+PHASES: list[list[Table]] = [
+    [
+        Table("users", ("id", "email", "role", "is_active"), user_rows, "profiles"),
+        Table(
+            "raw_offers",
+            ("id", "source", "source_url", "text", "zone", "sector", "processed"),
+            offer_rows,
+            "offers",
+        ),
+    ],
+    [
+        Table(
+            "profiles",
+            ("id", "user_id", "zone_geographique", "disponibilite", "resume_text"),
+            profile_rows,
+            "profiles",
+        ),
+        Table(
+            "extracted_skills",
+            ("id", "offer_id", "label", "level", "context"),
+            extracted_skill_rows,
+            "offers",
+            "skills",
+        ),
+    ],
+    [
+        Table(
+            "competences",
+            ("id", "profile_id", "label", "code_rome", "niveau", "source"),
+            competence_rows,
+            "profiles",
+            "competences",
+        ),
+        Table(
+            "experiences",
+            ("id", "profile_id", "intitule", "contexte", "duree_estimee"),
+            experience_rows,
+            "profiles",
+            "experiences",
+        ),
+    ],
+]
+TABLES = {table.name: table for phase in PHASES for table in phase}
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def load_batch(name: str, plan: Plan, start: int, stop: int) -> tuple[str, int, float]:
+    """Generate one batch and COPY it on its own connection (worker process)."""
+    started = time.perf_counter()
+    table = TABLES[name]
+    rows = table.rows(plan, start, stop)
+    count = 0
+    if plan.dry_run:
+        count = sum(1 for _ in rows)
+    else:
+        with psycopg.connect(CONNINFO) as conn, conn.cursor() as cur:
+            # Regenerable test data: no need to wait for the WAL flush
+            cur.execute("SET synchronous_commit = off")
+            columns = ", ".join(table.copy_columns(plan))
+            with cur.copy(f"COPY {table.name} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    count += 1
+    return table.name, count, time.perf_counter() - started
+
+
+def batches(table: Table, plan: Plan, batch_rows: int) -> Iterator[tuple[int, int]]:
+    """Unit ranges of about ``batch_rows`` rows."""
+    units = getattr(plan, table.unit)
+    step = max(1, batch_rows // max(1, table.rows_per_unit(plan)))
+    for start in range(0, units, step):
+        yield start, min(start + step, units)
+
+
+def reset(cur: psycopg.Cursor) -> tuple[int, int]:
+    """Delete the previous synthetic dataset (children go with ON DELETE CASCADE)."""
+    cur.execute("DELETE FROM users WHERE email LIKE %s", (f"%@{EMAIL_DOMAIN}",))
+    users = cur.rowcount
+    cur.execute("DELETE FROM raw_offers WHERE source = %s", (OFFER_SOURCE,))
+    return users, cur.rowcount
+
+
+def seed_synthetic(plan: Plan, workers: int, batch_rows: int) -> None:
+    started = time.perf_counter()
+    if not plan.dry_run:
+        print(f"Connecting to: {CONNINFO.split('@')[1] if '@' in CONNINFO else CONNINFO}")
+        with psycopg.connect(CONNINFO) as conn, conn.cursor() as cur:
+            users, offers = reset(cur)
+            if plan.embeddings:
+                cur.execute("DROP INDEX IF EXISTS ix_profiles_embedding_hnsw")
+        print(f"Previous synthetic data deleted: {users} users, {offers} offers")
+
+    counts: dict[str, int] = {}
+    timings: dict[str, float] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for phase in PHASES:
+            phase_started = time.perf_counter()
+            futures = [
+                pool.submit(load_batch, table.name, plan, start, stop)
+                for table in phase
+                for start, stop in batches(table, plan, batch_rows)
+            ]
+            for future in futures:
+                name, count, _ = future.result()
+                counts[name] = counts.get(name, 0) + count
+            for table in phase:
+                timings[table.name] = time.perf_counter() - phase_started
+    loaded_at = time.perf_counter()
+
+    index_s = 0.0
+    if not plan.dry_run:
+        with psycopg.connect(CONNINFO, autocommit=True) as conn, conn.cursor() as cur:
+            if plan.embeddings:
+                cur.execute("SET maintenance_work_mem = '1GB'")
+                cur.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_profiles_embedding_hnsw "
+                    "ON profiles USING hnsw (embedding vector_cosine_ops) "
+                    "WITH (m = 16, ef_construction = 64)"
+                )
+                index_s = time.perf_counter() - loaded_at
+            # Fresh planner statistics for the matching queries
+            for phase in PHASES:
+                for table in phase:
+                    cur.execute(f"ANALYZE {table.name}")
+
+    total = sum(counts.values())
+    load_s = loaded_at - started
+    print("\n--- Synthetic Seed ---")
+    for phase in PHASES:
+        for table in phase:
+            print(
+                f"{table.name + ':':<18} {counts[table.name]:>9} rows ({timings[table.name]:.1f}s)"
+            )
+    print(f"{'Total:':<18} {total:>9} rows in {load_s:.1f}s ({total / load_s:,.0f} rows/s)")
+    if plan.embeddings and not plan.dry_run:
+        print(f"HNSW index rebuild: {index_s:.1f}s")
+    if plan.dry_run:
+        print("Dry run: rows generated, nothing written.")
+    print("Done.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset (COPY bulk load)")
+    parser.add_argument("--profiles", type=int, default=1000, help="Candidate profiles")
+    parser.add_argument("--offers", type=int, default=200, help="Job offers")
+    parser.add_argument("--competences", type=int, default=5, help="Mean competences per profile")
+    parser.add_argument("--experiences", type=int, default=2, help="Mean experiences per profile")
+    parser.add_argument("--skills", type=int, default=4, help="Mean extracted skills per offer")
+    parser.add_argument(
+        "--embeddings",
+        action="store_true",
+        help="Fill profiles.embedding with synthetic vectors (clustered by trade)",
+    )
+    parser.add_argument("--dimension", type=int, default=1024, help="Embedding dimension")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel COPY processes")
+    parser.add_argument(
+        "--batch-rows", type=int, default=50_000, help="Rows per COPY batch (one transaction)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Generate the rows without connecting to the database",
+    )
+    args = parser.parse_args()
+    plan = Plan(
+        profiles=args.profiles,
+        offers=args.offers,
+        competences=args.competences,
+        experiences=args.experiences,
+        skills=args.skills,
+        seed=args.seed,
+        embeddings=args.embeddings,
+        dimension=args.dimension,
+        dry_run=args.dry_run,
+    )
+    seed_synthetic(plan, args.workers, args.batch_rows)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except psycopg.OperationalError as exc:
+        print(f"ERROR: Cannot connect to database: {exc}", file=sys.stderr)
+        print(
+            "Make sure PostgreSQL is running and DATABASE_URL_SYNC is set.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted.")
+        sys.exit(130)
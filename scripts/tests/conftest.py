@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Scripts are run as files, not installed: import them from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,63 @@
+import pytest
+from bench.core import compare, percentile
+
+
+def report(**results) -> dict:
+    return {"results": {key.replace("__", "/"): result for key, result in results.items()}}
+
+
+def timing(p50: float, backend: str = "tiny/cpu") -> dict:
+    return {"backend": backend, "p50_ms": p50, "p95_ms": p50 * 1.5}
+
+
+def test_percentile_interpolates_between_closest_ranks():
+    samples = [40.0, 10.0, 30.0, 20.0]
+    assert percentile(samples, 0) == 10.0
+    assert percentile(samples, 100) == 40.0
+    assert percentile(samples, 50) == 25.0
+    assert percentile(samples, 95) == pytest.approx(38.5)
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_slowdown_above_threshold_is_a_regression():
+    baseline = report(stt__short=timing(100.0), tts__sentence=timing(50.0))
+    current = report(stt__short=timing(130.0), tts__sentence=timing(55.0))
+
+    comparison = compare(current, baseline, threshold=0.2)
+
+    assert [(r.key, r.metric) for r in comparison.regressions] == [
+        ("stt/short", "p50_ms"),
+        ("stt/short", "p95_ms"),
+    ]
+    assert comparison.regressions[0].change == pytest.approx(0.3)
+    assert not comparison.ok
+
+
+def test_sub_millisecond_changes_are_noise():
+    comparison = compare(report(llm__ttft=timing(1.5)), report(llm__ttft=timing(1.0)), 0.2)
+    assert comparison.ok and not comparison.regressions
+
+
+def test_failed_or_missing_baseline_case_fails_the_run():
+    baseline = report(stt__short=timing(100.0), tts__sentence=timing(50.0))
+    # STT errored; the TTS suite failed in setup and measured nothing
+    current = report(stt__short={"backend": "tiny/cpu", "error": "model not found"})
+
+    comparison = compare(current, baseline, threshold=0.2)
+
+    assert comparison.failed == ["stt/short", "tts/sentence"]
+    assert not comparison.regressions and not comparison.ok
+
+
+def test_new_other_backend_and_unselected_cases_are_skipped():
+    baseline = report(
+        stt__short=timing(100.0, "large-v3/cuda"),
+        tts__sentence=timing(50.0),
+        llm__ttft={"backend": "mock", "error": "connection refused"},
+    )
+    current = report(stt__short=timing(900.0), embeddings__batch=timing(5.0))
+
+    comparison = compare(current, baseline, threshold=0.2, suites=["stt", "embeddings", "llm"])
+
+    assert sorted(comparison.skipped) == ["embeddings/batch", "stt/short", "tts/sentence"]
+    assert comparison.ok
@@ -0,0 +1,162 @@
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import import_rome
+import pytest
+from import_rome import (
+    MAX_DELETE_SHARE,
+    apply_changes,
+    check_delete_share,
+    content_hash_sql,
+    iter_json_array,
+    upsert_rome_data,
+)
+
+
+def parse(*chunks: bytes) -> list:
+    return list(iter_json_array(chunks))
+
+
+def split_everywhere(document: bytes) -> list[list]:
+    return [parse(document[:i], document[i:]) for i in range(len(document) + 1)]
+
+
+def test_values_split_across_chunks_are_decoded_whole():
+    assert parse(b"[1", b"23, 4]") == [123, 4]
+    assert parse(b'[{"code": "A1', b'101"}, tr', b"ue]") == [{"code": "A1101"}, True]
+
+
+def test_any_chunk_boundary_gives_the_same_elements():
+    fiches = [{"code": "K1304", "libelle": "Services domestiques é"}, 12.5, None, [1, 2]]
+    document = json.dumps(fiches, ensure_ascii=False).encode()
+    assert all(result == fiches for result in split_everywhere(document))
+
+
+def test_empty_array_and_whitespace():
+    assert parse(b"  [ ", b" ]  ") == []
+    assert parse(b'\n[\n  {"a": 1} ,\n  {"a": 2}\n]\n') == [{"a": 1}, {"a": 2}]
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        b"[1 2]",  # missing comma
+        b"[1,,2]",  # repeated comma
+        b"[,1]",  # leading comma
+        b"[1,]",  # trailing comma
+        b"[1, 2",  # truncated
+    ],
+)
+def test_malformed_arrays_are_rejected(document):
+    with pytest.raises(ValueError):
+        parse(document)
+
+
+def test_not_an_array():
+    with pytest.raises(ValueError, match="not a JSON array"):
+        parse(b'{"code": "K1304"}')
+
+
+class RecordingCursor:
+    """psycopg cursor stand-in: records SQL, answers count_missing from ``missing``."""
+
+    def __init__(self, missing: dict[str, tuple[int, int]] | None = None) -> None:
+        self.statements: list[str] = []
+        self.copied: list[tuple] = []
+        self.missing = missing or {}
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        table = self.statements[-1].rsplit("FROM ", 1)[1].split()[0]
+        return self.missing.get(table, (0, 100))
+
+    @contextmanager
+    def copy(self, sql):
+        yield SimpleNamespace(write_row=self.copied.append)
+
+
+class RecordingConnection:
+    def __init__(self, cursor: RecordingCursor) -> None:
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @contextmanager
+    def cursor(self):
+        yield self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+FICHES = [
+    {
+        "code": "F1702",
+        "libelle": "Construction de routes",
+        "savoirs": [{"code": "100001", "libelle": "Lecture de plans"}],
+        "appellations": [{"code": "12345", "libelle": "Paveur"}],
+    }
+]
+
+
+def test_content_hash_covers_content_columns_only():
+    columns = ("code_rome", "libelle", "definition")
+    assert content_hash_sql(columns, "code_rome") == "md5(ROW(s.libelle, s.definition)::text)"
+
+
+def test_only_rows_with_a_new_hash_are_updated():
+    cur = RecordingCursor()
+    apply_changes(cur, "rome_metiers", "_src", ("code_rome", "libelle"), "code_rome")
+
+    insert, update = cur.statements
+    assert "WHERE NOT EXISTS (SELECT 1 FROM rome_metiers t WHERE t.code_rome = s.code_rome)" in (
+        insert
+    )
+    # NULL hashes (rows stored before hashing) compare as changed
+    assert "AND t.content_hash IS DISTINCT FROM s.content_hash" in update
+
+
+def test_delete_share_guard():
+    check_delete_share("rome_metiers", 10, 100)
+    check_delete_share("rome_metiers", 0, 0)
+    with pytest.raises(ValueError, match="truncated export"):
+        check_delete_share("rome_metiers", int(100 * MAX_DELETE_SHARE) + 1, 100)
+
+
+def test_truncated_export_is_rolled_back_before_any_delete(monkeypatch):
+    cur = RecordingCursor(missing={"rome_competences": (600, 1000)})
+    conn = RecordingConnection(cur)
+    monkeypatch.setattr(import_rome, "psycopg", SimpleNamespace(connect=lambda _: conn))
+
+    with pytest.raises(ValueError, match="600 of 1000 rows of rome_competences"):
+        upsert_rome_data(FICHES, delete_missing=True)
+
+    assert len(cur.copied) == 3
+    assert conn.rolled_back and not conn.committed
+    assert not any(sql.startswith("DELETE") for sql in cur.statements)
+
+
+def test_small_deletes_are_applied(monkeypatch):
+    cur = RecordingCursor(missing={"rome_competences": (5, 1000)})
+    conn = RecordingConnection(cur)
+    monkeypatch.setattr(import_rome, "psycopg", SimpleNamespace(connect=lambda _: conn))
+
+    upsert_rome_data(FICHES, delete_missing=True)
+
+    assert conn.committed and not conn.rolled_back
+    deletes = [sql.split()[2] for sql in cur.statements if sql.startswith("DELETE")]
+    assert deletes == ["rome_appellations", "rome_competences", "rome_metiers"]
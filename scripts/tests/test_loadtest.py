@@ -0,0 +1,23 @@
+from loadtest.run import stage_summary
+from loadtest.scenarios import Recorder, Sample
+
+
+def test_stage_counts_requests_completed_by_the_deadline():
+    recorder = Recorder()
+    recorder.samples = [
+        Sample("voice.first_audio", 800.0, True, request=False, at=1.0),
+        Sample("voice.turn", 2000.0, True, at=2.0),
+        Sample("labels.search", 10.0, True, at=3.0),
+        Sample("labels.search", 12.0, False, at=4.0),
+        # Finished after the deadline, while sessions were being awaited
+        Sample("matching.search", 50.0, True, at=11.0),
+    ]
+
+    stage = stage_summary(4, 10.0, recorder, [], deadline=10.0)
+
+    # One voice turn is one request, its first audio is a milestone
+    assert stage["throughput_rps"] == 0.2
+    assert stage["error_rate"] == round(1 / 3, 4)
+    assert stage["latency"]["n"] == 2
+    assert stage["requests"]["voice.first_audio"]["p50_ms"] == 800.0
+    assert "matching.search" not in stage["requests"]